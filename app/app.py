@@ -1,21 +1,68 @@
+import logging
+
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 
 from app.middlewares.base import add_middleware_base
+from app.middlewares.rate_limit import bucket_store
 from app.routes import include_router
-from config.database import disconnect_db, init_db
+from app.services import archive_services, revocation_services
+from app.services.hashing_services import import_hasher, password_hasher
+from app.utils.cache import entity_cache
+from app.utils.responses import FastJSONResponse
+from app.utils.timing import startup_timings
+from config.database import (
+    check_db_revision,
+    disconnect_db,
+    init_db,
+    warm_up_pool,
+)
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
 
 
 async def on_startup():
     """
-    Connects to the database.
+    Prepares the database according to `settings.db_startup_mode`.
+
+    "check" refuses to start unless the database is at the Alembic head,
+    "create_all" creates the missing tables and "skip" does neither.
+
+    Raises:
+        RuntimeError: The database is not at the head, or the revoked tokens
+            could not be loaded.
     """
-    await init_db()
+    if settings.db_startup_mode == "check":
+        with startup_timings.phase("db_check"):
+            await check_db_revision()
+    elif settings.db_startup_mode == "create_all":
+        with startup_timings.phase("db_create_all"):
+            await init_db()
+    with startup_timings.phase("pool_warmup"):
+        await warm_up_pool(settings.db_pool_warmup)
+    with startup_timings.phase("revocations"):
+        try:
+            await revocation_services.refresh_revocations(full=True)
+        except Exception as exc:
+            # Revoked tokens would be accepted until the next refresh
+            raise RuntimeError("Could not load the revoked tokens") from exc
+    if settings.archive_interval_seconds:
+        archive_services.start_scheduler(settings.archive_interval_seconds)
+    revocation_services.start_scheduler(settings.revocation_refresh_seconds)
+    logger.info("Startup timings: %s", startup_timings.as_dict())
 
 
 async def on_shutdown():
     """
     Performs the necessary cleanup operations before shutting down the application.
     """
+    await archive_services.stop_scheduler()
+    await revocation_services.stop_scheduler()
+    await entity_cache.close()
+    password_hasher.close()
+    import_hasher.close()
+    await bucket_store.close()
     await disconnect_db()
 
 
@@ -31,11 +78,15 @@ def init_app():
         description="This project is a test project for FastAPI.",
         version="1",
         swagger_ui_parameters={"syntaxHighlight.theme": "obsidian"},
+        default_response_class=(
+            FastJSONResponse if settings.fast_json else JSONResponse
+        ),
     )
     add_middleware_base(app_instance)
 
     app_instance.add_event_handler("startup", on_startup)
     app_instance.add_event_handler("shutdown", on_shutdown)
-    include_router(app_instance)
+    with startup_timings.phase("routers"):
+        include_router(app_instance)
 
     return app_instance
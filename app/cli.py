@@ -0,0 +1,148 @@
+"""Command line tools, run with `poetry run manage <command>`."""
+import argparse
+import asyncio
+import csv
+import json
+from datetime import timedelta
+from pathlib import Path
+
+from app.services import archive_services, copy_services
+from app.utils.passw import calibrate_argon2, calibrate_bcrypt
+from config.database import disconnect_db
+
+
+async def import_csv(table: str, path: str) -> dict:
+    with Path(path).open(newline="") as file:
+        report = await copy_services.import_rows(table, csv.DictReader(file))
+    return report.as_dict()
+
+
+async def export_csv(table: str, path: str) -> dict:
+    report = await copy_services.export_rows(table, str(Path(path).resolve()))
+    return report.as_dict()
+
+
+async def archive(days: int, batch_size: int, dry_run: bool) -> dict:
+    report = await archive_services.archive_disabled(
+        older_than=timedelta(days=days) if days is not None else None,
+        batch_size=batch_size,
+        dry_run=dry_run,
+    )
+    return report.as_dict()
+
+
+async def calibrate_hash(
+    scheme: str,
+    target_ms: float,
+    samples: int,
+    memory_cost: int,
+    parallelism: int,
+) -> dict:
+    if scheme == "argon2":
+        return calibrate_argon2(target_ms, memory_cost, parallelism, samples)
+    return calibrate_bcrypt(target_ms, samples)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="manage")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser(
+        "import",
+        help="Load a CSV file into users or profiles with COPY",
+    )
+    import_parser.add_argument("table", choices=["users", "profiles"])
+    import_parser.add_argument("path")
+    import_parser.set_defaults(handler=lambda args: import_csv(args.table, args.path))
+
+    export_parser = commands.add_parser(
+        "export",
+        help="Write the enabled users or profiles to a CSV file with COPY",
+    )
+    export_parser.add_argument("table", choices=["users", "profiles"])
+    export_parser.add_argument("path")
+    export_parser.set_defaults(handler=lambda args: export_csv(args.table, args.path))
+
+    archive_parser = commands.add_parser(
+        "archive",
+        help="Move soft-deleted users and profiles to the archive tables",
+    )
+    archive_parser.add_argument(
+        "--older-than-days",
+        type=int,
+        help="Minimum days since the soft delete, defaults to ARCHIVE_AFTER_DAYS",
+    )
+    archive_parser.add_argument(
+        "--batch-size",
+        type=int,
+        help="Rows moved per transaction, defaults to ARCHIVE_BATCH_SIZE",
+    )
+    archive_parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only count the rows that would be archived",
+    )
+    archive_parser.set_defaults(
+        handler=lambda args: archive(
+            args.older_than_days,
+            args.batch_size,
+            args.dry_run,
+        ),
+    )
+
+    calibrate_parser = commands.add_parser(
+        "calibrate-hash",
+        help="Pick the password hash parameters that meet a verify latency here",
+    )
+    calibrate_parser.add_argument(
+        "--scheme",
+        choices=["bcrypt", "argon2"],
+        default="bcrypt",
+    )
+    calibrate_parser.add_argument(
+        "--target-ms",
+        type=float,
+        default=250.0,
+        help="Acceptable password verification latency, defaults to 250",
+    )
+    calibrate_parser.add_argument(
+        "--samples",
+        type=int,
+        default=3,
+        help="Verifications timed per candidate, the median is kept",
+    )
+    calibrate_parser.add_argument(
+        "--memory-cost",
+        type=int,
+        default=19456,
+        help="argon2 memory in KiB to start from, halved if too slow",
+    )
+    calibrate_parser.add_argument("--parallelism", type=int, default=1)
+    calibrate_parser.set_defaults(
+        handler=lambda args: calibrate_hash(
+            args.scheme,
+            args.target_ms,
+            args.samples,
+            args.memory_cost,
+            args.parallelism,
+        ),
+    )
+
+    return parser
+
+
+async def run(args: argparse.Namespace):
+    try:
+        return await args.handler(args)
+    finally:
+        await disconnect_db()
+
+
+def main():
+    """Launched with `poetry run manage` at root level"""
+    args = build_parser().parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
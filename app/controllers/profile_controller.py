@@ -1,40 +1,77 @@
 """ Profile controller. """
-from typing import List
+from typing import List, Optional, Union
 from uuid import UUID
 
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import DataError, IntegrityError
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 import app.services.profile_services as services
+from app.models.bulk import BulkResult
+from app.models.page import Page
 from app.models.profile import ProfileSchema, ProfileSerializer
+from app.models.sql.profile import ProfileBulkUpdate, ProfileIn, ProfileOut
+from app.utils.conditional import is_conditional
 from app.utils.exceptions import (
+    BadRequestException,
     ConflictException,
     NotFoundException,
     ServerErrorException,
 )
+from app.utils.streaming import ndjson_response
 
 
-async def get_profiles(db_session: AsyncSession) -> List[ProfileSerializer]:
+async def get_profiles(
+    db_session: AsyncSession,
+    request: Request,
+    response: Response,
+    limit: int,
+    cursor: Optional[str] = None,
+) -> Union[Page[ProfileOut], Response]:
     """
-    Retrieve profiles from the database.
+    Retrieve a page of profiles from the database.
 
     Args:
         db_session (Session): The database session.
+        request (Request): The request, for its conditional headers.
+        response (Response): The response, receives the ETag.
+        limit (int): The maximum number of profiles.
+        cursor (Optional[str]): The cursor returned with the previous page.
 
     Returns:
-        List[ProfileSchema]: A list of profile objects.
+        Page[ProfileOut]: A page of profile objects, or a 304 response.
 
     Raises:
-        HTTPException: If no profiles are found or if there is an internal server error.
+        HTTPException: If the cursor is invalid.
     """
     try:
-        res = await services.get_profiles(db_session)
-        if not res:
-            raise NotFoundException(
-                resource="Profiles",
+        if is_conditional(request):
+            validators = await services.get_profiles_validators(
+                db_session,
+                limit,
+                cursor,
             )
-        return res
-    except Exception as exc:
-        raise ServerErrorException from exc
+            if validators.matches(request):
+                return validators.not_modified()
+        page, validators = await services.get_profiles(db_session, limit, cursor)
+    except ValueError as exc:
+        raise BadRequestException("Invalid cursor") from exc
+    validators.apply(response)
+    return page
+
+
+def export_profiles(fetch_size: int) -> StreamingResponse:
+    """
+    Stream every enabled profile as NDJSON.
+
+    Args:
+        fetch_size (int): The number of rows fetched per round trip.
+
+    Returns:
+        StreamingResponse: One profile per line.
+    """
+    return ndjson_response(services.stream_profiles(fetch_size))
 
 
 async def delete_profile(
@@ -95,17 +132,27 @@ async def update_profile(
 async def get_profile(
     profile_id: UUID,
     db_session: AsyncSession,
-) -> ProfileSerializer:
-    try:
-        res = await services.get_profile(
-            profile_id,
-            db_session,
-        )
-        if not res:
+    request: Request,
+    response: Response,
+) -> Union[ProfileOut, Response]:
+    """
+    Retrieve a profile, or a 304 response if the client copy is current.
+
+    Only `updated_at` is read to answer a conditional request, other requests
+    read the profile through the entity cache.
+    """
+    if is_conditional(request):
+        validators = await services.get_profile_validators(profile_id, db_session)
+        if validators is None:
             raise NotFoundException(resource="Profiles")
-        return res
-    except Exception as exc:
-        raise ServerErrorException from exc
+        if validators.matches(request):
+            return validators.not_modified()
+    res = await services.get_profile(profile_id, db_session)
+    if not res:
+        raise NotFoundException(resource="Profiles")
+    profile, validators = res
+    validators.apply(response)
+    return profile
 
 
 async def create_profile(
@@ -122,3 +169,56 @@ async def create_profile(
         return res
     except Exception as exc:
         raise ServerErrorException from exc
+
+
+async def create_profiles(
+    profiles: List[ProfileIn],
+    db_session: AsyncSession,
+) -> BulkResult:
+    """
+    Create a batch of profiles in one transaction.
+
+    Args:
+        profiles (List[ProfileIn]): The profiles to create.
+
+    Returns:
+        BulkResult: The ID of each created profile, in payload order.
+
+    Raises:
+        HTTPException: If any profile conflicts, in which case none is created.
+    """
+    try:
+        return await services.create_profiles(profiles, db_session)
+    except IntegrityError as exc:
+        raise ConflictException from exc
+    except DataError as exc:
+        raise BadRequestException from exc
+
+
+async def update_profiles(
+    profiles: List[ProfileBulkUpdate],
+    db_session: AsyncSession,
+) -> BulkResult:
+    """
+    Update a batch of profiles in one transaction.
+
+    Raises:
+        HTTPException: If a value is invalid or conflicts, in which case none
+        is updated.
+    """
+    try:
+        return await services.update_profiles(profiles, db_session)
+    except IntegrityError as exc:
+        raise ConflictException from exc
+    except DataError as exc:
+        raise BadRequestException from exc
+
+
+async def delete_profiles(
+    profile_ids: List[UUID],
+    db_session: AsyncSession,
+) -> BulkResult:
+    try:
+        return await services.delete_profiles(profile_ids, db_session)
+    except DataError as exc:
+        raise BadRequestException from exc
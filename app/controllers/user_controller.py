@@ -1,15 +1,39 @@
 """ User controller module. """
-from typing import List
+from datetime import timedelta
+from typing import FrozenSet, List, Optional, Union
 from uuid import UUID
 
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.models.sql.user import UserIn, UserOut
+from app.middlewares.authentication import Principal
+from app.models.page import Page
+from app.models.sql.profile import Profile, ProfileOut
+from app.models.sql.user import UserIn, UserOut, UserWithProfiles
+from app.models.token import AccessToken
 from app.services import user_services
+from app.services.hashing_services import HashingQueueFullError
+from app.utils.conditional import is_conditional
+from app.utils.dataloader import DataLoader
 from app.utils.exceptions import (
     AuthorizationException,
+    BadRequestException,
     EmailAlreadyUsedException,
+    NotFoundException,
+    ServiceUnavailableException,
 )
+from app.utils.jwt import JWTRepo
+from app.utils.streaming import ndjson_response
+from config.settings import settings
+
+
+def _hashing_busy() -> ServiceUnavailableException:
+    # The password hashing workers are saturated, the client should back off
+    return ServiceUnavailableException(
+        "Too many requests in progress",
+        retry_after=settings.hash_retry_after_seconds,
+    )
 
 
 async def create_user(
@@ -24,20 +48,69 @@ async def create_user(
     )
     if exist:
         raise EmailAlreadyUsedException
-    return user_services.create_user(db_session, user)
+    try:
+        return await user_services.create_user(db_session, user)
+    except HashingQueueFullError as exc:
+        raise _hashing_busy() from exc
 
 
 async def get_user(
     user_id: UUID,
     db_session: AsyncSession,
-) -> UserOut:
+    profiles_loader: DataLoader[str, List[Profile]],
+) -> UserWithProfiles:
     user = await user_services.get_user(db_session=db_session, user_id=user_id)
+    if not user:
+        raise NotFoundException(resource="Users")
+    (user,) = await user_services.embed_profiles([user], profiles_loader)
     return user
 
 
-async def get_all_users(db_session: AsyncSession) -> List[UserOut]:
-    users = await user_services.get_all_users(db_session)
-    return users
+async def get_favorite_profiles(
+    user_id: UUID,
+    db_session: AsyncSession,
+) -> List[ProfileOut]:
+    profiles = await user_services.get_favorite_profiles(user_id, db_session)
+    # Only an empty result needs to tell a missing user apart
+    if not profiles and not await user_services.get_user(user_id, db_session):
+        raise NotFoundException(resource="Users")
+    return profiles
+
+
+async def get_all_users(
+    db_session: AsyncSession,
+    limit: int,
+    cursor: Optional[str] = None,
+    profiles_loader: Optional[DataLoader[str, List[Profile]]] = None,
+    request: Optional[Request] = None,
+    response: Optional[Response] = None,
+) -> Union[Page[UserOut], Response]:
+    # Embedded profiles change without touching the users' updated_at
+    conditional = request is not None and not profiles_loader
+    try:
+        if conditional and is_conditional(request):
+            validators = await user_services.get_users_validators(
+                db_session,
+                limit,
+                cursor,
+            )
+            if validators.matches(request):
+                return validators.not_modified()
+        page, validators = await user_services.get_all_users(db_session, limit, cursor)
+    except ValueError as exc:
+        raise BadRequestException("Invalid cursor") from exc
+    if conditional:
+        validators.apply(response)
+    if profiles_loader:
+        page = Page[UserWithProfiles](
+            items=await user_services.embed_profiles(page.items, profiles_loader),
+            next_cursor=page.next_cursor,
+        )
+    return page
+
+
+def export_users(fetch_size: int) -> StreamingResponse:
+    return ndjson_response(user_services.stream_users(fetch_size))
 
 
 async def update(
@@ -55,12 +128,10 @@ async def update(
     if exist:
         raise EmailAlreadyUsedException
 
-    user = await user_services.update_user(
-        db_session,
-        id=user_id,
-        **user.model_dump(),
-    )
-    return user
+    try:
+        return await user_services.update_user(user_id, user, db_session)
+    except HashingQueueFullError as exc:
+        raise _hashing_busy() from exc
 
 
 async def delete_user(user_id: UUID, db_session: AsyncSession) -> bool:
@@ -73,11 +144,47 @@ async def authenticate_user(
     password: str,
 ) -> UserOut:
     username = username.lower().strip()
-    user = await user_services.authenticate_user(
-        db_session,
-        username,
-        password,
-    )
+    try:
+        user = await user_services.authenticate_user(
+            db_session,
+            username,
+            password,
+        )
+    except HashingQueueFullError as exc:
+        raise _hashing_busy() from exc
     if not user:
         raise AuthorizationException
     return user
+
+
+def _get_roles(username: str) -> FrozenSet[str]:
+    """
+    The roles of a user, from the settings until users have a roles column.
+
+    Args:
+        username (str): The normalized username.
+
+    Returns:
+        FrozenSet[str]: The roles, empty for most users.
+    """
+    admins = {admin.strip().lower() for admin in settings.admin_usernames}
+    return frozenset({"admin"}) if username in admins else frozenset()
+
+
+async def login_user(
+    db_session: AsyncSession,
+    username: str,
+    password: str,
+) -> AccessToken:
+    user = await authenticate_user(db_session, username, password)
+    principal = Principal(
+        id=user.id,
+        username=user.username,
+        roles=_get_roles(user.username),
+    )
+    expires_in = timedelta(minutes=settings.jwt_expire_minutes)
+    token = JWTRepo(data=principal.to_claims()).generate_token(expires_in)
+    return AccessToken(
+        access_token=token,
+        expires_in=int(expires_in.total_seconds()),
+    )
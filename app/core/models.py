@@ -1,29 +1,65 @@
 from datetime import datetime
-from typing import List, Type, TypeVar
+from functools import cache
+from typing import Any, Iterable, List, Tuple, Type, TypeVar
 from uuid import UUID, uuid4
 
+from pydantic import TypeAdapter
 from sqlalchemy import text
 from sqlmodel import Field, SQLModel
 
 T = TypeVar("T", bound=SQLModel)
 
 
+@cache
+def _list_adapter(entity_model: Type[T]) -> TypeAdapter:
+    # Building the validator is expensive, one per target model
+    return TypeAdapter(List[entity_model])
+
+
+@cache
+def _field_names(entity_model: Type[T]) -> Tuple[str, ...]:
+    return tuple(entity_model.model_fields)
+
+
+def _construct(entity_model: Type[T], fields: Tuple[str, ...], entity: Any) -> T:
+    # ORM entities keep their loaded columns in __dict__, mappings have none
+    values = getattr(entity, "__dict__", entity)
+    return entity_model.model_construct(
+        **{
+            name: values[name] if name in values else getattr(entity, name)
+            for name in fields
+        },
+    )
+
+
 def transform_entities(
-    entities: List[SQLModel],
+    entities: Iterable[Any],
     entity_model: Type[T],
+    trusted: bool = False,
 ) -> List[T]:
     """
     Transforms a list of entities into a list of instances of the specified entity model.
 
+    The whole list is validated in one call by a `TypeAdapter` cached per
+    model. With `trusted`, the models are built without any validation, only
+    for rows loaded from the database whose column types already match.
+
     Args:
-        entities (List[SQLModel]): The list of entities to transform.
+        entities (Iterable[Any]): The ORM entities or row mappings to transform.
         entity_model (Type[T]): The entity model class to use for transformation.
+        trusted (bool): Skip validation.
 
-    Returnsvedivedi:
+    Returns:
         List[T]: The list of transformed entities.
 
     """
-    return [entity_model.model_validate(entity) for entity in entities]
+    if trusted:
+        fields = _field_names(entity_model)
+        return [_construct(entity_model, fields, entity) for entity in entities]
+    return _list_adapter(entity_model).validate_python(
+        list(entities),
+        from_attributes=True,
+    )
 
 
 class UUIDModel(SQLModel):
@@ -54,6 +90,8 @@ class TimestampModel(SQLModel):
     created_at: datetime = Field(
         default_factory=datetime.utcnow,
         nullable=False,
+        # Backs the keyset pagination on (created_at, id)
+        index=True,
         sa_column_kwargs={
             "server_default": text("current_timestamp(0)"),
         },
@@ -64,7 +102,8 @@ class TimestampModel(SQLModel):
         nullable=False,
         sa_column_kwargs={
             "server_default": text("current_timestamp(0)"),
-            "onupdate": text("current_timestamp(0)"),
+            # Full precision, the ETags of two updates in one second differ
+            "onupdate": text("current_timestamp"),
         },
     )
 
@@ -80,7 +119,7 @@ class LogicalDeleteModel(SQLModel):
     )
 
 
-class TableBase(UUID, TimestampModel, LogicalDeleteModel):
+class TableBase(UUIDModel, TimestampModel, LogicalDeleteModel):
     """
     A base model class that includes a UUID primary key field,
     timestamp fields for creation and update times,
@@ -1,11 +1,19 @@
 """Import FastAPI and create an instance of the FastAPI class."""
 import logging
-from app.app import init_app
-import uvicorn
+import time
+
+_import_start = time.perf_counter()
+import uvicorn  # noqa: E402
+
+from app.app import init_app  # noqa: E402
+from app.utils.timing import startup_timings  # noqa: E402
+
+startup_timings.record("import", time.perf_counter() - _import_start)
 logger = logging.getLogger(__name__)
 
 app = init_app()
 
+
 def start():
     """Launched with `poetry run start` at root level"""
     uvicorn.run(
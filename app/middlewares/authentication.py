@@ -1,26 +1,129 @@
+""" Authentication of requests from the claims of their bearer token. """
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, Optional
+from uuid import UUID
+
+import jwt
 from fastapi import Depends, Request
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.main import app
-from app.services.user_services import get_user
-from app.utils.jwt import JWTBearer
+from app.models.sql.user import User
+from app.repository.user import UserRepository
+from app.utils.exceptions import AuthorizationException, ForbiddenException
+from app.utils.jwt import decode_verified
 from config.database import get_session
 
-# oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+@dataclass
+class Principal:
+    """
+    The authenticated caller, built from the verified token claims alone.
+
+    The `User` row is only read if `get_user` is called, once per request.
+
+    Attributes:
+        id (UUID): The user ID, the `sub` claim.
+        username (str): The `username` claim.
+        roles (FrozenSet[str]): The `roles` claim.
+        token_id (Optional[str]): The `jti` claim, to revoke the token.
+        expires_at (Optional[float]): The `exp` claim.
+    """
+
+    id: UUID
+    username: str
+    roles: FrozenSet[str] = frozenset()
+    token_id: Optional[str] = None
+    expires_at: Optional[float] = None
+    _user: Optional[User] = field(default=None, repr=False, compare=False)
+    _user_loaded: bool = field(default=False, repr=False, compare=False)
+
+    @classmethod
+    def from_claims(cls, claims: Dict[str, Any]) -> "Principal":
+        """
+        Raises:
+            ValueError: A claim is missing or malformed.
+        """
+        roles = claims.get("roles") or ()
+        if isinstance(roles, str):
+            roles = (roles,)
+        try:
+            return cls(
+                id=UUID(str(claims["sub"])),
+                username=str(claims["username"]),
+                roles=frozenset(roles),
+                token_id=claims.get("jti"),
+                expires_at=claims.get("exp"),
+            )
+        except (KeyError, TypeError) as exc:
+            raise ValueError("Invalid principal claims") from exc
+
+    def to_claims(self) -> Dict[str, Any]:
+        # The claims to sign in the tokens of this principal
+        return {
+            "sub": str(self.id),
+            "username": self.username,
+            "roles": sorted(self.roles),
+        }
+
+    def has_role(self, role: str) -> bool:
+        return role in self.roles
 
+    async def get_user(self, db_session: AsyncSession) -> Optional[User]:
+        if not self._user_loaded:
+            self._user = await UserRepository(db_session).get_by_id(self.id)
+            self._user_loaded = True
+        return self._user
 
-@app.middleware("http")
-async def auth_middleware(
+
+async def get_principal(
     request: Request,
-    call_next,
-    db_session=Depends(get_session),
-):
-    res = JWTBearer(request)
-    print(res)
-    # response = await validate_token(request)
-
-    request.state.current_user = await get_user(
-        user_id="sas",
-        db_session=db_session,
-    )
-    response = await call_next(request)
-    return response
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+) -> Principal:
+    """
+    Dependency returning the caller of the request, without any query.
+
+    Raises:
+        ForbiddenException: The bearer token is missing, invalid or expired.
+    """
+    if not credentials or credentials.scheme.lower() != "bearer":
+        raise ForbiddenException
+    try:
+        principal = Principal.from_claims(decode_verified(credentials.credentials))
+    except (jwt.InvalidTokenError, ValueError) as exc:
+        raise ForbiddenException from exc
+    request.state.principal = principal
+    return principal
+
+
+async def get_current_user(
+    principal: Principal = Depends(get_principal),
+    db_session: AsyncSession = Depends(get_session),
+) -> User:
+    """
+    Dependency returning the `User` row of the caller, for the handlers that
+    need more than the claims.
+
+    Raises:
+        AuthorizationException: The user was deleted since the token was issued.
+    """
+    user = await principal.get_user(db_session)
+    if user is None:
+        raise AuthorizationException
+    return user
+
+
+def require_roles(*roles: str) -> Callable[..., Any]:
+    """
+    Builds a dependency refusing callers without every one of `roles`, e.g.
+    `@router.post("/", dependencies=[Depends(require_roles("admin"))])`.
+    """
+
+    async def check_roles(principal: Principal = Depends(get_principal)) -> Principal:
+        if not principal.roles.issuperset(roles):
+            raise ForbiddenException
+        return principal
+
+    return check_roles
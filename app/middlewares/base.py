@@ -1,6 +1,11 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.middlewares.compression import CompressionMiddleware
+from app.middlewares.queries import QueryStatsMiddleware
+from app.middlewares.rate_limit import Budget, RateLimitMiddleware, bucket_store
+from config.settings import settings
+
 
 def add_middleware_base(app: FastAPI):
     """
@@ -19,3 +24,31 @@ def add_middleware_base(app: FastAPI):
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    app.add_middleware(
+        QueryStatsMiddleware,
+        headers=settings.db_query_headers,
+    )
+    if settings.compression_enabled:
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.compression_minimum_size,
+            exclude_paths=settings.compression_exclude_paths,
+        )
+    if settings.rate_limit_enabled:
+        # Outermost, refused requests cost as little as possible
+        app.add_middleware(
+            RateLimitMiddleware,
+            store=bucket_store,
+            login=Budget.per_minute(
+                "login",
+                settings.rate_limit_login_per_minute,
+                settings.rate_limit_login_burst,
+            ),
+            write=Budget.per_minute(
+                "write",
+                settings.rate_limit_write_per_minute,
+                settings.rate_limit_write_burst,
+            ),
+            login_paths=settings.rate_limit_login_paths,
+            forwarded_for=settings.rate_limit_forwarded_for,
+        )
@@ -0,0 +1,304 @@
+""" Response compression with Accept-Encoding negotiation. """
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from fastapi import Request
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config.settings import settings
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+# Scope state key set to False by `no_compression`
+COMPRESS_STATE = "compress"
+
+# Content types worth compressing, matched by prefix
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+
+class Compressor:
+    """Streaming encoder, `compress` output is decodable as soon as it is sent."""
+
+    def compress(self, data: bytes) -> bytes:
+        raise NotImplementedError()
+
+    def finish(self) -> bytes:
+        raise NotImplementedError()
+
+
+class GzipCompressor(Compressor):
+    def __init__(self, level: int) -> None:
+        self._encoder = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._encoder.compress(data) + self._encoder.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._encoder.flush(zlib.Z_FINISH)
+
+
+class BrotliCompressor(Compressor):
+    def __init__(self, quality: int) -> None:
+        self._encoder = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._encoder.process(data) + self._encoder.flush()
+
+    def finish(self) -> bytes:
+        return self._encoder.finish()
+
+
+class ZstdCompressor(Compressor):
+    def __init__(self, level: int) -> None:
+        self._encoder = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._encoder.compress(data) + self._encoder.flush(
+            zstandard.COMPRESSOBJ_FLUSH_BLOCK,
+        )
+
+    def finish(self) -> bytes:
+        return self._encoder.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+def available_encodings() -> Dict[str, Callable[[], Compressor]]:
+    """
+    Returns the supported encodings, most preferred first.
+
+    Returns:
+        Dict[str, Callable[[], Compressor]]: Compressor factories by encoding.
+    """
+    encodings: Dict[str, Callable[[], Compressor]] = {}
+    if zstandard is not None:
+        encodings["zstd"] = lambda: ZstdCompressor(settings.compression_zstd_level)
+    if brotli is not None:
+        encodings["br"] = lambda: BrotliCompressor(settings.compression_brotli_quality)
+    encodings["gzip"] = lambda: GzipCompressor(settings.compression_gzip_level)
+    return encodings
+
+
+def negotiate(accept_encoding: str, supported: Sequence[str]) -> Optional[str]:
+    """
+    Picks the encoding with the highest quality in `Accept-Encoding`, ties
+    broken by the order of `supported`.
+
+    Args:
+        accept_encoding (str): The request header, e.g. "gzip, br;q=0.8".
+        supported (Sequence[str]): The available encodings, preferred first.
+
+    Returns:
+        Optional[str]: The encoding, None to send the body as is.
+    """
+    qualities: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                continue
+        qualities[name.strip().lower()] = quality
+    wildcard = qualities.get("*", 0.0)
+    candidates = [
+        (qualities.get(name, wildcard), -index, name)
+        for index, name in enumerate(supported)
+    ]
+    quality, _, name = max(candidates, default=(0.0, 0, None))
+    return name if quality > 0 else None
+
+
+@dataclass
+class CompressionMetrics:
+    """
+    Process-wide compression counters.
+
+    Attributes:
+        responses (Dict[str, int]): Compressed responses per encoding.
+        skipped (int): Responses sent as is, too small or not compressible.
+        bytes_in (int): Body bytes before compression.
+        bytes_out (int): Body bytes after compression.
+    """
+
+    responses: Dict[str, int] = field(default_factory=dict)
+    skipped: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "responses": dict(self.responses),
+            "skipped": self.skipped,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "bytes_saved": self.bytes_in - self.bytes_out,
+            "ratio": round(self.bytes_out / self.bytes_in if self.bytes_in else 1.0, 4),
+        }
+
+
+metrics = CompressionMetrics()
+
+
+def get_compression_stats() -> Dict[str, Any]:
+    return metrics.as_dict()
+
+
+def no_compression(request: Request) -> None:
+    """
+    Dependency that sends the response of a route uncompressed, e.g.
+    `@router.get("/", dependencies=[Depends(no_compression)])`.
+    """
+    request.state.compress = False
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses with zstd, brotli or gzip, whichever the client
+    prefers among the installed ones.
+
+    Bodies smaller than `minimum_size` are sent as is. Streaming bodies are
+    compressed chunk by chunk and flushed, so each chunk reaches the client
+    without waiting for the end of the stream.
+
+    Args:
+        app (ASGIApp): The wrapped application.
+        minimum_size (int): Smallest body, in bytes, worth compressing.
+        exclude_paths (Sequence[str]): Path prefixes never compressed.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        exclude_paths: Sequence[str] = (),
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.exclude_paths = tuple(exclude_paths)
+        self.encodings = available_encodings()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(
+            Headers(scope=scope).get("accept-encoding", ""),
+            list(self.encodings),
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressionResponder(
+            scope,
+            send,
+            encoding,
+            self.encodings[encoding],
+            self.minimum_size,
+        )
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(
+        self,
+        scope: Scope,
+        send: Send,
+        encoding: str,
+        factory: Callable[[], Compressor],
+        minimum_size: int,
+    ) -> None:
+        self.scope = scope
+        self._send = send
+        self.encoding = encoding
+        self.factory = factory
+        self.minimum_size = minimum_size
+        self.start: Optional[Message] = None
+        self.compressor: Optional[Compressor] = None
+        self.passthrough = False
+        # Chunks held back until the body is known to reach `minimum_size`
+        self.pending: List[bytes] = []
+        self.pending_size = 0
+
+    async def send(self, message: Message) -> None:
+        if self.passthrough:
+            await self._send(message)
+            return
+        if message["type"] == "http.response.start":
+            self.start = message
+            if not self._compressible(MutableHeaders(raw=message["headers"])):
+                await self._skip()
+            return
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.compressor is None:
+            self.pending.append(body)
+            self.pending_size += len(body)
+            if self.pending_size < self.minimum_size:
+                if not more_body:
+                    await self._skip()
+                return
+            await self._begin()
+            body, self.pending = b"".join(self.pending), []
+
+        metrics.bytes_in += len(body)
+        chunk = self.compressor.compress(body) if body else b""
+        if not more_body:
+            chunk += self.compressor.finish()
+        metrics.bytes_out += len(chunk)
+        await self._send(
+            {"type": "http.response.body", "body": chunk, "more_body": more_body},
+        )
+
+    def _compressible(self, headers: MutableHeaders) -> bool:
+        state = self.scope.get("state") or {}
+        content_type = headers.get("content-type", "")
+        return (
+            state.get(COMPRESS_STATE, True)
+            and self.start["status"] not in (204, 304)
+            and "content-encoding" not in headers
+            and "no-transform" not in headers.get("cache-control", "")
+            and content_type.startswith(COMPRESSIBLE_TYPES)
+        )
+
+    async def _skip(self) -> None:
+        metrics.skipped += 1
+        self.passthrough = True
+        await self._send(self.start)
+        if self.pending:
+            await self._send(
+                {"type": "http.response.body", "body": b"".join(self.pending)},
+            )
+
+    async def _begin(self) -> None:
+        headers = MutableHeaders(raw=self.start["headers"])
+        del headers["content-length"]
+        headers["content-encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        # The compressed bytes differ, a strong validator would be wrong
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["etag"] = f"W/{etag}"
+        metrics.responses[self.encoding] = metrics.responses.get(self.encoding, 0) + 1
+        self.compressor = self.factory()
+        await self._send(self.start)
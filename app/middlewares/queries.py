@@ -0,0 +1,40 @@
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config.instrumentation import current_request, end_request, start_request
+
+
+class QueryStatsMiddleware:
+    """
+    Collects the SQL queries executed by each request.
+
+    With `headers` enabled the query count and time are added to the response
+    as `X-DB-Query-Count` and `X-DB-Query-Time-Ms`.
+    """
+
+    def __init__(self, app: ASGIApp, headers: bool = False) -> None:
+        self.app = app
+        self.headers = headers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                queries = current_request()
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-db-query-count", str(queries.count).encode()),
+                    (
+                        b"x-db-query-time-ms",
+                        f"{queries.total_seconds * 1000:.2f}".encode(),
+                    ),
+                ]
+            await send(message)
+
+        token = start_request()
+        try:
+            await self.app(scope, receive, send_with_headers if self.headers else send)
+        finally:
+            end_request(token)
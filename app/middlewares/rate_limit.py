@@ -0,0 +1,365 @@
+""" Token bucket rate limiting of logins and write requests. """
+import json
+import logging
+import math
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.utils.resp import RespClient, RespError
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+WRITE_METHODS = frozenset(("POST", "PUT", "PATCH", "DELETE"))
+
+# Login bodies are tiny, larger ones are not parsed for a username
+MAX_LOGIN_BODY = 16 * 1024
+
+
+@dataclass(frozen=True)
+class Budget:
+    """
+    Token bucket parameters.
+
+    Attributes:
+        name (str): Prefix of the bucket keys, e.g. "login".
+        rate (float): Tokens added per second.
+        burst (int): Bucket capacity, requests allowed at once.
+    """
+
+    name: str
+    rate: float
+    burst: int
+
+    @classmethod
+    def per_minute(cls, name: str, requests: float, burst: int) -> "Budget":
+        return cls(name=name, rate=requests / 60, burst=burst)
+
+
+@dataclass
+class RateLimitMetrics:
+    """
+    Process-wide rate limiting counters.
+
+    Attributes:
+        allowed (Dict[str, int]): Requests let through per budget.
+        limited (Dict[str, int]): Requests refused with a 429 per budget.
+        errors (int): Shared backend failures, the requests were let through.
+    """
+
+    allowed: Dict[str, int] = field(default_factory=dict)
+    limited: Dict[str, int] = field(default_factory=dict)
+    errors: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "allowed": dict(self.allowed),
+            "limited": dict(self.limited),
+            "errors": self.errors,
+        }
+
+
+metrics = RateLimitMetrics()
+
+
+class BucketStore(ABC):
+    """Holds the token buckets, keyed by budget and client."""
+
+    name: str
+
+    @abstractmethod
+    async def take(self, key: str, budget: Budget) -> float:
+        """
+        Takes one token from the bucket of `key`.
+
+        Args:
+            key (str): The bucket key, e.g. "login:ip:10.0.0.1".
+            budget (Budget): The bucket parameters.
+
+        Returns:
+            float: 0 if a token was taken, otherwise the seconds until one is
+            available.
+        """
+        raise NotImplementedError()
+
+    async def close(self) -> None:
+        pass
+
+    def info(self) -> Dict[str, Any]:
+        return {"backend": self.name}
+
+
+class MemoryBucketStore(BucketStore):
+    """
+    Per-process buckets, split in shards by key hash.
+
+    Each shard keeps at most `max_keys / shards` buckets and drops the least
+    recently used one past that, so a flood of distinct clients costs a
+    bounded amount of memory and only recycles the buckets of its own shard.
+    A dropped bucket starts full again.
+
+    Args:
+        shards (int): The number of shards.
+        max_keys (int): The maximum number of buckets over all the shards.
+    """
+
+    name = "memory"
+
+    def __init__(self, shards: int = 16, max_keys: int = 100_000) -> None:
+        self.max_keys_per_shard = max(1, max_keys // shards)
+        # Bucket key -> (tokens, last refill on the monotonic clock)
+        self._shards: List[OrderedDict[str, Tuple[float, float]]] = [
+            OrderedDict() for _ in range(shards)
+        ]
+        self.evictions = 0
+
+    def _shard(self, key: str) -> OrderedDict:
+        # crc32 is stable across processes, unlike the salted str hash
+        return self._shards[zlib.crc32(key.encode()) % len(self._shards)]
+
+    async def take(self, key: str, budget: Budget) -> float:
+        shard = self._shard(key)
+        now = time.monotonic()
+        tokens, updated_at = shard.get(key, (budget.burst, now))
+        tokens = min(budget.burst, tokens + (now - updated_at) * budget.rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / budget.rate
+        shard[key] = (tokens, now)
+        shard.move_to_end(key)
+        if len(shard) > self.max_keys_per_shard:
+            shard.popitem(last=False)
+            self.evictions += 1
+        return wait
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            **super().info(),
+            "buckets": sum(len(shard) for shard in self._shards),
+            "shards": len(self._shards),
+            "evictions": self.evictions,
+        }
+
+
+# Refills and takes a token atomically on the server clock, returns the wait
+# as a string since Lua numbers are truncated to integers in replies
+REFILL_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or burst
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000))
+return tostring(wait)
+"""
+
+
+class RedisBucketStore(BucketStore):
+    """
+    Buckets shared by every worker through a Redis compatible server.
+
+    When the server cannot be reached requests are let through, the limiter
+    never takes the API down with it.
+
+    Args:
+        client (RespClient): The server connection pool.
+        prefix (str): Prepended to every key.
+    """
+
+    name = "redis"
+
+    def __init__(self, client: RespClient, prefix: str = "") -> None:
+        self.client = client
+        self.prefix = prefix
+
+    async def take(self, key: str, budget: Budget) -> float:
+        try:
+            wait = await self.client.execute(
+                "EVAL",
+                REFILL_SCRIPT,
+                1,
+                f"{self.prefix}ratelimit:{key}",
+                budget.rate,
+                budget.burst,
+            )
+        except (OSError, RespError, TimeoutError):
+            metrics.errors += 1
+            logger.warning("Rate limit check failed", exc_info=True)
+            return 0.0
+        return float(wait)
+
+    async def close(self) -> None:
+        await self.client.close()
+
+
+def build_bucket_store() -> BucketStore:
+    """
+    Builds the store selected by `settings.rate_limit_backend`.
+
+    Returns:
+        BucketStore: The token buckets.
+    """
+    if settings.rate_limit_backend == "redis":
+        return RedisBucketStore(
+            RespClient(
+                settings.cache_redis_url,
+                pool_size=settings.cache_redis_pool_size,
+                timeout=settings.cache_redis_timeout,
+            ),
+            prefix=settings.cache_key_prefix,
+        )
+    return MemoryBucketStore(
+        shards=settings.rate_limit_shards,
+        max_keys=settings.rate_limit_max_keys,
+    )
+
+
+bucket_store = build_bucket_store()
+
+
+def get_rate_limit_stats() -> Dict[str, Any]:
+    return {**bucket_store.info(), **metrics.as_dict()}
+
+
+def client_ip(scope: Scope, forwarded_for: bool = False) -> str:
+    """
+    Returns the address of the client.
+
+    Args:
+        scope (Scope): The request scope.
+        forwarded_for (bool): Trust the last `X-Forwarded-For` entry, the one
+            added by the reverse proxy in front of the application.
+
+    Returns:
+        str: The client IP address, "unknown" if the server does not know it.
+    """
+    if forwarded_for:
+        forwarded = Headers(scope=scope).get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[-1].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def login_username(body: bytes) -> Optional[str]:
+    # Normalized like the login controller does
+    try:
+        username = json.loads(body).get("username")
+    except (ValueError, AttributeError):
+        return None
+    return username.lower().strip() if isinstance(username, str) else None
+
+
+class RateLimitMiddleware:
+    """
+    Refuses requests over budget with a 429 and a `Retry-After` header.
+
+    Logins are limited per client IP and per username, so that neither a
+    single client nor a distributed attack on one account can keep the
+    password hashing busy. Other write requests are limited per client IP
+    with their own, larger, budget. Reads are never limited.
+
+    Args:
+        app (ASGIApp): The wrapped application.
+        store (BucketStore): Where the buckets are kept.
+        login (Budget): The budget of the login paths.
+        write (Budget): The budget of the other write requests.
+        login_paths (Sequence[str]): The login endpoints.
+        forwarded_for (bool): Take the client IP from `X-Forwarded-For`.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        store: BucketStore,
+        login: Budget,
+        write: Budget,
+        login_paths: Sequence[str] = (),
+        forwarded_for: bool = False,
+    ) -> None:
+        self.app = app
+        self.store = store
+        self.login = login
+        self.write = write
+        self.login_paths = frozenset(path.rstrip("/") for path in login_paths)
+        self.forwarded_for = forwarded_for
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in WRITE_METHODS:
+            await self.app(scope, receive, send)
+            return
+        ip = client_ip(scope, self.forwarded_for)
+        if scope["path"].rstrip("/") in self.login_paths:
+            budget = self.login
+            keys = [f"{budget.name}:ip:{ip}"]
+            body, receive = await self._buffer(receive)
+            username = login_username(body) if body is not None else None
+            if username:
+                keys.append(f"{budget.name}:user:{username}")
+        else:
+            budget = self.write
+            keys = [f"{budget.name}:ip:{ip}"]
+
+        wait = max([await self.store.take(key, budget) for key in keys])
+        if wait > 0:
+            metrics.limited[budget.name] = metrics.limited.get(budget.name, 0) + 1
+            await self._reject(send, wait)
+            return
+        metrics.allowed[budget.name] = metrics.allowed.get(budget.name, 0) + 1
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    async def _buffer(receive: Receive) -> Tuple[Optional[bytes], Receive]:
+        # Reads the body ahead of the application, then replays it
+        messages: List[Message] = []
+        size = 0
+        while True:
+            message = await receive()
+            messages.append(message)
+            if message["type"] != "http.request":
+                break
+            size += len(message.get("body", b""))
+            if not message.get("more_body", False) or size > MAX_LOGIN_BODY:
+                break
+
+        async def replay() -> Message:
+            return messages.pop(0) if messages else await receive()
+
+        if size > MAX_LOGIN_BODY or messages[-1]["type"] != "http.request":
+            return None, replay
+        return b"".join(message.get("body", b"") for message in messages), replay
+
+    @staticmethod
+    async def _reject(send: Send, wait: float) -> None:
+        body = b'{"detail":"Too many requests"}'
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(math.ceil(wait)).encode()),
+                ],
+            },
+        )
+        await send({"type": "http.response.body", "body": body})
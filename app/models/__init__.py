@@ -1,2 +1,5 @@
+from .bulk import BulkItemResult, BulkResult  # noqa: F401
+from .page import Page  # noqa: F401
 from .profile import ProfileSchema  # noqa: F401
+from .token import AccessToken  # noqa: F401
 from .user import UserSchema  # noqa: F401
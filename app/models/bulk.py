@@ -0,0 +1,26 @@
+""" Bulk operation result models. """
+from typing import List, Literal, Optional
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class BulkItemResult(BaseModel):
+    """
+    The outcome of one item of a bulk request.
+
+    Attributes:
+        index (int): The position of the item in the request payload.
+        id (Optional[UUID]): The ID of the affected entity.
+        status (str): What happened to the item.
+    """
+
+    index: int
+    id: Optional[UUID] = None
+    status: Literal["created", "updated", "deleted", "not_found"]
+
+
+class BulkResult(BaseModel):
+    """Per-item results of a bulk request, in payload order."""
+
+    results: List[BulkItemResult]
@@ -0,0 +1,19 @@
+""" Paginated response model. """
+from typing import Generic, List, Optional, TypeVar
+
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    """
+    A page of results.
+
+    Attributes:
+        items (List[T]): The results of the page.
+        next_cursor (Optional[str]): The cursor of the next page, None on the last one.
+    """
+
+    items: List[T]
+    next_cursor: Optional[str] = None
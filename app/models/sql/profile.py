@@ -1,9 +1,16 @@
 """ SQLModel for the Profile model. """
+from typing import TYPE_CHECKING, Any, Optional
+from uuid import UUID
 
-from sqlmodel import Field, SQLModel
+from pydantic import field_validator
+from sqlalchemy import Index, text
+from sqlmodel import Field, Relationship, SQLModel
 
 from app.core.models import TableBase, UUIDModel
 
+if TYPE_CHECKING:
+    from app.models.sql.user import User
+
 
 class ProfileBase(SQLModel):
     """Base model for a profile."""
@@ -17,6 +24,23 @@ class ProfileIn(ProfileBase):
     """Model for creating a profile."""
 
 
+class ProfileBulkUpdate(SQLModel):
+    """Model for updating a profile in a batch, unset fields are kept."""
+
+    id: UUID
+    name: Optional[str] = None
+    description: Optional[str] = None
+    favorite: Optional[bool] = None
+
+    @field_validator("name", "description", "favorite")
+    @classmethod
+    def not_null(cls, value: Any) -> Any:
+        # Only run on values sent by the client, the columns are NOT NULL
+        if value is None:
+            raise ValueError("may be omitted but not null")
+        return value
+
+
 class ProfileOut(ProfileBase, UUIDModel):
     """Model for reading a profile."""
 
@@ -33,5 +57,32 @@ class Profile(ProfileBase, TableBase, table=True):
     """
 
     __tablename__ = "profiles"
+    # Partial indexes on the rows visible through the soft-delete criteria
+    __table_args__ = (
+        Index(
+            "ix_profiles_user_id_enabled",
+            "user_id",
+            postgresql_where=text("enabled"),
+        ),
+        Index(
+            "ix_profiles_created_at_id_enabled",
+            "created_at",
+            "id",
+            postgresql_where=text("enabled"),
+        ),
+        # Backs the archival of soft-deleted rows
+        Index(
+            "ix_profiles_updated_at_disabled",
+            "updated_at",
+            postgresql_where=text("NOT enabled"),
+        ),
+        Index(
+            "ix_profiles_user_id_favorite",
+            "user_id",
+            postgresql_where=text("favorite"),
+        ),
+    )
     user_id: str = Field(foreign_key="users.id")
     favorite: bool = Field(default=False)
+    # Relationship with the User model
+    user: Optional["User"] = Relationship(back_populates="profiles")
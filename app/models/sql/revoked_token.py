@@ -0,0 +1,32 @@
+""" SQLModel for the revoked token model. """
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import BigInteger, Column, text
+from sqlmodel import Field, SQLModel
+
+
+class RevokedToken(SQLModel, table=True):
+    """
+    A token refused until it expires, whatever its signature.
+
+    Attributes:
+        id (int): Increasing sequence, lets the workers read only new rows.
+        jti (str): The `jti` claim of the token.
+        expires_at (datetime): The `exp` claim, the row is useless past it.
+        revoked_at (datetime): When the token was revoked.
+    """
+
+    __tablename__ = "revoked_tokens"
+
+    id: Optional[int] = Field(
+        default=None,
+        sa_column=Column(BigInteger, primary_key=True, autoincrement=True),
+    )
+    jti: str = Field(unique=True, nullable=False)
+    expires_at: datetime = Field(nullable=False, index=True)
+    revoked_at: datetime = Field(
+        default_factory=datetime.utcnow,
+        nullable=False,
+        sa_column_kwargs={"server_default": text("current_timestamp(0)")},
+    )
@@ -1,16 +1,17 @@
 from typing import Any, Dict, List, Optional, Set
 
 from pydantic import EmailStr
-from sqlmodel import Field, Relationship, SQLModel
+from sqlalchemy import Index, text
+from sqlmodel import AutoString, Field, Relationship, SQLModel
 
 from app.core.models import TableBase, UUIDModel
-from app.models.sql.profile import Profile
+from app.models.sql.profile import Profile, ProfileOut
 
 
 class UserBase(SQLModel):
     """Base model for a user."""
 
-    username: EmailStr = Field(unique=True)
+    username: EmailStr = Field(unique=True, sa_type=AutoString)
 
 
 class UserIn(UserBase):
@@ -23,6 +24,13 @@ class UserOut(UserBase, UUIDModel):
     """Model for reading a user."""
 
 
+class UserWithProfiles(UserOut):
+    """Model for reading a user with its profiles embedded."""
+
+    profiles: List[ProfileOut] = []
+    favorite_profiles: List[ProfileOut] = []
+
+
 class User(UserBase, TableBase, table=True):
     """
     Represents a user in the system.
@@ -37,6 +45,26 @@ class User(UserBase, TableBase, table=True):
 
     # The table name in the database
     __tablename__ = "users"
+    # Partial indexes on the rows visible through the soft-delete criteria
+    __table_args__ = (
+        Index(
+            "ix_users_username_enabled",
+            "username",
+            postgresql_where=text("enabled"),
+        ),
+        Index(
+            "ix_users_created_at_id_enabled",
+            "created_at",
+            "id",
+            postgresql_where=text("enabled"),
+        ),
+        # Backs the archival of soft-deleted rows
+        Index(
+            "ix_users_updated_at_disabled",
+            "updated_at",
+            postgresql_where=text("NOT enabled"),
+        ),
+    )
     password: str = Field()
     # Relationship with the Profile model
     profiles: List[Profile] = Relationship(back_populates="user")
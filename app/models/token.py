@@ -0,0 +1,19 @@
+""" Access token models. """
+from typing import Literal
+
+from pydantic import BaseModel
+
+
+class AccessToken(BaseModel):
+    """
+    The bearer token issued at login.
+
+    Attributes:
+        access_token (str): The signed token, with the principal claims.
+        token_type (str): Always "bearer".
+        expires_in (int): Seconds until the token expires.
+    """
+
+    access_token: str
+    token_type: Literal["bearer"] = "bearer"  # noqa: S105
+    expires_in: int
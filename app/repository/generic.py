@@ -1,13 +1,35 @@
 from abc import ABC, abstractmethod
-from typing import Generic, List, Optional, Type, TypeVar, Union
+from datetime import datetime
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Generic,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 from uuid import UUID
 
-from sqlmodel import SQLModel, and_, select
+from sqlalchemy.orm import make_transient_to_detached
+from sqlmodel import SQLModel, and_, insert, select, tuple_
 from sqlmodel import update as update_sql
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel.sql.expression import SelectOfScalar
 
 from app.core.models import TableBase
+from app.utils.cache import (
+    dump_entity,
+    entity_cache,
+    entity_key,
+    entity_loads,
+    load_entity,
+)
+from app.utils.pagination import decode_cursor, encode_cursor
+from config.settings import settings
 
 T = TypeVar("T", bound=TableBase)
 U = TypeVar("U", bound=SQLModel)
@@ -52,6 +74,81 @@ class GenericRepository(Generic[T, U], ABC):
         """
         raise NotImplementedError()
 
+    @abstractmethod
+    async def paginate(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        **filters,
+    ) -> Tuple[List[T], Optional[str]]:
+        """
+        List a page of models ordered by creation time.
+
+        Args:
+            limit (int): The maximum number of models, capped at `page_size_max`.
+            cursor (Optional[str]): The cursor returned with the previous page.
+            **filters: Additional filters to apply to the query.
+
+        Raises:
+            ValueError: Invalid cursor.
+
+        Returns:
+            Tuple[List[T], Optional[str]]: The models and the cursor of the next
+            page, None when there are no more models.
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def get_updated_at(self, model_id: Union[str, UUID]) -> Optional[datetime]:
+        """
+        Get the last update time of a model without loading it.
+
+        Args:
+            model_id (Union[str, UUID]): The ID of the model.
+
+        Returns:
+            Optional[datetime]: The `updated_at` of the model, None if not found.
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def page_versions(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        **filters,
+    ) -> List[Tuple[UUID, datetime]]:
+        """
+        List the `(id, updated_at)` of the models `paginate` would return, plus
+        the first model of the next page.
+
+        Args:
+            limit (int): The maximum number of models, capped at `page_size_max`.
+            cursor (Optional[str]): The cursor returned with the previous page.
+            **filters: Additional filters to apply to the query.
+
+        Raises:
+            ValueError: Invalid cursor.
+
+        Returns:
+            List[Tuple[UUID, datetime]]: At most `limit + 1` versions.
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def stream(self, fetch_size: int, **filters) -> AsyncIterator[T]:
+        """
+        Iterate over the models without loading them all in memory.
+
+        Args:
+            fetch_size (int): The number of rows fetched per round trip.
+            **filters: Additional filters to apply to the query.
+
+        Returns:
+            AsyncIterator[T]: The models that match the filters.
+        """
+        raise NotImplementedError()
+
     @abstractmethod
     async def add(self, record: Type[U]) -> T:
         """
@@ -92,8 +189,55 @@ class GenericRepository(Generic[T, U], ABC):
         """
         raise NotImplementedError()
 
+    @abstractmethod
+    async def add_many(self, records: List[U]) -> List[T]:
+        """
+        Add several models in a single statement, without committing.
+
+        Args:
+            records (List[U]): The models to add.
+
+        Returns:
+            List[T]: The added models, in the order of `records`.
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def update_many(self, records: List[Dict[str, Any]]) -> List[UUID]:
+        """
+        Update several models by primary key, without committing.
+
+        The caller invalidates the cached rows once it has committed.
+
+        Args:
+            records (List[Dict[str, Any]]): The `id` and new values of each model.
+
+        Returns:
+            List[UUID]: The IDs of the updated models.
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def delete_many(self, model_ids: List[UUID]) -> List[UUID]:
+        """
+        Delete several models in a single statement, without committing.
+
+        The caller invalidates the cached rows once it has committed.
+
+        Args:
+            model_ids (List[UUID]): The IDs of the models to delete.
+
+        Returns:
+            List[UUID]: The IDs of the deleted models.
+        """
+        raise NotImplementedError()
+
 
 class GenericSqlRepository(GenericRepository[T, U], ABC):
+    # False for rows holding secrets, they are then only cached in process and
+    # never written to a cache backend shared with other processes
+    cache_shared: bool = True
+
     def __init__(self, session: AsyncSession, model_cls: T) -> None:
         self._session = session
         self._model_cls = model_cls
@@ -108,10 +252,8 @@ class GenericSqlRepository(GenericRepository[T, U], ABC):
         Returns:
             SelectOfScalar: The constructed SQL statement.
         """
-        stmt = select(self._model_cls).where(
-            self._model_cls.id == model_id,
-            self._model_cls.enabled is True,
-        )
+        # Soft-deleted rows are filtered by the session, see `apply_soft_delete`
+        stmt = select(self._model_cls).where(self._model_cls.id == model_id)
         return stmt
 
     async def get_by_id(self, model_id: str) -> Optional[T]:
@@ -125,18 +267,70 @@ class GenericSqlRepository(GenericRepository[T, U], ABC):
             Optional[T]: The retrieved model, or None if not found.
         """
         stmt = self._construct_get_stmt(model_id)
-        return await self._session.exec(stmt).first()
+        return await self._read_through(self._cache_key("id", model_id), stmt)
 
-    async def _construct_list_stmt(self, **filters) -> SelectOfScalar:
+    def _cache_key(self, field: str, value: Any) -> str:
+        return entity_key(self._model_cls, field, value)
+
+    @property
+    def _cache_enabled(self) -> bool:
+        return settings.cache_enabled and (self.cache_shared or not entity_cache.shared)
+
+    async def _read_through(self, key: str, stmt: SelectOfScalar) -> Optional[T]:
+        """
+        Returns the entity cached at `key`, or loads it with `stmt` and caches
+        it. Concurrent misses of the same key share a single query.
+        """
+        if not self._cache_enabled:
+            return (await self._session.exec(stmt)).first()
+        data = await entity_cache.get(key)
+        if data is None:
+            data = await entity_loads.do(key, lambda: self._load(key, stmt))
+        if data is None:
+            return None
+        record = load_entity(self._model_cls, data)
+        # Attach the cached row to the session without querying it
+        make_transient_to_detached(record)
+        return await self._session.merge(record, load=False)
+
+    async def _load(self, key: str, stmt: SelectOfScalar) -> Optional[bytes]:
+        # Registered before the query, a write committed while it runs
+        # invalidates the key and the row read is then not cached
+        version = entity_cache.begin_load(key)
+        data = None
+        try:
+            record = (await self._session.exec(stmt)).first()
+            if record is not None:
+                data = dump_entity(record)
+        finally:
+            await entity_cache.end_load(key, version, data)
+        return data
+
+    async def invalidate(self, *model_ids: Union[str, UUID]) -> None:
+        """
+        Drops the cached rows of `model_ids`, to call once the change committed.
+
+        Invalidating before the commit lets a concurrent read cache the old
+        row again until its TTL expires.
+        """
+        await entity_cache.delete(
+            *(self._cache_key("id", model_id) for model_id in model_ids),
+        )
+
+    def _construct_list_stmt(self, *columns, **filters) -> SelectOfScalar:
         """Creates a SELECT query for retrieving a multiple records.
 
+        Args:
+            *columns: The selected columns, the whole model by default.
+            **filters: Column values the records must match.
+
         Raises:
             ValueError: Invalid column name.
 
         Returns:
             SelectOfScalar: SELECT statement.
         """
-        stmt = select(self._model_cls)
+        stmt = select(*columns) if columns else select(self._model_cls)
         where_clauses = []
         for c, v in filters.items():
             if not hasattr(self._model_cls, c):
@@ -150,8 +344,94 @@ class GenericSqlRepository(GenericRepository[T, U], ABC):
         return stmt
 
     async def list(self, **filters) -> List[T]:
-        stmt = self._construct_list_stmt(**{**filters, "enabled": True})
-        return await self._session.exec(stmt).all()
+        stmt = self._construct_list_stmt(**filters)
+        return (await self._session.exec(stmt)).all()
+
+    async def paginate(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        **filters,
+    ) -> Tuple[List[T], Optional[str]]:
+        """
+        Lists a page of models using keyset pagination on `(created_at, id)`.
+
+        Args:
+            limit (int): The maximum number of models, capped at `page_size_max`.
+            cursor (Optional[str]): The cursor returned with the previous page.
+            **filters: Additional filters to apply to the query.
+
+        Raises:
+            ValueError: Invalid cursor or column name.
+
+        Returns:
+            Tuple[List[T], Optional[str]]: The models and the cursor of the next page.
+        """
+        limit = min(limit, settings.page_size_max)
+        stmt = self._construct_page_stmt(
+            self._construct_list_stmt(**filters),
+            limit,
+            cursor,
+        )
+        records = (await self._session.exec(stmt)).all()
+        if len(records) <= limit:
+            return records, None
+        last = records[limit - 1]
+        return records[:limit], encode_cursor(last.created_at, last.id)
+
+    def _construct_page_stmt(
+        self,
+        stmt: SelectOfScalar,
+        limit: int,
+        cursor: Optional[str],
+    ) -> SelectOfScalar:
+        sort_key = (self._model_cls.created_at, self._model_cls.id)
+        if cursor:
+            stmt = stmt.where(tuple_(*sort_key) > decode_cursor(cursor))
+        # One extra row tells whether there is a next page
+        return stmt.order_by(*sort_key).limit(limit + 1)
+
+    async def get_updated_at(self, model_id: Union[str, UUID]) -> Optional[datetime]:
+        stmt = select(self._model_cls.updated_at).where(self._model_cls.id == model_id)
+        return (await self._session.exec(stmt)).first()
+
+    async def page_versions(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        **filters,
+    ) -> List[Tuple[UUID, datetime]]:
+        limit = min(limit, settings.page_size_max)
+        stmt = self._construct_page_stmt(
+            self._construct_list_stmt(
+                self._model_cls.id,
+                self._model_cls.updated_at,
+                **filters,
+            ),
+            limit,
+            cursor,
+        )
+        return [tuple(row) for row in (await self._session.exec(stmt)).all()]
+
+    async def stream(self, fetch_size: int, **filters) -> AsyncIterator[T]:
+        """
+        Iterates over the models through a server-side cursor.
+
+        Args:
+            fetch_size (int): The number of rows fetched per round trip.
+            **filters: Additional filters to apply to the query.
+
+        Yields:
+            T: The models ordered by `(created_at, id)`.
+        """
+        stmt = self._construct_list_stmt(**filters)
+        stmt = stmt.order_by(self._model_cls.created_at, self._model_cls.id)
+        records = await self._session.stream_scalars(
+            stmt,
+            execution_options={"yield_per": fetch_size},
+        )
+        async for record in records:
+            yield record
 
     async def add(self, record: T) -> T:
         self._session.add(record)
@@ -167,21 +447,72 @@ class GenericSqlRepository(GenericRepository[T, U], ABC):
     ) -> T:
         query = (
             update_sql(self._model_cls)
-            .where(self._model_cls.id == model_id)
+            .where(
+                self._model_cls.id == model_id,
+                self._model_cls.enabled == True,  # noqa: E712
+            )
             .values(**record.model_dump())
             .returning(self._model_cls)
         )
-        record = await self._session.exec(query).first()
+        record = (await self._session.exec(query)).scalars().first()
         await self._session.commit()
+        await self.invalidate(model_id)
         return record
 
     async def delete(self, model_id: Union[int, str, UUID]) -> bool:
         query = (
             update_sql(self._model_cls)
-            .where(self._model_cls.id == model_id)
+            .where(
+                self._model_cls.id == model_id,
+                self._model_cls.enabled == True,  # noqa: E712
+            )
             .values(enabled=False)
-            .returning(self._model_cls)
+            .returning(self._model_cls.id)
         )
-        res = self._session.exec(query)
+        res = (await self._session.exec(query)).scalars().first()
         await self._session.commit()
+        await self.invalidate(model_id)
         return res is not None
+
+    async def add_many(self, records: List[U]) -> List[T]:
+        # A single INSERT ... VALUES (...), (...) RETURNING, paged by the driver
+        query = insert(self._model_cls).returning(
+            self._model_cls,
+            sort_by_parameter_order=True,
+        )
+        result = await self._session.exec(
+            query,
+            params=[record.model_dump() for record in records],
+            execution_options={
+                "insertmanyvalues_page_size": settings.bulk_chunk_size,
+            },
+        )
+        return result.scalars().all()
+
+    async def update_many(self, records: List[Dict[str, Any]]) -> List[UUID]:
+        query = select(self._model_cls.id).where(
+            self._model_cls.id.in_([record["id"] for record in records]),
+        )
+        existing = set((await self._session.exec(query)).all())
+        records = [record for record in records if record["id"] in existing]
+        if records:
+            # ORM bulk UPDATE by primary key, sent as one executemany
+            await self._session.exec(
+                update_sql(self._model_cls),
+                params=records,
+                execution_options={"synchronize_session": False},
+            )
+        return [record["id"] for record in records]
+
+    async def delete_many(self, model_ids: List[UUID]) -> List[UUID]:
+        query = (
+            update_sql(self._model_cls)
+            .where(
+                self._model_cls.id.in_(model_ids),
+                self._model_cls.enabled == True,  # noqa: E712
+            )
+            .values(enabled=False)
+            .returning(self._model_cls.id)
+            .execution_options(synchronize_session=False)
+        )
+        return (await self._session.exec(query)).scalars().all()
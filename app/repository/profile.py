@@ -1,12 +1,17 @@
-from abc import ABC
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Dict, List
 
+from sqlalchemy import String, any_, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.models.sql.profile import Profile
+from app.models.sql.profile import Profile, ProfileIn
 from app.repository.generic import GenericRepository, GenericSqlRepository
 
 
-class ProfileBaseRepository(GenericRepository[Profile], ABC):
+class ProfileBaseRepository(GenericRepository[Profile, ProfileIn], ABC):
     """
     Repository class for managing profiles in the database.
 
@@ -17,8 +22,24 @@ class ProfileBaseRepository(GenericRepository[Profile], ABC):
         session (AsyncSession): The async session object for database operations.
     """
 
+    @abstractmethod
+    async def list_by_user_ids(self, user_ids: List[str]) -> Dict[str, List[Profile]]:
+        """Retrieve the profiles of several users at once.
 
-class ProfileRepository(GenericSqlRepository[Profile], ProfileBaseRepository):
+        Args:
+            user_ids (List[str]): The IDs of the users.
+
+        Returns:
+            Dict[str, List[Profile]]: The profiles grouped by user ID, users
+            without profiles are missing.
+        """
+        raise NotImplementedError()
+
+
+class ProfileRepository(
+    GenericSqlRepository[Profile, ProfileIn],
+    ProfileBaseRepository,
+):
     """
     Repository class for managing profiles in the database.
 
@@ -31,3 +52,18 @@ class ProfileRepository(GenericSqlRepository[Profile], ProfileBaseRepository):
 
     def __init__(self, session: AsyncSession) -> None:
         super().__init__(session, Profile)
+
+    async def list_by_user_ids(self, user_ids: List[str]) -> Dict[str, List[Profile]]:
+        # A single array parameter keeps one statement shape for any batch size
+        query = (
+            select(self._model_cls)
+            .where(
+                self._model_cls.user_id
+                == any_(bindparam("user_ids", user_ids, type_=ARRAY(String))),
+            )
+            .order_by(self._model_cls.created_at, self._model_cls.id)
+        )
+        profiles = defaultdict(list)
+        for profile in (await self._session.exec(query)).all():
+            profiles[profile.user_id].append(profile)
+        return dict(profiles)
@@ -4,14 +4,16 @@ from uuid import UUID
 
 from pydantic import EmailStr
 from sqlmodel import select
+from sqlmodel import update as update_sql
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.models.sql.profile import Profile
 from app.models.sql.user import User, UserIn
 from app.repository.generic import GenericRepository, GenericSqlRepository
+from app.utils.cache import entity_cache, entity_loads
 
 
-class UserBaseRepository(GenericRepository[User], ABC):
+class UserBaseRepository(GenericRepository[User, UserIn], ABC):
     """Base repository for user entities."""
 
     @abstractmethod
@@ -27,14 +29,35 @@ class UserBaseRepository(GenericRepository[User], ABC):
         raise NotImplementedError()
 
     @abstractmethod
-    async def get_fav_profiles(self, user_id: int) -> Optional[User]:
-        """Retrieve a user by their username.
+    async def get_fav_profiles(self, user_id: UUID) -> List[Profile]:
+        """Retrieve the enabled favorite profiles of a user.
 
         Args:
-            username (EmailStr): The username of the user.
+            user_id (UUID): The ID of the user.
 
         Returns:
-            Optional[User]: The user object if found, None otherwise.
+            List[Profile]: The favorite profiles, oldest first.
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def replace_password(
+        self,
+        user_id: UUID,
+        old_hash: str,
+        new_hash: str,
+    ) -> bool:
+        """Replace a password hash, unless the password changed meanwhile.
+
+        The caller commits, then invalidates the cached row.
+
+        Args:
+            user_id (UUID): The ID of the user.
+            old_hash (str): The hash the new one replaces.
+            new_hash (str): The new hash of the same password.
+
+        Returns:
+            bool: True if the hash was replaced.
         """
         raise NotImplementedError()
 
@@ -47,27 +70,66 @@ class UserRepository(GenericSqlRepository[User, UserIn], UserBaseRepository):
     to perform CRUD operations on User entities.
     """
 
+    # The password hash never leaves the process
+    cache_shared = False
+
     def __init__(self, session: AsyncSession) -> None:
         super().__init__(session, User)
 
     async def get_by_username(self, username: EmailStr) -> Optional[User]:
-        query = select(self._model_cls).where(
-            self._model_cls.username == username,
-            self._model_cls.enabled is True,
+        query = select(self._model_cls).where(self._model_cls.username == username)
+        if not self._cache_enabled:
+            return (await self._session.exec(query)).first()
+        # The username maps to the ID, the row itself is cached by ID only
+        key = self._cache_key("username", username)
+        user_id = await entity_cache.get(key)
+        if user_id is not None:
+            user = await self.get_by_id(user_id.decode())
+            # A renamed user leaves a stale mapping behind
+            if user is not None and user.username == username:
+                return user
+
+        async def load() -> Optional[bytes]:
+            # Only the mapping, the row is read through `get_by_id` so that a
+            # concurrent write cannot leave an old row in the cache
+            user_id = (
+                await self._session.exec(query.with_only_columns(self._model_cls.id))
+            ).first()
+            if user_id is None:
+                return None
+            await entity_cache.set(key, str(user_id).encode())
+            return str(user_id).encode()
+
+        user_id = await entity_loads.do(key, load)
+        return await self.get_by_id(user_id.decode()) if user_id else None
+
+    async def get_fav_profiles(self, user_id: UUID) -> List[Profile]:
+        # Served by the partial index on profiles(user_id) WHERE favorite
+        query = (
+            select(Profile)
+            .where(
+                Profile.user_id == str(user_id),
+                Profile.favorite == True,  # noqa: E712
+            )
+            .order_by(Profile.created_at, Profile.id)
         )
-        return self._session.exec(query).first()
-
-    async def get_fav_profiles(self, user_id: UUID) -> Optional[List[Profile]]:
-        # Get all favorite profiles for a user
+        profiles = await self._session.exec(query)
+        return profiles.all()
+
+    async def replace_password(
+        self,
+        user_id: UUID,
+        old_hash: str,
+        new_hash: str,
+    ) -> bool:
         query = (
-            select(self._model_cls)
+            update_sql(self._model_cls)
             .where(
-                self._model_cls.id == user_id,
-                self._model_cls.enabled is True,
+                self._model_cls.id == str(user_id),
+                self._model_cls.password == old_hash,
             )
-            .join(self._model_cls.favorite_profiles)
+            .values(password=new_hash)
+            .returning(self._model_cls.id)
         )
-        users = await self._session.exec(query)
-        user = users.first()
-        profiles = user
-        return profiles
+        replaced = (await self._session.exec(query)).scalars().first()
+        return replaced is not None
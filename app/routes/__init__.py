@@ -1,11 +1,19 @@
 from fastapi import FastAPI
-import app.routes.user_routes as user_routes
+
+import app.routes.admin_routes as admin_routes
+import app.routes.auth as auth_routes
+import app.routes.metrics_routes as metrics_routes
 import app.routes.profile_routes as profile_routes
+import app.routes.user_routes as user_routes
 
 list_of_routes = [
-                user_routes.router,
-                profile_routes.router
-                ]
+    user_routes.router,
+    profile_routes.router,
+    metrics_routes.router,
+    admin_routes.router,
+    auth_routes.router,
+]
+
 
 def include_router(app: FastAPI) -> None:
     """
@@ -0,0 +1,101 @@
+import asyncio
+from typing import AsyncIterator
+
+from asyncpg.exceptions import (
+    DataError,
+    ForeignKeyViolationError,
+    UniqueViolationError,
+)
+from fastapi import Depends, Request, status
+from fastapi.responses import StreamingResponse
+
+from app.middlewares.authentication import require_roles
+from app.services import copy_services
+from app.services.copy_services import MissingColumnsError, Table
+from app.services.hashing_services import HashingQueueFullError
+from app.utils.exceptions import (
+    BadRequestException,
+    ConflictException,
+    ServiceUnavailableException,
+)
+from app.utils.router import get_api_router
+from config.settings import settings
+
+router = get_api_router("admin")
+
+
+@router.post(
+    "/import/{table}",
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(require_roles("admin"))],
+)
+async def import_table(table: Table, request: Request) -> dict:
+    """
+    Load a CSV document into `users` or `profiles` with COPY.
+
+    The request body is the CSV document itself (`text/csv`), read as it
+    arrives. Users need `username,password`, profiles need
+    `name,description,user_id` and optionally `favorite`.
+
+    Args:
+        table (Table): The target table.
+
+    Returns:
+        dict: The number of imported rows and the throughput.
+
+    Raises:
+        HTTPException: Nothing is imported if a row lacks a required column
+        or is refused by the database, e.g. a duplicate username (409) or an
+        unknown user_id (400). 503 while the hashing workers are busy.
+    """
+    rows = copy_services.csv_rows(request.stream())
+    try:
+        report = await copy_services.import_rows(table, rows)
+    except MissingColumnsError as exc:
+        raise BadRequestException(str(exc)) from exc
+    except UniqueViolationError as exc:
+        raise ConflictException(exc.detail or str(exc)) from exc
+    except (ForeignKeyViolationError, DataError) as exc:
+        raise BadRequestException(exc.detail or str(exc)) from exc
+    except HashingQueueFullError as exc:
+        raise ServiceUnavailableException(
+            "Too many requests in progress",
+            retry_after=settings.hash_retry_after_seconds,
+        ) from exc
+    return report.as_dict()
+
+
+@router.get(
+    "/export/{table}",
+    response_class=StreamingResponse,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(require_roles("admin"))],
+)
+async def export_table(table: Table):
+    """
+    Stream the enabled rows of `users` or `profiles` as CSV produced by COPY.
+
+    Args:
+        table (Table): The source table.
+
+    Returns:
+        The CSV document, with a header line.
+    """
+    chunks: asyncio.Queue = asyncio.Queue(maxsize=16)
+
+    async def produce():
+        try:
+            await copy_services.export_rows(table, chunks.put)
+        finally:
+            await chunks.put(None)
+
+    async def consume() -> AsyncIterator[bytes]:
+        producer = asyncio.create_task(produce())
+        try:
+            while (chunk := await chunks.get()) is not None:
+                yield chunk
+            await producer
+        finally:
+            producer.cancel()
+
+    return StreamingResponse(consume(), media_type="text/csv")
@@ -1,8 +1,14 @@
-from fastapi import Depends, Request, status
+from fastapi import Depends, status
 
-from app.controllers.user_controller import authenticate_user
-from app.models.sql.user import UserIn, UserOut
-from app.models.user import UserSerializer
+from app.controllers import user_controller
+from app.middlewares.authentication import (
+    Principal,
+    get_current_user,
+    get_principal,
+)
+from app.models.sql.user import User, UserIn, UserOut
+from app.models.token import AccessToken
+from app.services.revocation_services import revoke_token
 from app.utils.router import get_api_router
 from config.database import get_session
 
@@ -14,17 +20,32 @@ router = get_api_router("auth")
     status_code=status.HTTP_200_OK,
     response_model=UserOut,
 )
-def get_user_me(request: Request):
-    return request.state.user
+async def get_user_me(user: User = Depends(get_current_user)):
+    return user
 
 
 @router.post(
     "/login",
     status_code=status.HTTP_200_OK,
-    response_model=UserSerializer,
+    response_model=AccessToken,
 )
 async def login_user(
     user: UserIn,
     db_session=Depends(get_session),
 ):
-    return await authenticate_user(db_session, user.username, user.password)
+    """
+    Issue a bearer token with the claims of the user.
+    """
+    return await user_controller.login_user(db_session, user.username, user.password)
+
+
+@router.post(
+    "/logout",
+    status_code=status.HTTP_204_NO_CONTENT,
+)
+async def logout_user(principal: Principal = Depends(get_principal)) -> None:
+    """
+    Revoke the bearer token of the request until it expires.
+    """
+    if principal.token_id is not None and principal.expires_at is not None:
+        await revoke_token(principal.token_id, principal.expires_at)
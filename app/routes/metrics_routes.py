@@ -0,0 +1,158 @@
+from fastapi import status
+
+from app.middlewares.compression import get_compression_stats
+from app.middlewares.rate_limit import get_rate_limit_stats
+from app.services.archive_services import get_archive_stats
+from app.services.hashing_services import get_hashing_stats
+from app.services.revocation_services import get_revocation_stats
+from app.utils.cache import entity_cache
+from app.utils.jwt import token_cache
+from app.utils.router import get_api_router
+from app.utils.timing import startup_timings
+from config.database import get_pool_stats
+from config.instrumentation import get_query_stats
+
+router = get_api_router("metrics")
+
+
+@router.get(
+    "/pool",
+    status_code=status.HTTP_200_OK,
+)
+async def pool_metrics() -> dict:
+    """
+    Retrieve the connection pool statistics.
+
+    Returns:
+        dict: Checked-out, idle and overflow connections, wait times and timeouts.
+    """
+    return get_pool_stats()
+
+
+@router.get(
+    "/queries",
+    status_code=status.HTTP_200_OK,
+)
+async def query_metrics() -> dict:
+    """
+    Retrieve the SQL query statistics.
+
+    Returns:
+        dict: Query counts, latency histogram, slow queries and N+1 patterns.
+    """
+    return get_query_stats()
+
+
+@router.get(
+    "/startup",
+    status_code=status.HTTP_200_OK,
+)
+async def startup_metrics() -> dict:
+    """
+    Retrieve the duration of each startup phase.
+
+    Returns:
+        dict: Seconds spent importing, including routers, checking the database
+        and warming up the pool.
+    """
+    return startup_timings.as_dict()
+
+
+@router.get(
+    "/archive",
+    status_code=status.HTTP_200_OK,
+)
+async def archive_metrics() -> dict:
+    """
+    Retrieve the progress of the archival of soft-deleted rows.
+
+    Returns:
+        dict: Archived rows per table, batches, failures and the last run.
+    """
+    return get_archive_stats()
+
+
+@router.get(
+    "/cache",
+    status_code=status.HTTP_200_OK,
+)
+async def cache_metrics() -> dict:
+    """
+    Retrieve the entity cache statistics.
+
+    Returns:
+        dict: Entries, bytes, hits, misses, evictions and invalidations.
+    """
+    return entity_cache.info()
+
+
+@router.get(
+    "/compression",
+    status_code=status.HTTP_200_OK,
+)
+async def compression_metrics() -> dict:
+    """
+    Retrieve the response compression statistics.
+
+    Returns:
+        dict: Compressed responses per encoding, bytes in, out and saved.
+    """
+    return get_compression_stats()
+
+
+@router.get(
+    "/hashing",
+    status_code=status.HTTP_200_OK,
+)
+async def hashing_metrics() -> dict:
+    """
+    Retrieve the password hashing pool statistics.
+
+    Returns:
+        dict: Running and queued operations, rejections and the hash and
+        verify latencies, with the same figures of the import pool under
+        "import".
+    """
+    return get_hashing_stats()
+
+
+@router.get(
+    "/rate-limit",
+    status_code=status.HTTP_200_OK,
+)
+async def rate_limit_metrics() -> dict:
+    """
+    Retrieve the rate limiting statistics.
+
+    Returns:
+        dict: Allowed and limited requests per budget, buckets and evictions.
+    """
+    return get_rate_limit_stats()
+
+
+@router.get(
+    "/tokens",
+    status_code=status.HTTP_200_OK,
+)
+async def token_metrics() -> dict:
+    """
+    Retrieve the verified token cache statistics.
+
+    Returns:
+        dict: Cached tokens, hits, misses, expirations and invalidations.
+    """
+    return token_cache.info()
+
+
+@router.get(
+    "/revocations",
+    status_code=status.HTTP_200_OK,
+)
+async def revocation_metrics() -> dict:
+    """
+    Retrieve the token revocation list statistics.
+
+    Returns:
+        dict: Revoked tokens in memory, rejections, refreshes and failures.
+    """
+    return get_revocation_stats()
@@ -1,25 +1,102 @@
-from typing import List
+from typing import List, Optional
+from uuid import UUID
 
-from fastapi import Depends, status
+from fastapi import Body, Depends, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 import app.controllers.profile_controller as controller
+from app.models.bulk import BulkResult
+from app.models.page import Page
 from app.models.profile import ProfileSchema, ProfileSerializer
+from app.models.sql.profile import ProfileBulkUpdate, ProfileIn, ProfileOut
 from app.utils.router import get_api_router
 from config.database import get_session
+from config.settings import settings
 
 router = get_api_router("profiles")
 
 
 @router.get(
     "/",
-    response_model=List[ProfileSchema],
+    response_model=Page[ProfileOut],
     status_code=status.HTTP_200_OK,
 )
 async def get_profiles(
+    request: Request,
+    response: Response,
+    limit: int = Query(settings.page_size_default, ge=1, le=settings.page_size_max),
+    cursor: Optional[str] = None,
     db_session: AsyncSession = Depends(get_session),
 ):
-    return await controller.get_profiles(db_session)
+    """
+    Retrieve a page of profiles ordered by creation time.
+
+    Supports conditional requests with `If-None-Match`.
+
+    Args:
+        limit (int): The maximum number of profiles in the page.
+        cursor (Optional[str]): The `next_cursor` of the previous page.
+        db_session (Session, optional): The database session. Defaults to Depends(db.get_db).
+
+    Returns:
+        The page of profiles and the cursor of the next page.
+    """
+    return await controller.get_profiles(db_session, request, response, limit, cursor)
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def export_profiles(
+    fetch_size: int = Query(
+        settings.export_fetch_size,
+        ge=1,
+        le=settings.export_fetch_size_max,
+    ),
+):
+    """
+    Stream every profile as newline delimited JSON.
+
+    Rows are read through a server-side cursor, so memory stays flat
+    regardless of the table size.
+
+    Args:
+        fetch_size (int): The number of rows fetched per round trip.
+
+    Returns:
+        One JSON profile per line.
+    """
+    return controller.export_profiles(fetch_size)
+
+
+@router.get(
+    "/{profile_id}",
+    response_model=ProfileOut,
+    status_code=status.HTTP_200_OK,
+)
+async def get_profile(
+    profile_id: UUID,
+    request: Request,
+    response: Response,
+    db_session: AsyncSession = Depends(get_session),
+):
+    """
+    Retrieve a profile by its ID.
+
+    Sends `ETag` and `Last-Modified`, and `304 Not Modified` when the
+    `If-None-Match` or `If-Modified-Since` copy is current.
+
+    Args:
+        profile_id (UUID): The ID of the profile.
+        db_session (Session, optional): The database session. Defaults to Depends(db.get_db).
+
+    Returns:
+        The profile.
+    """
+    return await controller.get_profile(profile_id, db_session, request, response)
 
 
 @router.delete(
@@ -90,3 +167,81 @@ async def create_profile(
         The created profile.
     """
     return await controller.create_profile(profile, db_session)
+
+
+@router.post(
+    "/bulk",
+    response_model=BulkResult,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_profiles(
+    profiles: List[ProfileIn] = Body(
+        ...,
+        min_length=1,
+        max_length=settings.bulk_max_items,
+    ),
+    db_session: AsyncSession = Depends(get_session),
+):
+    """
+    Create a batch of profiles in a single transaction.
+
+    Args:
+        profiles (List[ProfileIn]): The profiles to create, at most `bulk_max_items`.
+        db_session (Session, optional): The database session. Defaults to Depends(db.get_db).
+
+    Returns:
+        The ID of each created profile, in payload order.
+    """
+    return await controller.create_profiles(profiles, db_session)
+
+
+@router.patch(
+    "/bulk",
+    response_model=BulkResult,
+    status_code=status.HTTP_200_OK,
+)
+async def update_profiles(
+    profiles: List[ProfileBulkUpdate] = Body(
+        ...,
+        min_length=1,
+        max_length=settings.bulk_max_items,
+    ),
+    db_session: AsyncSession = Depends(get_session),
+):
+    """
+    Update a batch of profiles in a single transaction.
+
+    Args:
+        profiles (List[ProfileBulkUpdate]): The ID and changed fields of each profile.
+        db_session (Session, optional): The database session. Defaults to Depends(db.get_db).
+
+    Returns:
+        Whether each profile was updated or not found, in payload order.
+    """
+    return await controller.update_profiles(profiles, db_session)
+
+
+@router.post(
+    "/bulk/delete",
+    response_model=BulkResult,
+    status_code=status.HTTP_200_OK,
+)
+async def delete_profiles(
+    profile_ids: List[UUID] = Body(
+        ...,
+        min_length=1,
+        max_length=settings.bulk_max_items,
+    ),
+    db_session: AsyncSession = Depends(get_session),
+):
+    """
+    Soft delete a batch of profiles in a single statement.
+
+    Args:
+        profile_ids (List[UUID]): The IDs of the profiles to delete.
+        db_session (Session, optional): The database session. Defaults to Depends(db.get_db).
+
+    Returns:
+        Whether each profile was deleted or not found, in payload order.
+    """
+    return await controller.delete_profiles(profile_ids, db_session)
@@ -1,16 +1,33 @@
-from typing import List
+from typing import List, Optional, Union
+from uuid import UUID
 
-from fastapi import Depends, status
+from fastapi import Depends, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 import app.controllers.user_controller as controller
+from app.models.page import Page
+from app.models.sql.profile import ProfileOut
+from app.models.sql.user import UserOut, UserWithProfiles
 from app.models.user import UserSchema, UserSerializer
+from app.services.profile_services import (
+    get_profiles_loader as build_profiles_loader,
+)
+from app.utils.dataloader import DataLoader
 from app.utils.router import get_api_router
 from config.database import get_session
+from config.settings import settings
 
 router = get_api_router("users")
 
 
+async def get_profiles_loader(
+    db_session: AsyncSession = Depends(get_session),
+) -> DataLoader:
+    # Request scoped, it shares the request session and its cache
+    return build_profiles_loader(db_session)
+
+
 @router.post(
     "/",
     status_code=status.HTTP_201_CREATED,
@@ -32,28 +49,73 @@ async def create_user(
         UserSerializer: The serialized user object.
 
     """
-    return controller.create_user(user, db_session)
+    return await controller.create_user(user, db_session)
+
 
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    status_code=status.HTTP_200_OK,
+    tags=["users"],
+)
+async def export_users(
+    fetch_size: int = Query(
+        settings.export_fetch_size,
+        ge=1,
+        le=settings.export_fetch_size_max,
+    ),
+):
+    """
+    Stream every user as newline delimited JSON.
 
-@router.get("/{user_id}", status_code=status.HTTP_200_OK)
+    Args:
+        fetch_size (int): The number of rows fetched per round trip.
+
+    Returns:
+        One JSON user per line.
+    """
+    return controller.export_users(fetch_size)
+
+
+@router.get(
+    "/{user_id}/favorites",
+    status_code=status.HTTP_200_OK,
+    tags=["users"],
+)
+async def get_favorite_profiles(
+    user_id: UUID,
+    db_session: AsyncSession = Depends(get_session),
+) -> List[ProfileOut]:
+    """
+    Retrieve the favorite profiles of a user, without loading the others.
+
+    Args:
+        user_id (UUID): The ID of the user.
+        db_session: The database session.
+
+    Returns:
+        List[ProfileOut]: The favorite profiles, oldest first.
+    """
+    return await controller.get_favorite_profiles(user_id, db_session)
+
+
+@router.get("/{user_id}", status_code=status.HTTP_200_OK, tags=["users"])
 async def get_user(
-    user_id: str,
+    user_id: UUID,
     db_session: AsyncSession = Depends(get_session),
-    tags=["users"],
-) -> UserSerializer:
+    profiles_loader: DataLoader = Depends(get_profiles_loader),
+) -> UserWithProfiles:
     """
-    Retrieve a user by their ID.
+    Retrieve a user by their ID, with their profiles.
 
     Args:
-        user_id (str): The ID of the user.
+        user_id (UUID): The ID of the user.
         db_session: The database session.
 
     Returns:
-        UserSerializer: The serialized user object.
+        UserWithProfiles: The user and their profiles.
     """
-    user_id = int(user_id)
-    user = await UserSchema.get(db_session, id=user_id)
-    return user
+    return await controller.get_user(user_id, db_session, profiles_loader)
 
 
 @router.get(
@@ -62,19 +124,39 @@ async def get_user(
     tags=["users"],
 )
 async def get_all_users(
+    request: Request,
+    response: Response,
+    limit: int = Query(settings.page_size_default, ge=1, le=settings.page_size_max),
+    cursor: Optional[str] = None,
+    include_profiles: bool = False,
     db_session: AsyncSession = Depends(get_session),
-) -> List[UserSerializer]:
+    profiles_loader: DataLoader = Depends(get_profiles_loader),
+) -> Union[Page[UserWithProfiles], Page[UserOut]]:
     """
-    Retrieve all users from the database.
+    Retrieve a page of users ordered by creation time.
+
+    Without `include_profiles`, supports conditional requests with
+    `If-None-Match`.
 
     Parameters:
+        limit (int): The maximum number of users in the page.
+        cursor (Optional[str]): The `next_cursor` of the previous page.
+        include_profiles (bool): Embed the profiles of each user, loaded with
+            a single query for the whole page.
         db_session (DatabaseSession): The database session.
 
     Returns:
-        List[UserSerializer]: A list of user objects serialized as UserSerializer.
+        Page[UserOut]: The page of users and the cursor of the next page.
 
     """
-    return []
+    return await controller.get_all_users(
+        db_session,
+        limit,
+        cursor,
+        profiles_loader if include_profiles else None,
+        request,
+        response,
+    )
 
 
 @router.put(
@@ -0,0 +1,256 @@
+""" Batched archival of soft-deleted users and profiles. """
+import asyncio
+import contextlib
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import text
+
+from config.database import engine
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Profiles go first, users are only archived once no profile references them
+TABLES: Tuple[str, ...] = ("profiles", "users")
+
+COLUMNS: Dict[str, str] = {
+    "users": "id, username, password, enabled, created_at, updated_at",
+    "profiles": (
+        "id, name, description, user_id, favorite, enabled, created_at, updated_at"
+    ),
+}
+
+# The statements below are built from these constants only, never from input
+
+# Rows disabled before :cutoff, i.e. whose last update is the soft delete
+ELIGIBLE: Dict[str, str] = {
+    "users": (
+        "FROM users WHERE NOT enabled AND updated_at < :cutoff "
+        "AND NOT EXISTS (SELECT 1 FROM profiles WHERE profiles.user_id = users.id)"
+    ),
+    "profiles": "FROM profiles WHERE NOT enabled AND updated_at < :cutoff",
+}
+
+
+def count_statement(table: str) -> str:
+    return f"SELECT count(*) {ELIGIBLE[table]}"
+
+
+def move_statement(table: str) -> str:
+    """
+    Builds the statement moving one batch of `table` to `<table>_archive`.
+
+    Rows locked by other transactions are skipped and picked up by a later
+    run, so a batch never waits on application traffic.
+    """
+    columns = COLUMNS[table]
+    return (
+        f"WITH batch AS (SELECT id {ELIGIBLE[table]} "  # noqa: S608 constant table names
+        f"ORDER BY updated_at LIMIT :limit FOR UPDATE SKIP LOCKED), "
+        f"moved AS (DELETE FROM {table} WHERE id IN (SELECT id FROM batch) "
+        f"RETURNING {columns}) "
+        f"INSERT INTO {table}_archive ({columns}, archived_at) "
+        f"SELECT {columns}, now() FROM moved"
+    )
+
+
+def move_statements(table: str, dialect: str) -> Tuple[str, ...]:
+    """
+    Builds the statements moving one batch of `table`, run in one transaction.
+    The rows moved are the row count of the last one.
+
+    PostgreSQL moves the batch with the single `move_statement`. Other
+    databases, without data-modifying CTEs nor `SKIP LOCKED`, copy the batch
+    and then delete it, which is only safe when writers are serialized as in
+    SQLite.
+    """
+    if dialect == "postgresql":
+        return (move_statement(table),)
+    columns = COLUMNS[table]
+    batch = f"SELECT id {ELIGIBLE[table]} ORDER BY updated_at, id LIMIT :limit"
+    return (
+        f"INSERT INTO {table}_archive ({columns}, archived_at) "  # noqa: S608 constant table names
+        f"SELECT {columns}, CURRENT_TIMESTAMP FROM {table} WHERE id IN ({batch})",
+        f"DELETE FROM {table} WHERE id IN ({batch})",  # noqa: S608 constant table names
+    )
+
+
+@dataclass
+class ArchiveReport:
+    """
+    Outcome of one archival run.
+
+    Attributes:
+        dry_run (bool): Whether rows were only counted.
+        cutoff (datetime): Rows disabled before this time are archived.
+        rows (Dict[str, int]): Archived, or eligible in a dry run, rows per table.
+        batches (int): The number of committed batches.
+        seconds (float): The total duration.
+    """
+
+    dry_run: bool
+    cutoff: datetime
+    rows: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(TABLES, 0))
+    batches: int = 0
+    seconds: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "dry_run": self.dry_run,
+            "cutoff": self.cutoff.isoformat(),
+            "rows": self.rows,
+            "batches": self.batches,
+            "seconds": round(self.seconds, 3),
+        }
+
+
+@dataclass
+class ArchiveMetrics:
+    """
+    Process-wide archival counters, updated after every batch.
+
+    Attributes:
+        runs (int): The number of completed runs, dry runs excluded.
+        failures (int): The number of runs that raised.
+        rows (Dict[str, int]): Archived rows per table.
+        batches (int): The number of committed batches.
+        running (bool): Whether a run is in progress.
+        last_run (Optional[Dict[str, Any]]): The report of the last run.
+        last_error (Optional[str]): The error of the last failed run.
+    """
+
+    runs: int = 0
+    failures: int = 0
+    rows: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(TABLES, 0))
+    batches: int = 0
+    running: bool = False
+    last_run: Optional[Dict[str, Any]] = None
+    last_error: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "failures": self.failures,
+            "rows": dict(self.rows),
+            "batches": self.batches,
+            "running": self.running,
+            "last_run": self.last_run,
+            "last_error": self.last_error,
+        }
+
+
+metrics = ArchiveMetrics()
+_scheduler: Optional[asyncio.Task] = None
+
+
+def get_archive_stats() -> Dict[str, Any]:
+    return metrics.as_dict()
+
+
+async def archive_disabled(
+    older_than: Optional[timedelta] = None,
+    batch_size: Optional[int] = None,
+    dry_run: bool = False,
+) -> ArchiveReport:
+    """
+    Moves disabled users and profiles older than `older_than` into the
+    `users_archive` and `profiles_archive` tables.
+
+    Every batch is its own short transaction, followed by a pause, so locks
+    are held briefly and replication can keep up.
+
+    Args:
+        older_than (timedelta, optional): Minimum time since the soft delete.
+            Defaults to `archive_after_days`.
+        batch_size (int, optional): Rows moved per transaction.
+            Defaults to `archive_batch_size`.
+        dry_run (bool): Only count the eligible rows.
+
+    Returns:
+        ArchiveReport: The rows moved per table.
+    """
+    older_than = older_than or timedelta(days=settings.archive_after_days)
+    batch_size = batch_size or settings.archive_batch_size
+    report = ArchiveReport(dry_run=dry_run, cutoff=datetime.utcnow() - older_than)
+    start = time.perf_counter()
+    metrics.running = True
+    try:
+        for table in TABLES:
+            if dry_run:
+                async with engine.connect() as conn:
+                    result = await conn.execute(
+                        text(count_statement(table)),
+                        {"cutoff": report.cutoff},
+                    )
+                report.rows[table] = result.scalar_one()
+                continue
+            while True:
+                async with engine.begin() as conn:
+                    for statement in move_statements(table, conn.dialect.name):
+                        result = await conn.execute(
+                            text(statement),
+                            {"cutoff": report.cutoff, "limit": batch_size},
+                        )
+                moved = result.rowcount
+                if not moved:
+                    break
+                report.rows[table] += moved
+                report.batches += 1
+                metrics.rows[table] += moved
+                metrics.batches += 1
+                logger.info(
+                    "Archived %d %s, %d so far",
+                    moved,
+                    table,
+                    report.rows[table],
+                )
+                if moved < batch_size:
+                    break
+                await asyncio.sleep(settings.archive_batch_pause_seconds)
+    except Exception as exc:
+        metrics.failures += 1
+        metrics.last_error = repr(exc)
+        raise
+    finally:
+        metrics.running = False
+    report.seconds = time.perf_counter() - start
+    if not dry_run:
+        metrics.runs += 1
+        metrics.last_run = report.as_dict()
+    return report
+
+
+async def _run_periodically(interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await archive_disabled()
+        except Exception:
+            # Already counted, the next run retries
+            logger.exception("Archival of soft-deleted rows failed")
+
+
+def start_scheduler(interval: float) -> None:
+    """
+    Runs `archive_disabled` every `interval` seconds in the event loop.
+
+    Args:
+        interval (float): Seconds between the end of a run and the next one.
+    """
+    global _scheduler
+    if _scheduler is None or _scheduler.done():
+        _scheduler = asyncio.create_task(_run_periodically(interval))
+
+
+async def stop_scheduler() -> None:
+    global _scheduler
+    if _scheduler is None:
+        return
+    _scheduler.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await _scheduler
+    _scheduler = None
@@ -0,0 +1,301 @@
+""" COPY based bulk import and export of users and profiles. """
+import asyncio
+import csv
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    Union,
+)
+from uuid import uuid4
+
+from app.services.hashing_services import import_hasher
+from config.database import engine
+from config.settings import settings
+
+Table = Literal["users", "profiles"]
+
+COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "users": ("id", "username", "password", "enabled", "created_at", "updated_at"),
+    "profiles": (
+        "id",
+        "name",
+        "description",
+        "user_id",
+        "favorite",
+        "enabled",
+        "created_at",
+        "updated_at",
+    ),
+}
+
+# Columns each imported row must have
+REQUIRED_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "users": ("username", "password"),
+    "profiles": ("name", "description", "user_id"),
+}
+
+# Password hashes are never exported
+EXPORT_QUERIES: Dict[str, str] = {
+    "users": "SELECT id, username, created_at, updated_at FROM users WHERE enabled",
+    "profiles": (
+        "SELECT id, name, description, user_id, favorite, created_at, updated_at "
+        "FROM profiles WHERE enabled"
+    ),
+}
+
+
+@dataclass
+class CopyReport:
+    """
+    Throughput of an import or export.
+
+    Attributes:
+        table (str): The table that was copied.
+        rows (int): The number of copied rows.
+        seconds (float): The total duration.
+        hash_seconds (float): The time spent hashing passwords.
+    """
+
+    table: str
+    rows: int = 0
+    seconds: float = 0.0
+    hash_seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "table": self.table,
+            "rows": self.rows,
+            "seconds": round(self.seconds, 3),
+            "hash_seconds": round(self.hash_seconds, 3),
+            "rows_per_second": round(self.rows_per_second, 1),
+        }
+
+
+class MissingColumnsError(ValueError):
+    """An imported row lacks required columns."""
+
+    def __init__(self, columns: List[str]) -> None:
+        self.columns = columns
+        super().__init__(f"Missing columns: {', '.join(columns)}")
+
+
+def check_columns(table: Table, row: Dict[str, str]) -> None:
+    """
+    Raises:
+        MissingColumnsError: `row` lacks a column required by `table`.
+    """
+    missing = [column for column in REQUIRED_COLUMNS[table] if row.get(column) is None]
+    if missing:
+        raise MissingColumnsError(missing)
+
+
+def _is_true(value: str) -> bool:
+    return value.strip().lower() in ("1", "true", "t", "yes")
+
+
+def _user_record(row: Dict[str, str], now: datetime) -> tuple:
+    # The password is replaced by its hash before copying
+    return (
+        str(uuid4()),
+        row["username"].lower().strip(),
+        row["password"],
+        True,
+        now,
+        now,
+    )
+
+
+def _profile_record(row: Dict[str, str], now: datetime) -> tuple:
+    return (
+        str(uuid4()),
+        row["name"],
+        row["description"],
+        row["user_id"],
+        _is_true(row.get("favorite") or ""),
+        True,
+        now,
+        now,
+    )
+
+
+async def _batches(
+    rows: Union[Iterable[Dict[str, str]], AsyncIterator[Dict[str, str]]],
+    size: int,
+) -> AsyncIterator[List[Dict[str, str]]]:
+    batch = []
+    if hasattr(rows, "__aiter__"):
+        async for row in rows:
+            batch.append(row)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+    else:
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+async def _hash_batch(records: List[tuple]) -> List[tuple]:
+    passwords = [record[2] for record in records]
+    # Small chunks, the ones still queued are dropped if the import fails
+    step = settings.copy_hash_chunk_size
+    chunks = await asyncio.gather(
+        *(
+            import_hasher.hash_many(passwords[i : i + step])
+            for i in range(0, len(passwords), step)
+        ),
+    )
+    hashes = [hashed for chunk in chunks for hashed in chunk]
+    return [
+        (record[0], record[1], hashed, *record[3:])
+        for record, hashed in zip(records, hashes)
+    ]
+
+
+async def import_rows(
+    table: Table,
+    rows: Union[Iterable[Dict[str, str]], AsyncIterator[Dict[str, str]]],
+) -> CopyReport:
+    """
+    Loads rows into `users` or `profiles` with COPY, in one transaction.
+
+    User passwords are hashed by the import hashing workers while the
+    previous batch is being copied.
+
+    Args:
+        table (Table): The target table.
+        rows: Mappings with the CSV columns, see `REQUIRED_COLUMNS`.
+
+    Returns:
+        CopyReport: The number of rows and the throughput.
+
+    Raises:
+        MissingColumnsError: A row lacks a required column, nothing is imported.
+        HashingQueueFullError: The import hashing workers are saturated.
+        asyncpg.PostgresError: COPY refused a row, nothing is imported.
+    """
+    report = CopyReport(table=table)
+    start = time.perf_counter()
+    make_record = _user_record if table == "users" else _profile_record
+
+    async def prepare(batch: List[Dict[str, str]]) -> List[tuple]:
+        now = datetime.utcnow()
+        records = [make_record(row, now) for row in batch]
+        if table == "users":
+            hash_start = time.perf_counter()
+            records = await _hash_batch(records)
+            report.hash_seconds += time.perf_counter() - hash_start
+        return records
+
+    async def copy(records: List[tuple]) -> None:
+        await driver.copy_records_to_table(
+            table,
+            records=records,
+            columns=COLUMNS[table],
+        )
+        report.rows += len(records)
+
+    async with engine.connect() as conn:
+        raw = await conn.get_raw_connection()
+        driver = raw.driver_connection
+        async with driver.transaction():
+            preparing: Optional[asyncio.Future] = None
+            try:
+                async for batch in _batches(rows, settings.copy_batch_size):
+                    for row in batch:
+                        check_columns(table, row)
+                    # Prepare the next batch while the previous one is copied
+                    previous = preparing
+                    preparing = asyncio.ensure_future(prepare(batch))
+                    if previous is not None:
+                        await copy(await previous)
+                if preparing is not None:
+                    await copy(await preparing)
+            finally:
+                if preparing is not None:
+                    # A failed import stops hashing the batch prepared ahead
+                    preparing.cancel()
+                    await asyncio.wait([preparing])
+                    if not preparing.cancelled():
+                        preparing.exception()
+
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+async def export_rows(
+    table: Table,
+    output: Union[str, Callable[[bytes], Awaitable[None]]],
+) -> CopyReport:
+    """
+    Writes the enabled rows of `users` or `profiles` as CSV with COPY.
+
+    Args:
+        table (Table): The source table.
+        output: A file path, or a coroutine function receiving each chunk.
+
+    Returns:
+        CopyReport: The number of rows and the throughput.
+    """
+    report = CopyReport(table=table)
+    start = time.perf_counter()
+    async with engine.connect() as conn:
+        raw = await conn.get_raw_connection()
+        status = await raw.driver_connection.copy_from_query(
+            EXPORT_QUERIES[table],
+            output=output,
+            format="csv",
+            header=True,
+        )
+    # asyncpg returns the command tag, "COPY <rows>"
+    report.rows = int(status.split()[-1])
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+async def csv_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[Dict[str, str]]:
+    """
+    Parses a CSV document with a header line as it is received.
+
+    Fields must not contain line breaks, every line is one row.
+
+    Args:
+        chunks (AsyncIterator[bytes]): The document, in arbitrary chunks.
+
+    Yields:
+        Dict[str, str]: One mapping per row.
+    """
+    header = None
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for values in csv.reader(line.decode() for line in lines):
+            if not values:
+                continue
+            if header is None:
+                header = values
+                continue
+            yield dict(zip(header, values))
+    if pending.strip() and header is not None:
+        for values in csv.reader([pending.decode()]):
+            yield dict(zip(header, values))
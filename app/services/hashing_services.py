@@ -0,0 +1,253 @@
+""" Password hashing and verification in a bounded process pool. """
+import asyncio
+import os
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.utils.passw import get_password_hash, verify_password
+from config.settings import settings
+
+# Upper bounds in milliseconds of the latency histogram buckets
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float("inf"))
+
+
+class HashingQueueFullError(Exception):
+    """Raised instead of queueing when every worker and queue slot is taken."""
+
+
+@dataclass
+class OperationMetrics:
+    """
+    Latency of one kind of operation, from submission to result.
+
+    Attributes:
+        calls (int): The number of completed operations.
+        failed (int): Operations that raised in the worker.
+        total_seconds (float): The total latency.
+        wait_seconds (float): The part of the latency spent queued.
+        max_seconds (float): The slowest operation.
+        buckets (Dict[float, int]): Latency histogram keyed by upper bound in ms.
+    """
+
+    calls: int = 0
+    failed: int = 0
+    total_seconds: float = 0.0
+    wait_seconds: float = 0.0
+    max_seconds: float = 0.0
+    buckets: Dict[float, int] = field(
+        default_factory=lambda: dict.fromkeys(LATENCY_BUCKETS_MS, 0),
+    )
+
+    def record(self, elapsed: float, waited: float) -> None:
+        self.calls += 1
+        self.total_seconds += elapsed
+        self.wait_seconds += waited
+        self.max_seconds = max(self.max_seconds, elapsed)
+        elapsed_ms = elapsed * 1000
+        for bound in LATENCY_BUCKETS_MS:
+            if elapsed_ms <= bound:
+                self.buckets[bound] += 1
+                break
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "failed": self.failed,
+            "avg_seconds": round(
+                self.total_seconds / self.calls if self.calls else 0.0,
+                6,
+            ),
+            "avg_wait_seconds": round(
+                self.wait_seconds / self.calls if self.calls else 0.0,
+                6,
+            ),
+            "max_seconds": round(self.max_seconds, 6),
+            "latency_ms_buckets": {
+                ("+Inf" if bound == float("inf") else str(bound)): count
+                for bound, count in self.buckets.items()
+            },
+        }
+
+
+@dataclass
+class HashingMetrics:
+    """
+    Process-wide hashing counters.
+
+    Attributes:
+        hash (OperationMetrics): Password hashing.
+        verify (OperationMetrics): Password verification.
+        hash_many (OperationMetrics): Hashing of imported passwords, per chunk.
+        rejected (int): Operations refused because the queue was full.
+        max_queue_depth (int): The deepest the queue has been.
+        rehashed (int): Stored hashes upgraded to the current policy.
+    """
+
+    hash: OperationMetrics = field(default_factory=OperationMetrics)
+    verify: OperationMetrics = field(default_factory=OperationMetrics)
+    hash_many: OperationMetrics = field(default_factory=OperationMetrics)
+    rejected: int = 0
+    max_queue_depth: int = 0
+    rehashed: int = 0
+
+
+def _timed(function: Callable[..., Any], *args: Any) -> Tuple[Any, float]:
+    # Runs in the worker, the time spent queued is the rest of the latency
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def _hash_all(passwords: List[str]) -> List[str]:
+    return [get_password_hash(password) for password in passwords]
+
+
+class PasswordHasher:
+    """
+    Runs the password hashing in worker processes so that it never blocks the event loop.
+
+    At most `workers` operations run at once and `queue_size` more wait for a
+    worker. Past that, operations fail fast with `HashingQueueFullError` instead of
+    piling up behind work that would outlive the client timeouts.
+
+    Args:
+        workers (Optional[int]): Worker processes, None for one per core.
+        queue_size (int): Operations allowed to wait for a worker.
+    """
+
+    def __init__(self, workers: Optional[int] = None, queue_size: int = 64) -> None:
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.metrics = HashingMetrics()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # Submitted operations not finished yet, running or queued
+        self._pending = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self._pending - self.workers)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.metrics.hash, get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(
+            self.metrics.verify,
+            verify_password,
+            plain_password,
+            hashed_password,
+        )
+
+    async def hash_many(self, passwords: List[str]) -> List[str]:
+        # One operation for the whole chunk, queued like a single hash
+        return await self._run(self.metrics.hash_many, _hash_all, passwords)
+
+    async def _run(
+        self,
+        stats: OperationMetrics,
+        function: Callable[..., Any],
+        *args: Any,
+    ) -> Any:
+        if self._pending >= self.workers + self.queue_size:
+            self.metrics.rejected += 1
+            raise HashingQueueFullError()
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        pool, future = self._submit(function, *args)
+        self._pending += 1
+        self.metrics.max_queue_depth = max(
+            self.metrics.max_queue_depth,
+            self.queue_depth,
+        )
+        # Released when the worker is done, even if the caller was cancelled
+        future.add_done_callback(lambda _: self._release_soon(loop))
+        try:
+            result, run_seconds = await asyncio.wrap_future(future)
+        except BrokenProcessPool:
+            # A worker died, the next operation starts a new pool
+            stats.failed += 1
+            self._discard(pool)
+            raise
+        except Exception:
+            stats.failed += 1
+            raise
+        elapsed = time.perf_counter() - start
+        stats.record(elapsed, max(0.0, elapsed - run_seconds))
+        return result
+
+    def _submit(
+        self,
+        function: Callable[..., Any],
+        *args: Any,
+    ) -> Tuple[ProcessPoolExecutor, Future]:
+        if self._pool is None:
+            # Started on first use, the workers are not needed by every process
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        pool = self._pool
+        try:
+            return pool, pool.submit(_timed, function, *args)
+        except BrokenProcessPool:
+            # A worker died while the pool was idle, nothing was submitted yet
+            self._discard(pool)
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self._pool, self._pool.submit(_timed, function, *args)
+
+    def _discard(self, pool: ProcessPoolExecutor) -> None:
+        # Another operation may have replaced the broken pool already
+        if self._pool is pool:
+            self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _release_soon(self, loop: asyncio.AbstractEventLoop) -> None:
+        # Called from the pool management thread
+        if not loop.is_closed():
+            loop.call_soon_threadsafe(self._release)
+
+    def _release(self) -> None:
+        self._pending -= 1
+
+    def info(self) -> Dict[str, Any]:
+        """
+        Returns the pool occupancy and the latency of each operation.
+
+        Returns:
+            Dict[str, Any]: Workers, running and queued operations, rejections
+            and the hash and verify latencies.
+        """
+        return {
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "running": min(self._pending, self.workers),
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.metrics.max_queue_depth,
+            "rejected": self.metrics.rejected,
+            "rehashed": self.metrics.rehashed,
+            "hash": self.metrics.hash.as_dict(),
+            "verify": self.metrics.verify.as_dict(),
+            "hash_many": self.metrics.hash_many.as_dict(),
+        }
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+password_hasher = PasswordHasher(
+    workers=settings.hash_workers,
+    queue_size=settings.hash_queue_size,
+)
+
+# Imported passwords, in a pool of their own so that logins never wait for them
+import_hasher = PasswordHasher(
+    workers=settings.copy_hash_workers or max(1, (os.cpu_count() or 1) // 2),
+    # The chunks of the two batches hashed at once, see `import_rows`
+    queue_size=2 * -(-settings.copy_batch_size // settings.copy_hash_chunk_size),
+)
+
+
+def get_hashing_stats() -> Dict[str, Any]:
+    return {**password_hasher.info(), "import": import_hasher.info()}
@@ -1,39 +1,100 @@
 """ Profile services. """ ""
-from typing import List
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from uuid import UUID
 
-from sqlmodel import insert, select, update
+from sqlmodel import insert, update
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.models import transform_entities
-from app.models.sql.profile import Profile, ProfileIn, ProfileOut
+from app.models.bulk import BulkItemResult, BulkResult
+from app.models.page import Page
+from app.models.sql.profile import (
+    Profile,
+    ProfileBulkUpdate,
+    ProfileIn,
+    ProfileOut,
+)
 from app.repository.profile import ProfileRepository
+from app.utils.cache import entity_cache, entity_key
+from app.utils.conditional import Validators
+from app.utils.dataloader import DataLoader
+from config.database import async_session, commit_rollback
 
 
-async def get_profiles(db_session: AsyncSession) -> List[ProfileOut]:
-    query = select(Profile).where(ProfileOut.enabled is True)
-    profiles = await db_session.exec(query)
-    profiles = profiles.all()
-    if not profiles:
-        return None
+async def get_profiles(
+    db_session: AsyncSession,
+    limit: int,
+    cursor: Optional[str] = None,
+) -> Tuple[Page[ProfileOut], Validators]:
+    profiles_repository = ProfileRepository(db_session)
+    profiles, next_cursor = await profiles_repository.paginate(limit, cursor)
+    # Same validators as get_profiles_validators, from the loaded rows
+    validators = Validators.for_list(
+        [(profile.id, profile.updated_at) for profile in profiles],
+        limit,
+        next_cursor is not None,
+    )
     # Transform the profiles into a list of ProfileOut models.
-    profiles = transform_entities(profiles, ProfileOut)
-    return profiles
+    profiles = transform_entities(profiles, ProfileOut, trusted=True)
+    return Page[ProfileOut](items=profiles, next_cursor=next_cursor), validators
+
+
+async def get_profiles_validators(
+    db_session: AsyncSession,
+    limit: int,
+    cursor: Optional[str] = None,
+) -> Validators:
+    # Only (id, updated_at) of the page, the rows are loaded if it changed
+    profiles_repository = ProfileRepository(db_session)
+    versions = await profiles_repository.page_versions(limit, cursor)
+    return Validators.for_list(versions[:limit], limit, len(versions) > limit)
+
+
+async def get_profile_validators(
+    profile_id: UUID,
+    db_session: AsyncSession,
+) -> Optional[Validators]:
+    profiles_repository = ProfileRepository(db_session)
+    updated_at = await profiles_repository.get_updated_at(profile_id)
+    return Validators.for_entity(profile_id, updated_at) if updated_at else None
+
+
+def get_profiles_loader(db_session: AsyncSession) -> DataLoader[str, List[Profile]]:
+    """
+    Builds a loader that resolves the profiles of many users with one query.
+
+    Args:
+        db_session (AsyncSession): The request database session.
+
+    Returns:
+        DataLoader[str, List[Profile]]: Profiles keyed by user ID.
+    """
+    profiles_repository = ProfileRepository(db_session)
+
+    async def batch_load(user_ids: List[str]) -> Dict[str, List[Profile]]:
+        return await profiles_repository.list_by_user_ids(user_ids)
+
+    return DataLoader(batch_load, default=list)
+
+
+async def stream_profiles(fetch_size: int) -> AsyncIterator[ProfileOut]:
+    # The stream outlives the request scoped session, so it opens its own
+    async with async_session() as db_session:
+        profiles_repository = ProfileRepository(db_session)
+        async for profile in profiles_repository.stream(fetch_size):
+            yield ProfileOut.model_validate(profile)
 
 
 async def get_profile(
     profile_id: str,
     db_session: AsyncSession,
-) -> ProfileOut:
-    query = select(Profile).where(
-        Profile.id == profile_id,
-        Profile.enabled is True,
-    )
-    profile = await db_session.exec(query)
-    profile = profile.first()
+) -> Optional[Tuple[ProfileOut, Validators]]:
+    profiles_repository = ProfileRepository(db_session)
+    profile = await profiles_repository.get_by_id(profile_id)
     if not profile:
         return None
-    profile = ProfileOut.model_validate(profile)
-    return profile
+    validators = Validators.for_entity(profile.id, profile.updated_at)
+    return ProfileOut.model_validate(profile), validators
 
 
 async def delete_profile(
@@ -42,12 +103,18 @@ async def delete_profile(
 ) -> bool:
     query = (
         update(Profile)
-        .where(Profile.id == profile_id)
+        .where(
+            Profile.id == profile_id,
+            Profile.enabled == True,  # noqa: E712
+        )
         .values(enabled=False)
         .returning(Profile)
     )
     profile = await db_session.exec(query)
     profile = profile.first()
+    await commit_rollback(db_session)
+    # Only once committed, a rolled back delete keeps the cached row
+    await entity_cache.delete(entity_key(Profile, "id", profile_id))
     return profile is not None
 
 
@@ -72,3 +139,62 @@ async def create_profile(
     profile = await db_session.exec(query)
     db_session.commit()
     return ProfileOut.model_validate(profile) if profile else None
+
+
+async def create_profiles(
+    profiles: List[ProfileIn],
+    db_session: AsyncSession,
+) -> BulkResult:
+    profiles_repository = ProfileRepository(db_session)
+    created = await profiles_repository.add_many(profiles)
+    await commit_rollback(db_session)
+    return BulkResult(
+        results=[
+            BulkItemResult(index=index, id=profile.id, status="created")
+            for index, profile in enumerate(created)
+        ],
+    )
+
+
+async def update_profiles(
+    profiles: List[ProfileBulkUpdate],
+    db_session: AsyncSession,
+) -> BulkResult:
+    profiles_repository = ProfileRepository(db_session)
+    updated = set(
+        await profiles_repository.update_many(
+            [profile.model_dump(exclude_unset=True) for profile in profiles],
+        ),
+    )
+    await commit_rollback(db_session)
+    await profiles_repository.invalidate(*updated)
+    return BulkResult(
+        results=[
+            BulkItemResult(
+                index=index,
+                id=profile.id,
+                status="updated" if profile.id in updated else "not_found",
+            )
+            for index, profile in enumerate(profiles)
+        ],
+    )
+
+
+async def delete_profiles(
+    profile_ids: List[UUID],
+    db_session: AsyncSession,
+) -> BulkResult:
+    profiles_repository = ProfileRepository(db_session)
+    deleted = set(await profiles_repository.delete_many(profile_ids))
+    await commit_rollback(db_session)
+    await profiles_repository.invalidate(*deleted)
+    return BulkResult(
+        results=[
+            BulkItemResult(
+                index=index,
+                id=profile_id,
+                status="deleted" if profile_id in deleted else "not_found",
+            )
+            for index, profile_id in enumerate(profile_ids)
+        ],
+    )
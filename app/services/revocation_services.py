@@ -0,0 +1,173 @@
+""" Revocation of tokens by `jti`, shared by the workers through the database. """
+import asyncio
+import contextlib
+import logging
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import select
+
+from app.models.sql.revoked_token import RevokedToken
+from app.utils.revocation import revocation_list
+from config.database import async_session
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_scheduler: Optional[asyncio.Task] = None
+
+
+@dataclass
+class RevocationMetrics:
+    """
+    Process-wide refresh counters.
+
+    Attributes:
+        refreshes (int): Incremental refreshes.
+        full_syncs (int): Reloads of the whole table.
+        failures (int): Refreshes that raised.
+        purged (int): Expired entries dropped from memory.
+        last_refresh (Optional[datetime]): When the list was last refreshed.
+    """
+
+    refreshes: int = 0
+    full_syncs: int = 0
+    failures: int = 0
+    purged: int = 0
+    last_refresh: Optional[datetime] = None
+    # Monotonic time of the last full sync
+    last_full_sync: float = float("-inf")
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "refreshes": self.refreshes,
+            "full_syncs": self.full_syncs,
+            "failures": self.failures,
+            "purged": self.purged,
+            "last_refresh": (
+                self.last_refresh.isoformat() if self.last_refresh else None
+            ),
+        }
+
+
+metrics = RevocationMetrics()
+
+
+def get_revocation_stats() -> Dict[str, Any]:
+    return {**revocation_list.info(), **metrics.as_dict()}
+
+
+def _timestamp(value: datetime) -> float:
+    # expires_at is stored as naive UTC
+    return value.replace(tzinfo=UTC).timestamp()
+
+
+async def revoke_token(jti: str, expires_at: float) -> None:
+    """
+    Revokes a token until it expires. The current worker refuses it at once,
+    the others after their next refresh.
+
+    Args:
+        jti (str): The `jti` claim of the token.
+        expires_at (float): The `exp` claim of the token.
+    """
+    statement = (
+        insert(RevokedToken)
+        .values(
+            jti=jti,
+            expires_at=datetime.fromtimestamp(expires_at, UTC).replace(
+                tzinfo=None,
+            ),
+        )
+        .on_conflict_do_nothing(index_elements=["jti"])
+    )
+    async with async_session() as db_session:
+        await db_session.exec(statement)
+        await db_session.commit()
+    revocation_list.add(jti, expires_at)
+
+
+async def refresh_revocations(full: bool = False) -> int:
+    """
+    Loads the tokens revoked since the last refresh, by increasing ID.
+
+    IDs may become visible out of order when concurrent revocations commit,
+    so the whole table is reloaded every `revocation_full_sync_seconds`,
+    which also purges the expired rows.
+
+    Args:
+        full (bool): Reload the whole table now.
+
+    Returns:
+        int: The number of rows read.
+    """
+    full = full or (
+        time.monotonic() - metrics.last_full_sync
+        >= settings.revocation_full_sync_seconds
+    )
+    now = datetime.utcnow()
+    query = (
+        select(RevokedToken.id, RevokedToken.jti, RevokedToken.expires_at)
+        .where(RevokedToken.expires_at > now)
+        .order_by(RevokedToken.id)
+    )
+    if not full:
+        query = query.where(RevokedToken.id > revocation_list.last_id)
+    try:
+        async with async_session() as db_session:
+            rows = (await db_session.exec(query)).all()
+            if full:
+                await db_session.exec(
+                    delete(RevokedToken).where(RevokedToken.expires_at <= now),
+                )
+                await db_session.commit()
+    except Exception:
+        metrics.failures += 1
+        raise
+    entries = ((row_id, jti, _timestamp(exp)) for row_id, jti, exp in rows)
+    if full:
+        revocation_list.replace(entries)
+        metrics.full_syncs += 1
+        metrics.last_full_sync = time.monotonic()
+    else:
+        revocation_list.update(entries)
+        metrics.refreshes += 1
+    metrics.purged += revocation_list.purge()
+    metrics.last_refresh = datetime.utcnow()
+    return len(rows)
+
+
+async def _run_periodically(interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await refresh_revocations()
+        except Exception:
+            # Already counted, the next run retries
+            logger.exception("Refresh of the revoked tokens failed")
+
+
+def start_scheduler(interval: float) -> None:
+    """
+    Runs `refresh_revocations` every `interval` seconds in the event loop.
+
+    Args:
+        interval (float): Seconds between the end of a refresh and the next one.
+    """
+    global _scheduler
+    if _scheduler is None or _scheduler.done():
+        _scheduler = asyncio.create_task(_run_periodically(interval))
+
+
+async def stop_scheduler() -> None:
+    global _scheduler
+    if _scheduler is None:
+        return
+    _scheduler.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await _scheduler
+    _scheduler = None
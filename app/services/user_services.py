@@ -1,23 +1,40 @@
-from typing import List, Optional
+import asyncio
+import logging
+from typing import AsyncIterator, List, Optional, Set, Tuple
 from uuid import UUID
 
 from pydantic import EmailStr
-from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.models import transform_entities
-from app.models.sql.user import User, UserIn, UserOut
+from app.models.page import Page
+from app.models.sql.profile import Profile, ProfileOut
+from app.models.sql.user import User, UserIn, UserOut, UserWithProfiles
 from app.repository.user import UserRepository
-from app.utils.passw import verify_password
+from app.services.hashing_services import HashingQueueFullError, password_hasher
+from app.utils.conditional import Validators
+from app.utils.dataloader import DataLoader
+from app.utils.passw import needs_rehash
+from config.database import async_session, commit_rollback
+
+logger = logging.getLogger(__name__)
+
+# Running rehashes, referenced until they are done
+_rehashes: Set[asyncio.Task] = set()
 
 
 async def create_user(
     db_session: AsyncSession,
     payload: UserIn,
 ) -> UserOut:
-    user = await User.create(db_session, **payload.model_dump())
-    user = UserOut.model_validate(user)
-    return user
+    users_repository = UserRepository(db_session)
+    user = await users_repository.add(
+        User(
+            username=payload.username,
+            password=await password_hasher.hash(payload.password),
+        ),
+    )
+    return UserOut.model_validate(user)
 
 
 async def get_user_by_username(
@@ -33,16 +50,77 @@ async def get_user(
     user_id: UUID,
     db_session: AsyncSession,
 ) -> Optional[UserOut]:
-    query = select(User).where(User.id == user_id, User.enabled is True)
-    user = await db_session.exec(query)
-    user = user.first()
+    users_repository = UserRepository(db_session)
+    user = await users_repository.get_by_id(user_id)
     return UserOut.model_validate(user) if user else None
 
 
-async def get_all_users(db_session: AsyncSession) -> List[UserOut]:
+async def get_favorite_profiles(
+    user_id: UUID,
+    db_session: AsyncSession,
+) -> List[ProfileOut]:
     users_repository = UserRepository(db_session)
-    users = await users_repository.list()
-    return transform_entities(users, UserOut) if users else None
+    profiles = await users_repository.get_fav_profiles(user_id)
+    return transform_entities(profiles, ProfileOut, trusted=True)
+
+
+async def embed_profiles(
+    users: List[UserOut],
+    profiles_loader: DataLoader[str, List[Profile]],
+) -> List[UserWithProfiles]:
+    # One query for all the users instead of one per user
+    profiles = await profiles_loader.load_many([str(user.id) for user in users])
+    return [
+        UserWithProfiles(
+            **user.model_dump(),
+            profiles=transform_entities(user_profiles, ProfileOut, trusted=True),
+            favorite_profiles=transform_entities(
+                [profile for profile in user_profiles if profile.favorite],
+                ProfileOut,
+                trusted=True,
+            ),
+        )
+        for user, user_profiles in zip(users, profiles)
+    ]
+
+
+async def get_all_users(
+    db_session: AsyncSession,
+    limit: int,
+    cursor: Optional[str] = None,
+) -> Tuple[Page[UserOut], Validators]:
+    users_repository = UserRepository(db_session)
+    users, next_cursor = await users_repository.paginate(limit, cursor)
+    # Same validators as get_users_validators, from the loaded rows
+    validators = Validators.for_list(
+        [(user.id, user.updated_at) for user in users],
+        limit,
+        next_cursor is not None,
+    )
+    page = Page[UserOut](
+        items=transform_entities(users, UserOut, trusted=True),
+        next_cursor=next_cursor,
+    )
+    return page, validators
+
+
+async def get_users_validators(
+    db_session: AsyncSession,
+    limit: int,
+    cursor: Optional[str] = None,
+) -> Validators:
+    # Only (id, updated_at) of the page, the rows are loaded if it changed
+    users_repository = UserRepository(db_session)
+    versions = await users_repository.page_versions(limit, cursor)
+    return Validators.for_list(versions[:limit], limit, len(versions) > limit)
+
+
+async def stream_users(fetch_size: int) -> AsyncIterator[UserOut]:
+    # The stream outlives the request scoped session, so it opens its own
+    async with async_session() as db_session:
+        users_repository = UserRepository(db_session)
+        async for user in users_repository.stream(fetch_size):
+            yield UserOut.model_validate(user)
 
 
 async def update_user(
@@ -51,6 +129,9 @@ async def update_user(
     db_session: AsyncSession,
 ) -> UserOut:
     users_repository = UserRepository(db_session)
+    user = user.model_copy(
+        update={"password": await password_hasher.hash(user.password)},
+    )
     user = await users_repository.update(user_id, user)
     return UserOut.model_validate(user) if user else None
 
@@ -68,6 +149,33 @@ async def authenticate_user(
 ) -> Optional[UserOut]:
     users_repository = UserRepository(db_session)
     user = await users_repository.get_by_username(username)
-    if not user or not verify_password(password, user.password):
+    if not user or not await password_hasher.verify(password, user.password):
         return None
+    if needs_rehash(user.password):
+        # After the response, the login only paid for the verification
+        task = asyncio.create_task(_rehash_password(user.id, password, user.password))
+        _rehashes.add(task)
+        task.add_done_callback(_rehashes.discard)
     return UserOut.model_validate(user)
+
+
+async def _rehash_password(user_id: UUID, password: str, old_hash: str) -> None:
+    try:
+        new_hash = await password_hasher.hash(password)
+        # The request session may be closed by then
+        async with async_session() as db_session:
+            users_repository = UserRepository(db_session)
+            replaced = await users_repository.replace_password(
+                user_id,
+                old_hash,
+                new_hash,
+            )
+            await commit_rollback(db_session)
+        if replaced:
+            await users_repository.invalidate(user_id)
+            password_hasher.metrics.rehashed += 1
+    except HashingQueueFullError:
+        # Retried on the next login
+        pass
+    except Exception:
+        logger.exception("Rehash of the password of user %s failed", user_id)
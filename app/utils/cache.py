@@ -0,0 +1,429 @@
+""" Cache backends for entity reads, in-process or shared through Redis. """
+import asyncio
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+)
+
+from sqlmodel import SQLModel
+
+from app.utils.resp import RespClient, RespError
+from config.settings import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+M = TypeVar("M", bound=SQLModel)
+V = TypeVar("V")
+
+
+@dataclass
+class CacheStats:
+    """
+    Cumulative counters of a cache.
+
+    Attributes:
+        hits (int): Lookups answered from the cache.
+        misses (int): Lookups of missing or expired keys.
+        evictions (int): Entries dropped to stay within the limits.
+        expirations (int): Entries dropped because their TTL elapsed.
+        invalidations (int): Entries dropped after a write.
+        coalesced (int): Misses that awaited the load of another coroutine.
+        stale_loads (int): Loads not cached, the key was invalidated meanwhile.
+        errors (int): Backend operations that failed, served as misses.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+    coalesced: int = 0
+    stale_loads: int = 0
+    errors: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups if lookups else 0.0, 4),
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "coalesced": self.coalesced,
+            "stale_loads": self.stale_loads,
+            "errors": self.errors,
+        }
+
+
+class LRUCache:
+    """
+    Least recently used cache of serialized values, bounded by a number of
+    entries and a total size in bytes. Entries expire `ttl` seconds after
+    they are set.
+
+    Args:
+        max_entries (int): The maximum number of entries.
+        max_bytes (int): The maximum total size of the values.
+        ttl (float): Seconds an entry stays valid.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._entries: OrderedDict[str, Tuple[float, bytes]] = OrderedDict()
+        self._bytes = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self._pop(key)
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        if len(value) > self.max_bytes:
+            return
+        if key in self._entries:
+            self._pop(key)
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._bytes += len(value)
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._pop(next(iter(self._entries)))
+            self.stats.evictions += 1
+
+    def delete(self, *keys: str) -> None:
+        for key in keys:
+            if key in self._entries:
+                self._pop(key)
+                self.stats.invalidations += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def _pop(self, key: str) -> None:
+        _, value = self._entries.pop(key)
+        self._bytes -= len(value)
+
+    def info(self) -> Dict[str, Any]:
+        """
+        Returns the size of the cache and its counters.
+
+        Returns:
+            Dict[str, Any]: Entries, bytes, limits, hits, misses and evictions.
+        """
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl,
+            **self.stats.as_dict(),
+        }
+
+
+class CacheBackend(ABC):
+    """Asynchronous key-value store of serialized entities."""
+
+    name: str
+    # Whether the entries are read by other processes
+    shared: bool = False
+
+    def __init__(self) -> None:
+        self.stats = CacheStats()
+        # Keys being loaded -> [loads in progress, invalidations since the first]
+        self._loading: Dict[str, List[int]] = {}
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes) -> None:
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None:
+        raise NotImplementedError()
+
+    async def close(self) -> None:
+        pass
+
+    def begin_load(self, key: str) -> int:
+        """
+        Registers a load of `key` from the database, before its query runs.
+
+        Returns:
+            int: The version of `key` to pass to `end_load`.
+        """
+        entry = self._loading.setdefault(key, [0, 0])
+        entry[0] += 1
+        return entry[1]
+
+    async def end_load(self, key: str, version: int, value: Optional[bytes]) -> None:
+        """
+        Caches the loaded `value`, unless `key` was invalidated since
+        `begin_load`: the query may have read the row before a write
+        committed, caching it would serve the old row for the whole TTL.
+
+        Called once per `begin_load`, with None if nothing was loaded. Only
+        the invalidations of this process are seen.
+        """
+        entry = self._loading[key]
+        entry[0] -= 1
+        if not entry[0]:
+            del self._loading[key]
+        if value is None:
+            return
+        if entry[1] != version:
+            self.stats.stale_loads += 1
+            return
+        await self.set(key, value)
+
+    def _invalidated(self, keys: Tuple[str, ...]) -> None:
+        # Called before the keys are deleted, the loads in progress are stale
+        for key in keys:
+            entry = self._loading.get(key)
+            if entry is not None:
+                entry[1] += 1
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "enabled": settings.cache_enabled,
+            "backend": self.name,
+            **self.stats.as_dict(),
+        }
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Per-process `LRUCache`, invalidations are not seen by other workers."""
+
+    name = "memory"
+
+    def __init__(self, lru: LRUCache) -> None:
+        super().__init__()
+        self.lru = lru
+        self.stats = lru.stats
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self.lru.get(key)
+
+    async def set(self, key: str, value: bytes) -> None:
+        self.lru.set(key, value)
+
+    async def delete(self, *keys: str) -> None:
+        self._invalidated(keys)
+        self.lru.delete(*keys)
+
+    def info(self) -> Dict[str, Any]:
+        return {**super().info(), **self.lru.info()}
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Cache shared by every worker through a Redis compatible server.
+
+    Memory is bounded by the server `maxmemory` policy. When the server cannot
+    be reached reads are misses and writes are dropped, so requests fall back
+    to the database.
+
+    Args:
+        client (RespClient): The server connection pool.
+        ttl (float): Seconds an entry stays valid.
+        prefix (str): Prepended to every key.
+    """
+
+    name = "redis"
+    shared = True
+
+    def __init__(self, client: RespClient, ttl: float, prefix: str = "") -> None:
+        super().__init__()
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[bytes]:
+        try:
+            value = await self.client.get(self.prefix + key)
+        except (OSError, RespError, TimeoutError):
+            self._failed("GET")
+            value = None
+        if value is None:
+            self.stats.misses += 1
+        else:
+            self.stats.hits += 1
+        return value
+
+    async def set(self, key: str, value: bytes) -> None:
+        try:
+            await self.client.set(self.prefix + key, value, self.ttl)
+        except (OSError, RespError, TimeoutError):
+            self._failed("SET")
+
+    async def delete(self, *keys: str) -> None:
+        if not keys:
+            return
+        self._invalidated(keys)
+        try:
+            await self.client.delete(*(self.prefix + key for key in keys))
+        except (OSError, RespError, TimeoutError):
+            # The entries expire after `ttl` at the latest
+            self._failed("DEL")
+            return
+        self.stats.invalidations += len(keys)
+
+    async def close(self) -> None:
+        await self.client.close()
+
+    def _failed(self, command: str) -> None:
+        self.stats.errors += 1
+        logger.warning("Cache %s failed", command, exc_info=True)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent loads of the same key: the first caller runs the
+    load and the others await its result.
+    """
+
+    def __init__(self, stats: Optional[CacheStats] = None) -> None:
+        self.stats = stats
+        self._calls: Dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, load: Callable[[], Awaitable[V]]) -> V:
+        call = self._calls.get(key)
+        if call is not None:
+            if self.stats is not None:
+                self.stats.coalesced += 1
+            # asyncio.wait does not raise if the leader was cancelled
+            await asyncio.wait([call])
+            if not call.cancelled():
+                return call.result()
+            return await self.do(key, load)
+        call = asyncio.get_running_loop().create_future()
+        self._calls[key] = call
+        try:
+            result = await load()
+        except asyncio.CancelledError:
+            call.cancel()
+            raise
+        except Exception as exc:
+            call.set_exception(exc)
+            # Consumed here if nobody else awaits it
+            call.exception()
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
+
+def _dumps(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, default=str, separators=(",", ":")).encode()
+
+
+def dump_entity(record: SQLModel) -> bytes:
+    """
+    Serializes the column values of `record` as a JSON array in field order,
+    without the field names.
+
+    Args:
+        record (SQLModel): The entity.
+
+    Returns:
+        bytes: The compact serialized entity.
+    """
+    return _dumps([getattr(record, name) for name in type(record).model_fields])
+
+
+def load_entity(model_cls: Type[M], data: bytes) -> M:
+    """
+    Rebuilds an entity serialized by `dump_entity`.
+
+    Args:
+        model_cls (Type[M]): The entity model.
+        data (bytes): The serialized entity.
+
+    Returns:
+        M: A new, validated, instance of `model_cls`.
+    """
+    values = orjson.loads(data) if orjson is not None else json.loads(data)
+    return model_cls.model_validate(dict(zip(model_cls.model_fields, values)))
+
+
+def entity_key(model_cls: type, field: str, value: Any) -> str:
+    """
+    Builds the cache key of an entity looked up by `field`.
+
+    Args:
+        model_cls (type): The table model.
+        field (str): The looked up column, e.g. "id" or "username".
+        value (Any): The looked up value.
+
+    Returns:
+        str: The key, e.g. "users:id:<uuid>".
+    """
+    return f"{model_cls.__tablename__}:{field}:{value}"
+
+
+def build_cache_backend() -> CacheBackend:
+    """
+    Builds the backend selected by `settings.cache_backend`.
+
+    Returns:
+        CacheBackend: The entity cache.
+    """
+    if settings.cache_backend == "redis":
+        return RedisCacheBackend(
+            RespClient(
+                settings.cache_redis_url,
+                pool_size=settings.cache_redis_pool_size,
+                timeout=settings.cache_redis_timeout,
+            ),
+            ttl=settings.cache_ttl_seconds,
+            prefix=settings.cache_key_prefix,
+        )
+    return MemoryCacheBackend(
+        LRUCache(
+            max_entries=settings.cache_max_entries,
+            max_bytes=settings.cache_max_bytes,
+            ttl=settings.cache_ttl_seconds,
+        ),
+    )
+
+
+entity_cache = build_cache_backend()
+# One database load per key and process while the entry is missing
+entity_loads = SingleFlight(entity_cache.stats)
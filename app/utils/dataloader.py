@@ -0,0 +1,98 @@
+import asyncio
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    List,
+    Optional,
+    Set,
+    TypeVar,
+)
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class DataLoader(Generic[K, V]):
+    """
+    Batches the keys requested during one event loop iteration into a single
+    call of `batch_load`, and caches the results for its lifetime.
+
+    Create one loader per request so the cache never outlives the session
+    used by `batch_load`.
+
+    Args:
+        batch_load (Callable): Resolves a list of keys to a mapping of values.
+        default (Callable, optional): Builds the value of keys missing from
+            that mapping. Defaults to returning None.
+    """
+
+    def __init__(
+        self,
+        batch_load: Callable[[List[K]], Awaitable[Dict[K, V]]],
+        default: Callable[[], Optional[V]] = lambda: None,
+    ) -> None:
+        self._batch_load = batch_load
+        self._default = default
+        self._futures: Dict[K, asyncio.Future] = {}
+        self._queue: List[K] = []
+        # The event loop only keeps weak references to tasks
+        self._tasks: Set[asyncio.Task] = set()
+        # An AsyncSession cannot run two statements at once
+        self._lock = asyncio.Lock()
+
+    def load(self, key: K) -> "asyncio.Future[V]":
+        """
+        Schedules `key` for the next batch.
+
+        Args:
+            key (K): The key to resolve.
+
+        Returns:
+            asyncio.Future[V]: The value of the key.
+        """
+        future = self._futures.get(key)
+        # A caller cancelled while waiting does not cancel later loads
+        if future is not None and not future.cancelled():
+            return future
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._futures[key] = future
+        self._queue.append(key)
+        if len(self._queue) == 1:
+            loop.call_soon(self._schedule)
+        return future
+
+    async def load_many(self, keys: List[K]) -> List[V]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def _schedule(self) -> None:
+        task = asyncio.ensure_future(self._dispatch())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self) -> None:
+        # A key loaded again after a cancellation is queued twice
+        keys = list(dict.fromkeys(self._queue))
+        self._queue = []
+        try:
+            async with self._lock:
+                values = await self._batch_load(keys)
+        except Exception as exc:
+            for key in keys:
+                # Failed keys are retried by the next load
+                future = self._futures.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(exc)
+            return
+        for key in keys:
+            future = self._futures.get(key)
+            if future is None:
+                continue
+            if future.cancelled():
+                # Loaded again by the next caller
+                del self._futures[key]
+            elif not future.done():
+                future.set_result(values[key] if key in values else self._default())
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from fastapi import HTTPException, status
 
 
@@ -42,7 +44,6 @@ class NotFoundException(HTTPException):
         detail: str = "Resource not found",
         resource: str = None,
     ):
-        super().__init__(detail)
         super().__init__(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Resource not found: {resource}" if resource else detail,
@@ -139,3 +140,27 @@ class ServerErrorException(HTTPException):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=detail,
         )
+
+
+class ServiceUnavailableException(HTTPException):
+    """
+    Exception raised when the server is too busy to handle the request.
+
+    Args:
+        detail (str, optional): Additional detail about the exception.
+        Defaults to "Service unavailable".
+        retry_after (int, optional): Seconds after which the client may retry.
+    """
+
+    def __init__(
+        self,
+        detail: str = "Service unavailable",
+        retry_after: Optional[int] = None,
+    ):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+            headers=(
+                {"Retry-After": str(retry_after)} if retry_after is not None else None
+            ),
+        )
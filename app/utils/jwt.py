@@ -1,14 +1,126 @@
+import hashlib
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Dict, Optional, Tuple
+from uuid import uuid4
 
 import jwt
 from fastapi import Request
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
+from app.utils.cache import CacheStats
 from app.utils.exceptions import ForbiddenException
+from app.utils.revocation import RevokedTokenError, revocation_list
 from config.settings import settings
 
 
+class VerifiedTokenCache:
+    """
+    Claims of tokens whose signature was already verified, so that a token
+    reused for many requests is only decoded once.
+
+    Entries are keyed by a digest of the token, the token itself is not kept,
+    and dropped when the token expires. Tokens without `exp` are not cached.
+    Changing `jwt_secret_key` or `jwt_algorithm` clears the cache, a token
+    signed with a rotated out key is verified again.
+
+    Args:
+        max_entries (int): The maximum number of tokens, least recently used
+            ones are dropped first.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        # Token digest -> (claims, exp as a Unix timestamp)
+        self._entries: OrderedDict[bytes, Tuple[Dict[str, Any], float]] = OrderedDict()
+        self._key: Tuple[str, str] = (settings.jwt_secret_key, settings.jwt_algorithm)
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+    def _check_key(self) -> None:
+        key = (settings.jwt_secret_key, settings.jwt_algorithm)
+        if key != self._key:
+            self.clear()
+            self._key = key
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        self._check_key()
+        digest = self._digest(token)
+        entry = self._entries.get(digest)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+        claims, expires_at = entry
+        if expires_at <= time.time():
+            del self._entries[digest]
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(digest)
+        self.stats.hits += 1
+        # Callers may modify the claims, the cached ones stay intact
+        return dict(claims)
+
+    def set(self, token: str, claims: Dict[str, Any]) -> None:
+        expires_at = claims.get("exp")
+        if not isinstance(expires_at, (int, float)):
+            return
+        self._check_key()
+        self._entries[self._digest(token)] = (dict(claims), expires_at)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def clear(self) -> None:
+        self.stats.invalidations += len(self._entries)
+        self._entries.clear()
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "enabled": settings.jwt_cache_enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            **self.stats.as_dict(),
+        }
+
+
+token_cache = VerifiedTokenCache(settings.jwt_cache_max_entries)
+
+
+def decode_verified(token: str) -> Dict[str, Any]:
+    """
+    Returns the claims of a token, verifying it unless it already was.
+
+    Args:
+        token (str): The encoded token.
+
+    Returns:
+        Dict[str, Any]: The claims.
+
+    Raises:
+        jwt.InvalidTokenError: The token is malformed, forged, expired or
+            revoked.
+    """
+    claims = token_cache.get(token) if settings.jwt_cache_enabled else None
+    if claims is None:
+        claims = jwt.decode(
+            token,
+            settings.jwt_secret_key,
+            algorithms=[settings.jwt_algorithm],
+        )
+        if settings.jwt_cache_enabled:
+            token_cache.set(token, claims)
+    # Checked on every call, a cached token can be revoked afterwards
+    jti = claims.get("jti")
+    if jti is not None and revocation_list.is_revoked(jti):
+        raise RevokedTokenError("Token has been revoked")
+    return claims
+
+
 class JWTRepo:
     def __init__(self, data: dict = None, token: str = None):
         self.data = data or {}
@@ -21,6 +133,8 @@ class JWTRepo:
         else:
             expire = datetime.utcnow() + timedelta(minutes=15)
         to_encode.update({"exp": expire})
+        # Identifies the token in the revocation list
+        to_encode.setdefault("jti", uuid4().hex)
         encode_jwt = jwt.encode(
             to_encode,
             settings.jwt_secret_key,
@@ -31,26 +145,13 @@ class JWTRepo:
 
     def decode_token(self) -> dict:
         try:
-            decode_token = jwt.decode(
-                self.token,
-                settings.jwt_secret_key,
-                algorithms=[settings.jwt_algorithm],
-            )
-            return (
-                decode_token
-                if decode_token["expires"] >= datetime.time()
-                else None
-            )
-        except (jwt.ExpiredSignatureError, jwt.InvalidTokenError, ValueError):
+            return decode_verified(self.token)
+        except (jwt.InvalidTokenError, ValueError):
             return {}
 
     @staticmethod
     def extract_token(token: str):
-        return jwt.decode(
-            token,
-            settings.jwt_secret_key,
-            algorithms=[settings.jwt_algorithm],
-        )
+        return decode_verified(token)
 
 
 class JWTBearer(HTTPBearer):
@@ -72,11 +173,7 @@ class JWTBearer(HTTPBearer):
     @staticmethod
     def verify_jwt(jwt_token: str) -> bool:
         try:
-            jwt.decode(
-                jwt_token,
-                settings.jwt_secret_key,
-                algorithms=[settings.jwt_algorithm],
-            )
+            decode_verified(jwt_token)
             return True
         except (jwt.ExpiredSignatureError, jwt.InvalidTokenError):
             return False
@@ -0,0 +1,43 @@
+""" Opaque cursor tokens for keyset pagination. """
+import binascii
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+from typing import Tuple
+from uuid import UUID
+
+
+def encode_cursor(created_at: datetime, model_id: UUID) -> str:
+    """
+    Encodes the sort key of the last row of a page as an opaque token.
+
+    Args:
+        created_at (datetime): The creation time of the row.
+        model_id (UUID): The ID of the row.
+
+    Returns:
+        str: The cursor token.
+    """
+    payload = json.dumps([created_at.isoformat(), str(model_id)])
+    return urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    Decodes a cursor token produced by `encode_cursor`.
+
+    Args:
+        cursor (str): The cursor token.
+
+    Raises:
+        ValueError: If the token is malformed.
+
+    Returns:
+        Tuple[datetime, str]: The creation time and ID of the last seen row.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, model_id = json.loads(urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), str(UUID(model_id))
+    except (binascii.Error, TypeError, ValueError) as exc:
+        raise ValueError(f"Invalid cursor {cursor}") from exc
@@ -1,6 +1,64 @@
+import statistics
+import time
+from typing import Any, Callable, Dict
+
 from passlib.context import CryptContext
+from passlib.hash import argon2, bcrypt
+
+from config.settings import settings
+
+# Smallest and largest bcrypt cost factors accepted by passlib
+BCRYPT_MIN_ROUNDS = 4
+BCRYPT_MAX_ROUNDS = 31
+
+
+def build_context(
+    scheme: str = "bcrypt",
+    bcrypt_rounds: int = 12,
+    argon2_time_cost: int = 2,
+    argon2_memory_cost: int = 19456,
+    argon2_parallelism: int = 1,
+) -> CryptContext:
+    """
+    Builds the hashing policy: new hashes use `scheme` with the given
+    parameters, hashes of the other scheme or with other parameters still
+    verify but are reported by `needs_rehash`.
+
+    Args:
+        scheme (str): "bcrypt", or "argon2" which needs argon2-cffi.
+        bcrypt_rounds (int): The bcrypt cost factor, log2 of the iterations.
+        argon2_time_cost (int): The argon2 passes over the memory.
+        argon2_memory_cost (int): The argon2 memory in KiB.
+        argon2_parallelism (int): The argon2 lanes.
+
+    Returns:
+        CryptContext: The password context.
+    """
+    if scheme == "argon2" and not argon2.has_backend():
+        raise RuntimeError("The argon2 password scheme requires argon2-cffi")
+    schemes = [scheme] + [
+        name
+        for name in ("bcrypt", "argon2")
+        if name != scheme and (name != "argon2" or argon2.has_backend())
+    ]
+    return CryptContext(
+        schemes=schemes,
+        default=scheme,
+        deprecated="auto",
+        bcrypt__rounds=bcrypt_rounds,
+        argon2__rounds=argon2_time_cost,
+        argon2__memory_cost=argon2_memory_cost,
+        argon2__parallelism=argon2_parallelism,
+    )
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+pwd_context = build_context(
+    scheme=settings.password_scheme,
+    bcrypt_rounds=settings.bcrypt_rounds,
+    argon2_time_cost=settings.argon2_time_cost,
+    argon2_memory_cost=settings.argon2_memory_cost,
+    argon2_parallelism=settings.argon2_parallelism,
+)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -28,3 +86,127 @@ def get_password_hash(password: str) -> str:
         str: The hashed password.
     """
     return pwd_context.hash(password)
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    """
+    Whether a stored hash uses another scheme or other parameters than the
+    current policy. Only the hash string is parsed, nothing is computed.
+
+    Args:
+        hashed_password (str): The stored hash.
+
+    Returns:
+        bool: True if the password should be hashed again.
+    """
+    return pwd_context.needs_update(hashed_password)
+
+
+def _verify_ms(hasher: Any, samples: int) -> float:
+    # Median of a few verifications, the first one is not counted as a warm up
+    hashed = hasher.hash("calibration-password")
+    hasher.verify("calibration-password", hashed)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        hasher.verify("calibration-password", hashed)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def _calibrate(
+    measure: Callable[[int], float],
+    start: int,
+    stop: int,
+    target_ms: float,
+) -> Dict[str, Any]:
+    # Costs grow with the parameter, keep the largest one within the target
+    chosen, chosen_ms = start, measure(start)
+    for cost in range(start + 1, stop + 1):
+        elapsed_ms = measure(cost)
+        if elapsed_ms > target_ms:
+            break
+        chosen, chosen_ms = cost, elapsed_ms
+    return {"cost": chosen, "verify_ms": round(chosen_ms, 1)}
+
+
+def calibrate_bcrypt(target_ms: float, samples: int = 3) -> Dict[str, Any]:
+    """
+    Finds the largest bcrypt cost factor whose verification takes at most
+    `target_ms` on this host.
+
+    Args:
+        target_ms (float): The acceptable verification latency.
+        samples (int): Verifications timed per cost factor.
+
+    Returns:
+        Dict[str, Any]: The parameters, the measured latency and the
+        settings to apply them.
+    """
+    result = _calibrate(
+        lambda rounds: _verify_ms(bcrypt.using(rounds=rounds), samples),
+        BCRYPT_MIN_ROUNDS,
+        BCRYPT_MAX_ROUNDS,
+        target_ms,
+    )
+    return {
+        "scheme": "bcrypt",
+        "rounds": result["cost"],
+        "verify_ms": result["verify_ms"],
+        "target_ms": target_ms,
+        "settings": {
+            "PASSWORD_SCHEME": "bcrypt",
+            "BCRYPT_ROUNDS": result["cost"],
+        },
+    }
+
+
+def calibrate_argon2(
+    target_ms: float,
+    memory_cost: int = 19456,
+    parallelism: int = 1,
+    samples: int = 3,
+) -> Dict[str, Any]:
+    """
+    Finds the largest argon2 time cost whose verification takes at most
+    `target_ms` on this host. The memory is halved until a single pass fits.
+
+    Args:
+        target_ms (float): The acceptable verification latency.
+        memory_cost (int): The memory in KiB to start from.
+        parallelism (int): The argon2 lanes.
+        samples (int): Verifications timed per parameter set.
+
+    Returns:
+        Dict[str, Any]: The parameters, the measured latency and the
+        settings to apply them.
+    """
+    if not argon2.has_backend():
+        raise RuntimeError("argon2 calibration requires argon2-cffi")
+
+    def measure(time_cost: int) -> float:
+        hasher = argon2.using(
+            rounds=time_cost,
+            memory_cost=memory_cost,
+            parallelism=parallelism,
+        )
+        return _verify_ms(hasher, samples)
+
+    # argon2 requires at least 8 KiB per lane
+    while memory_cost // 2 >= 8 * parallelism and measure(1) > target_ms:
+        memory_cost //= 2
+    result = _calibrate(measure, 1, 100, target_ms)
+    return {
+        "scheme": "argon2",
+        "time_cost": result["cost"],
+        "memory_cost": memory_cost,
+        "parallelism": parallelism,
+        "verify_ms": result["verify_ms"],
+        "target_ms": target_ms,
+        "settings": {
+            "PASSWORD_SCHEME": "argon2",
+            "ARGON2_TIME_COST": result["cost"],
+            "ARGON2_MEMORY_COST": memory_cost,
+            "ARGON2_PARALLELISM": parallelism,
+        },
+    }
@@ -0,0 +1,135 @@
+""" Minimal asyncio client for servers speaking the Redis protocol (RESP2). """
+import asyncio
+from typing import Any, List, Optional, Union
+from urllib.parse import urlparse
+
+
+class RespError(Exception):
+    """Error reply sent by the server."""
+
+
+def encode_command(*args: Union[str, bytes, int, float]) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if not isinstance(arg, bytes):
+            arg = str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+async def read_reply(reader: asyncio.StreamReader) -> Any:
+    line = await reader.readuntil(b"\r\n")
+    prefix, payload = line[:1], line[1:-2]
+    if prefix == b"+":
+        return payload.decode()
+    if prefix == b"-":
+        raise RespError(payload.decode())
+    if prefix == b":":
+        return int(payload)
+    if prefix == b"$":
+        length = int(payload)
+        if length < 0:
+            return None
+        return (await reader.readexactly(length + 2))[:-2]
+    if prefix == b"*":
+        length = int(payload)
+        if length < 0:
+            return None
+        return [await read_reply(reader) for _ in range(length)]
+    raise RespError(f"Unexpected reply {line!r}")
+
+
+class RespConnection:
+    """One connection, commands are sent and answered one at a time."""
+
+    def __init__(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        self._reader = reader
+        self._writer = writer
+
+    async def execute(self, *args: Union[str, bytes, int, float]) -> Any:
+        self._writer.write(encode_command(*args))
+        await self._writer.drain()
+        return await read_reply(self._reader)
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+class RespClient:
+    """
+    Pool of connections to a Redis compatible server.
+
+    Args:
+        url (str): `redis://[:password@]host[:port][/db]`.
+        pool_size (int): The maximum number of open connections.
+        timeout (float): Seconds to wait for a connection or a reply.
+    """
+
+    def __init__(self, url: str, pool_size: int = 10, timeout: float = 1.0) -> None:
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._idle: List[RespConnection] = []
+        self._slots = asyncio.Semaphore(pool_size)
+
+    async def _connect(self) -> RespConnection:
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        connection = RespConnection(reader, writer)
+        try:
+            if self.password:
+                await connection.execute("AUTH", self.password)
+            if self.db:
+                await connection.execute("SELECT", self.db)
+        except BaseException:
+            connection.close()
+            raise
+        return connection
+
+    async def execute(self, *args: Union[str, bytes, int, float]) -> Any:
+        """
+        Sends a command on an idle connection, opening one if needed.
+
+        Raises:
+            RespError: The server replied with an error.
+            OSError | TimeoutError: The server cannot be reached.
+        """
+        async with self._slots:
+            connection = self._idle.pop() if self._idle else None
+            try:
+                async with asyncio.timeout(self.timeout):
+                    if connection is None:
+                        # Closes its socket itself if AUTH or SELECT fails
+                        connection = await self._connect()
+                    reply = await connection.execute(*args)
+            except RespError:
+                # The command failed on an established connection, still usable
+                if connection is not None:
+                    self._idle.append(connection)
+                raise
+            except BaseException:
+                # The connection state is unknown, never reuse it
+                if connection is not None:
+                    connection.close()
+                raise
+            self._idle.append(connection)
+            return reply
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.execute("GET", key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self.execute("SET", key, value, "PX", int(ttl * 1000))
+
+    async def delete(self, *keys: str) -> int:
+        return await self.execute("DEL", *keys)
+
+    async def close(self) -> None:
+        while self._idle:
+            self._idle.pop().close()
@@ -0,0 +1,82 @@
+""" Opt-in fast JSON serialization of typed responses. """
+import asyncio
+from functools import wraps
+from typing import Any, Callable
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Serializes pydantic models with their compiled serializer and anything
+    else with orjson when it is installed, the standard library otherwise.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.model_dump_json(by_alias=True).encode()
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        return super().render(content)
+
+
+class FastJSONRoute(APIRoute):
+    """
+    Route that sends an endpoint result as is when it already is an instance
+    of exactly the `response_model` class, skipping FastAPI's revalidation and
+    `jsonable_encoder` pass.
+
+    Subclass instances are still revalidated, so fields outside the response
+    model are never leaked. Routes filtering their output with the
+    `response_model_*` options are left untouched.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        super().__init__(path, endpoint, **kwargs)
+        if self._can_skip_validation():
+            self.dependant.call = self._passthrough(self.dependant.call)
+
+    def _can_skip_validation(self) -> bool:
+        return (
+            isinstance(self.response_model, type)
+            and issubclass(self.response_model, BaseModel)
+            and asyncio.iscoroutinefunction(self.dependant.call)
+            and self.response_model_include is None
+            and self.response_model_exclude is None
+            and self.response_model_by_alias
+            and not self.response_model_exclude_unset
+            and not self.response_model_exclude_defaults
+            and not self.response_model_exclude_none
+        )
+
+    def _passthrough(self, call: Callable[..., Any]) -> Callable[..., Any]:
+        response_model = self.response_model
+        status_code = self.status_code
+
+        @wraps(call)
+        async def endpoint(**values: Any) -> Any:
+            content = await call(**values)
+            if type(content) is not response_model:
+                return content
+            response = FastJSONResponse(content, status_code=status_code or 200)
+            # Headers and status set on the injected `Response` parameter
+            for value in values.values():
+                if isinstance(value, Response):
+                    response.raw_headers.extend(
+                        header
+                        for header in value.raw_headers
+                        if header[0] != b"content-length"
+                    )
+                    if value.status_code:
+                        response.status_code = value.status_code
+            return response
+
+        return endpoint
@@ -1,5 +1,10 @@
 from fastapi import APIRouter
+from fastapi.routing import APIRoute
+
+from app.utils.responses import FastJSONRoute
+from config.settings import settings
 
 
 def get_api_router(module: str) -> APIRouter:
-    return APIRouter(prefix=f"/{module}")
+    route_class = FastJSONRoute if settings.fast_json else APIRoute
+    return APIRouter(prefix=f"/{module}", route_class=route_class)
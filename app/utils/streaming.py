@@ -0,0 +1,33 @@
+from typing import AsyncIterator
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+async def ndjson_lines(models: AsyncIterator[BaseModel]) -> AsyncIterator[bytes]:
+    """
+    Serializes models as newline delimited JSON, one line per model.
+
+    Args:
+        models (AsyncIterator[BaseModel]): The models to serialize.
+
+    Yields:
+        bytes: One JSON document followed by a newline.
+    """
+    async for model in models:
+        yield model.model_dump_json().encode() + b"\n"
+
+
+def ndjson_response(models: AsyncIterator[BaseModel]) -> StreamingResponse:
+    """
+    Streams models to the client as they are produced.
+
+    Args:
+        models (AsyncIterator[BaseModel]): The models to stream.
+
+    Returns:
+        StreamingResponse: The NDJSON response.
+    """
+    return StreamingResponse(ndjson_lines(models), media_type=NDJSON_MEDIA_TYPE)
@@ -0,0 +1,41 @@
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+
+class StartupTimings:
+    """
+    Records how long each startup phase takes.
+
+    Attributes:
+        phases (Dict[str, float]): Seconds spent per phase, in execution order.
+    """
+
+    def __init__(self) -> None:
+        self.phases: Dict[str, float] = {}
+
+    def record(self, name: str, seconds: float) -> None:
+        self.phases[name] = seconds
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Times the wrapped block as the phase `name`.
+
+        Args:
+            name (str): The phase name.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            **{name: round(seconds, 6) for name, seconds in self.phases.items()},
+            "total": round(sum(self.phases.values()), 6),
+        }
+
+
+startup_timings = StartupTimings()
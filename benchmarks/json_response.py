@@ -0,0 +1,77 @@
+"""
+Requests per second of a 1,000-row list endpoint, with and without the
+fast JSON mode (`FAST_JSON=1`).
+
+The default path revalidates the `Page[ProfileOut]` returned by the endpoint
+against its response_model, runs `jsonable_encoder` and encodes with the
+standard library. The fast path serializes the page directly. The rows are
+built once, so only the response path is measured and no database is needed.
+
+Run with `python -m benchmarks.json_response`.
+"""
+import asyncio
+import time
+from uuid import uuid4
+
+import httpx
+from fastapi import APIRouter, FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+
+from app.models.page import Page
+from app.models.sql.profile import ProfileOut
+from app.utils.responses import FastJSONResponse, FastJSONRoute
+
+ROWS = 1_000
+REQUESTS = 300
+
+page = Page[ProfileOut](
+    items=[
+        ProfileOut(
+            id=uuid4(),
+            name=f"profile {index}",
+            description="A profile used by the benchmark " * 3,
+            user_id=str(uuid4()),
+        )
+        for index in range(ROWS)
+    ],
+    next_cursor="eyJjIjogIjIwMjYtMTAtMTgifQ",
+)
+
+
+def build_app(route_class, response_class) -> FastAPI:
+    router = APIRouter(route_class=route_class)
+
+    @router.get("/profiles", response_model=Page[ProfileOut])
+    async def get_profiles():
+        return page
+
+    app = FastAPI(default_response_class=response_class)
+    app.include_router(router)
+    return app
+
+
+async def run(app: FastAPI) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport,
+        base_url="http://bench",
+    ) as client:
+        await client.get("/profiles")
+        start = time.perf_counter()
+        for _ in range(REQUESTS):
+            response = await client.get("/profiles")
+            response.raise_for_status()
+    return REQUESTS / (time.perf_counter() - start)
+
+
+async def main():
+    default = await run(build_app(APIRoute, JSONResponse))
+    fast = await run(build_app(FastJSONRoute, FastJSONResponse))
+    print(f"{ROWS} rows, response_model + JSONResponse: {default:8.1f} req/s")
+    print(f"{ROWS} rows, fast JSON mode:                {fast:8.1f} req/s")
+    print(f"speedup: {fast / default:.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
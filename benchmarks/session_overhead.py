@@ -0,0 +1,50 @@
+"""
+Per-request overhead of the `get_session` dependency.
+
+Compares building a `sessionmaker` on every request against the shared
+module-level factory. Neither path issues a query, so no database is needed
+and the pool must report zero checkouts afterwards.
+
+Run with `python -m benchmarks.session_overhead`.
+"""
+import asyncio
+import time
+
+from sqlalchemy.orm import sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from config.database import engine, get_pool_stats, get_session
+
+ITERATIONS = 20_000
+
+
+async def legacy_get_session() -> AsyncSession:
+    async_session = sessionmaker(
+        bind=engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+    )
+    async with async_session() as session:
+        yield session
+
+
+async def run(dependency) -> float:
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        generator = dependency()
+        await generator.__anext__()
+        await generator.aclose()
+    return (time.perf_counter() - start) / ITERATIONS * 1_000_000
+
+
+async def main():
+    legacy = await run(legacy_get_session)
+    shared = await run(get_session)
+    print(f"sessionmaker per request: {legacy:8.2f} us/request")
+    print(f"shared async_sessionmaker: {shared:8.2f} us/request")
+    print(f"speedup: {legacy / shared:.1f}x")
+    print(f"pool checkouts: {get_pool_stats()['primary']['checkouts']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
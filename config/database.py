@@ -1,15 +1,31 @@
+import asyncio
 import logging
+from pathlib import Path
 
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import text
 from sqlalchemy.engine import URL
-from sqlalchemy.ext.asyncio import create_async_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlmodel import SQLModel
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.core.models import LogicalDeleteModel
+from config.instrumentation import instrument_engine
+from config.pool import InstrumentedAsyncQueuePool
+from config.replica import ReplicaHealth, RoutingSession
 from config.settings import settings
+from config.soft_delete import apply_soft_delete
 
 logger = logging.getLogger(__name__)
 
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
 
 ## Database URL for SQLAlchemy connection string
 db_url = URL.create(
@@ -21,8 +37,99 @@ db_url = URL.create(
     database=settings.db_name,
 ).render_as_string(hide_password=False)
 
+## Optional read replica, sharing the primary credentials
+replica_url = (
+    URL.create(
+        drivername=settings.db_driver,
+        username=settings.db_user,
+        password=settings.db_password,
+        host=settings.db_replica_host,
+        port=settings.db_replica_port or settings.db_port,
+        database=settings.db_name,
+    ).render_as_string(hide_password=False)
+    if settings.db_replica_host
+    else None
+)
+
+# asyncpg specific connection arguments
+connect_args = (
+    {
+        "statement_cache_size": settings.db_statement_cache_size,
+        "prepared_statement_cache_size": settings.db_prepared_statement_cache_size,
+    }
+    if "asyncpg" in settings.db_driver
+    else {}
+)
+
+
+def build_engine(url: str) -> AsyncEngine:
+    """
+    Creates an asynchronous engine with the configured connection pool.
+
+    Args:
+        url (str): The database URL.
+
+    Returns:
+        AsyncEngine: The engine instance.
+    """
+    return create_async_engine(
+        url=url,
+        echo=settings.db_echo,
+        future=True,
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        pool_use_lifo=settings.db_pool_use_lifo,
+        connect_args=connect_args,
+    )
+
+
 # Create an asynchronous engine instance
-engine = create_async_engine(url=db_url, echo=True, future=True)
+engine = build_engine(db_url)
+replica_engine = build_engine(replica_url) if replica_url else None
+instrument_engine(engine.sync_engine)
+if replica_engine:
+    instrument_engine(replica_engine.sync_engine)
+
+
+class DatabaseSession(RoutingSession):
+    """Routes reads to `replica_engine` when configured, writes to `engine`."""
+
+    primary_bind = engine.sync_engine
+    replica_bind = replica_engine.sync_engine if replica_engine else None
+    replica_health = ReplicaHealth(settings.db_replica_retry_seconds)
+
+
+# Soft-deleted rows are hidden from every ORM query
+apply_soft_delete(DatabaseSession, LogicalDeleteModel)
+
+# Session factory, built once and shared by every request
+async_session = async_sessionmaker(
+    class_=AsyncSession,
+    sync_session_class=DatabaseSession,
+    expire_on_commit=False,
+)
+
+
+def get_pool_stats() -> dict:
+    """
+    Returns the connection pool statistics of the engines.
+
+    Returns:
+        dict: Checked-out, idle and overflow connections, wait times and timeouts
+        of the primary and, when configured, the replica.
+    """
+    stats = {"primary": engine.pool.stats()}
+    if replica_engine:
+        stats["replica"] = {
+            **replica_engine.pool.stats(),
+            "available": DatabaseSession.replica_health.available,
+            "failures": DatabaseSession.replica_health.failures,
+        }
+    return stats
 
 
 async def init_db():
@@ -32,21 +139,87 @@ async def init_db():
         await conn.run_sync(SQLModel.metadata.create_all)
 
 
-async def get_session() -> AsyncSession:
-    # Create a new asynchronous session
-    async_session = sessionmaker(
-        bind=engine,
-        class_=AsyncSession,
-        expire_on_commit=False,
+def get_head_revision() -> str:
+    """
+    Returns the Alembic head revision from the scripts in `migrations/`.
+
+    Raises:
+        RuntimeError: If the migration history has more than one head.
+
+    Returns:
+        str: The head revision identifier.
+    """
+    alembic_config = Config(str(ROOT_DIR / "alembic.ini"))
+    alembic_config.set_main_option("script_location", str(ROOT_DIR / "migrations"))
+    heads = ScriptDirectory.from_config(alembic_config).get_heads()
+    if len(heads) != 1:
+        raise RuntimeError(f"Expected a single Alembic head, found {heads}")
+    return heads[0]
+
+
+async def check_db_revision():
+    """
+    Checks that the database is migrated to the Alembic head revision.
+
+    Raises:
+        RuntimeError: If the database revision does not match the head.
+    """
+    head = get_head_revision()
+    try:
+        async with engine.connect() as conn:
+            current = await conn.scalar(
+                text("SELECT version_num FROM alembic_version"),
+            )
+    except DBAPIError as exc:
+        raise RuntimeError(
+            "Could not read the alembic_version table, run `alembic upgrade head`",
+        ) from exc
+    if current != head:
+        raise RuntimeError(
+            f"Database revision {current} does not match head {head}, "
+            "run `alembic upgrade head`",
+        )
+
+
+async def warm_up_pool(connections: int):
+    """
+    Opens pooled connections ahead of the first requests.
+
+    Args:
+        connections (int): The number of connections to open.
+
+    Raises:
+        Exception: The first error of the connections that failed to open.
+    """
+    if connections <= 0:
+        return
+    results = await asyncio.gather(
+        *(engine.connect() for _ in range(connections)),
+        return_exceptions=True,
     )
+    # Returning them to the pool keeps them open for reuse, even when another
+    # connection failed
+    await asyncio.gather(
+        *(conn.close() for conn in results if not isinstance(conn, BaseException)),
+    )
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+
+async def get_session() -> AsyncSession:
+    # The session only checks out a pooled connection on its first query,
+    # so requests that never touch the database never hold a connection.
     # Yield the session and close it after use
     async with async_session() as session:
         yield session
 
 
 async def disconnect_db():
-    # Close the connection pool
+    # Close the connection pools
     await engine.dispose()
+    if replica_engine:
+        await replica_engine.dispose()
 
 
 async def commit_rollback(session: AsyncSession):
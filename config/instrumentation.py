@@ -0,0 +1,174 @@
+""" SQL query instrumentation built on engine events. """
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Set
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in milliseconds of the latency histogram buckets
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, float("inf"))
+
+
+@dataclass
+class QueryMetrics:
+    """
+    Process-wide query counters.
+
+    Attributes:
+        queries (int): The number of executed statements.
+        errors (int): The number of statements that raised.
+        total_seconds (float): The total time spent executing statements.
+        max_seconds (float): The slowest statement in seconds.
+        slow_queries (int): Statements slower than `db_slow_query_ms`.
+        n_plus_one (int): Statement shapes flagged as N+1 patterns.
+        buckets (Dict[float, int]): Latency histogram keyed by upper bound in ms.
+    """
+
+    queries: int = 0
+    errors: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    slow_queries: int = 0
+    n_plus_one: int = 0
+    buckets: Dict[float, int] = field(
+        default_factory=lambda: dict.fromkeys(LATENCY_BUCKETS_MS, 0),
+    )
+
+    def record(self, elapsed: float) -> None:
+        self.queries += 1
+        self.total_seconds += elapsed
+        self.max_seconds = max(self.max_seconds, elapsed)
+        elapsed_ms = elapsed * 1000
+        for bound in LATENCY_BUCKETS_MS:
+            if elapsed_ms <= bound:
+                self.buckets[bound] += 1
+                break
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "queries": self.queries,
+            "errors": self.errors,
+            "total_seconds": round(self.total_seconds, 6),
+            "max_seconds": round(self.max_seconds, 6),
+            "avg_seconds": round(
+                self.total_seconds / self.queries if self.queries else 0.0,
+                6,
+            ),
+            "slow_queries": self.slow_queries,
+            "n_plus_one": self.n_plus_one,
+            "latency_ms_buckets": {
+                ("+Inf" if bound == float("inf") else str(bound)): count
+                for bound, count in self.buckets.items()
+            },
+        }
+
+
+@dataclass
+class RequestQueries:
+    """
+    Queries executed while handling a single request.
+
+    Attributes:
+        count (int): The number of executed statements.
+        total_seconds (float): The time spent executing statements.
+        shapes (Counter): Executions per SQL string, parameters excluded.
+        flagged (Set[str]): Shapes already reported as N+1 patterns.
+    """
+
+    count: int = 0
+    total_seconds: float = 0.0
+    shapes: Counter = field(default_factory=Counter)
+    flagged: Set[str] = field(default_factory=set)
+
+
+metrics = QueryMetrics()
+_current_request: ContextVar[Optional[RequestQueries]] = ContextVar(
+    "current_request_queries",
+    default=None,
+)
+
+
+def start_request() -> Token:
+    """
+    Starts collecting the queries of the current request.
+
+    Returns:
+        Token: The token to pass to `end_request`.
+    """
+    return _current_request.set(RequestQueries())
+
+
+def end_request(token: Token) -> None:
+    _current_request.reset(token)
+
+
+def current_request() -> Optional[RequestQueries]:
+    return _current_request.get()
+
+
+def get_query_stats() -> Dict[str, Any]:
+    """
+    Returns the process-wide query metrics.
+
+    Returns:
+        Dict[str, Any]: Query counts, latencies, slow queries and N+1 patterns.
+    """
+    return metrics.as_dict()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, many):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, many):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    metrics.record(elapsed)
+
+    if elapsed * 1000 >= settings.db_slow_query_ms:
+        metrics.slow_queries += 1
+        logger.warning("Slow query (%.1f ms): %s", elapsed * 1000, statement)
+
+    request = _current_request.get()
+    if request is None:
+        return
+    request.count += 1
+    request.total_seconds += elapsed
+    request.shapes[statement] += 1
+    if (
+        request.shapes[statement] >= settings.db_n_plus_one_threshold
+        and statement not in request.flagged
+    ):
+        request.flagged.add(statement)
+        metrics.n_plus_one += 1
+        logger.warning(
+            "Possible N+1 query, executed %d times in one request: %s",
+            request.shapes[statement],
+            statement,
+        )
+
+
+def _handle_error(context) -> None:
+    metrics.errors += 1
+    starts = context.connection.info.get("query_start") if context.connection else None
+    if starts:
+        starts.pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Registers the query instrumentation listeners on an engine.
+
+    Args:
+        engine (Engine): The synchronous engine, `AsyncEngine.sync_engine`.
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
@@ -0,0 +1,91 @@
+""" Instrumented connection pool for the async engine. """
+import time
+from dataclasses import dataclass
+from typing import Any, Dict
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection
+
+
+@dataclass
+class PoolMetrics:
+    """
+    Cumulative checkout counters of a connection pool.
+
+    Attributes:
+        checkouts (int): The number of successful checkouts.
+        timeouts (int): The number of checkouts that hit `pool_timeout`.
+        wait_total (float): The total seconds spent waiting for a connection.
+        wait_max (float): The longest single wait in seconds.
+    """
+
+    checkouts: int = 0
+    timeouts: int = 0
+    wait_total: float = 0.0
+    wait_max: float = 0.0
+
+    def record_wait(self, elapsed: float) -> None:
+        self.wait_total += elapsed
+        self.wait_max = max(self.wait_max, elapsed)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_total_seconds": round(self.wait_total, 6),
+            "wait_max_seconds": round(self.wait_max, 6),
+            "wait_avg_seconds": round(
+                self.wait_total / self.checkouts if self.checkouts else 0.0,
+                6,
+            ),
+        }
+
+
+class PoolMetricsMixin:
+    """
+    Records how long `connect()` waits for a connection and how often it
+    times out. Mixed into any `QueuePool` subclass.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def connect(self) -> PoolProxiedConnection:
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.timeouts += 1
+            self.metrics.record_wait(time.perf_counter() - start)
+            raise
+        self.metrics.checkouts += 1
+        self.metrics.record_wait(time.perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        # Keep the counters across `engine.dispose()` and invalidation.
+        pool.metrics = self.metrics
+        return pool
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns a snapshot of the pool state and its checkout counters.
+
+        Returns:
+            Dict[str, Any]: The pool statistics.
+        """
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "idle": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "max_overflow": self._max_overflow,
+            "timeout_seconds": self.timeout(),
+            **self.metrics.as_dict(),
+        }
+
+
+class InstrumentedAsyncQueuePool(PoolMetricsMixin, AsyncAdaptedQueuePool):
+    """`AsyncAdaptedQueuePool` that exposes checkout statistics."""
@@ -0,0 +1,100 @@
+""" Read replica routing for database sessions. """
+import logging
+import time
+from typing import Any, Optional
+
+from sqlalchemy import exc
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.sql import Select
+from sqlmodel import Session
+
+logger = logging.getLogger(__name__)
+
+# Session.info key set once a session has written to the primary
+STICKY_PRIMARY = "sticky_primary"
+
+
+class ReplicaHealth:
+    """
+    Tracks whether the read replica can be used.
+
+    After a failed connection the replica is skipped for `retry_after` seconds.
+    """
+
+    def __init__(self, retry_after: float) -> None:
+        self.retry_after = retry_after
+        self.failures = 0
+        self._down_until = 0.0
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self._down_until
+
+    def mark_down(self) -> None:
+        self.failures += 1
+        self._down_until = time.monotonic() + self.retry_after
+
+
+class RoutingSession(Session):
+    """
+    Session that sends plain SELECT statements to the read replica and
+    everything else to the primary.
+
+    Once a session writes, every following statement goes to the primary so a
+    request always reads its own writes. If the replica cannot be reached the
+    statement is retried on the primary and the replica is skipped until
+    `ReplicaHealth.retry_after` elapses.
+
+    Subclasses set `primary_bind`, `replica_bind` and `replica_health`.
+    """
+
+    primary_bind: Optional[Engine] = None
+    replica_bind: Optional[Engine] = None
+    replica_health: Optional[ReplicaHealth] = None
+
+    def get_bind(self, mapper=None, clause=None, **kw: Any) -> Engine:
+        if self._use_replica(clause):
+            return self.replica_bind
+        return self.primary_bind
+
+    def _use_replica(self, clause) -> bool:
+        if self.replica_bind is None or self.info.get(STICKY_PRIMARY):
+            return False
+        if (
+            self._flushing
+            or not isinstance(clause, Select)
+            or clause._for_update_arg is not None
+        ):
+            # Writes, locking reads and raw SQL pin the session to the primary
+            self.info[STICKY_PRIMARY] = True
+            return False
+        return self.replica_health.available
+
+    def _connection_for_bind(
+        self,
+        engine: Engine,
+        execution_options=None,
+        **kw: Any,
+    ) -> Connection:
+        if engine is not self.replica_bind:
+            return super()._connection_for_bind(engine, execution_options, **kw)
+        try:
+            return super()._connection_for_bind(engine, execution_options, **kw)
+        except (exc.DBAPIError, OSError):
+            logger.warning("Read replica unavailable, falling back to primary")
+            self.replica_health.mark_down()
+            return super()._connection_for_bind(
+                self.primary_bind,
+                execution_options,
+                **kw,
+            )
+
+
+def use_primary(session) -> None:
+    """
+    Pins a session to the primary for the rest of its lifetime.
+
+    Args:
+        session (Session | AsyncSession): The database session.
+    """
+    session.info[STICKY_PRIMARY] = True
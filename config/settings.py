@@ -1,3 +1,5 @@
+from typing import List, Literal, Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -20,6 +22,113 @@ class Settings(BaseSettings):
     db_user: str = "postgres"
     jwt_secret_key: str = "secret"
     jwt_algorithm: str = "HS256"
+    # Lifetime of the tokens issued at login
+    jwt_expire_minutes: int = 15
+    # Usernames issued the "admin" role at login, e.g. ADMIN_USERNAMES='["a@b.c"]',
+    # until users have a roles column. Takes effect on their next login.
+    admin_usernames: List[str] = []
+    # Claims of verified tokens, kept until the token expires
+    jwt_cache_enabled: bool = True
+    jwt_cache_max_entries: int = 10000
+    # Revoked token IDs are read from the database every refresh interval,
+    # the whole table is reloaded every full sync interval
+    revocation_refresh_seconds: float = 5.0
+    revocation_full_sync_seconds: float = 300.0
+    # Keyset pagination of list endpoints
+    page_size_default: int = 50
+    page_size_max: int = 500
+    # Rows fetched per round trip by the streaming export endpoints
+    export_fetch_size: int = 1000
+    export_fetch_size_max: int = 10000
+    # Bulk endpoints: items accepted per request, rows sent per statement
+    bulk_max_items: int = 500
+    bulk_chunk_size: int = 100
+    # COPY import: rows per COPY call. Passwords are hashed in chunks by their
+    # own processes (None: half the cores), never queued ahead of the logins
+    copy_batch_size: int = 5000
+    copy_hash_workers: Optional[int] = None
+    copy_hash_chunk_size: int = 50
+    # Connection pool of the async engine
+    db_pool_size: int = 20
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_pool_use_lifo: bool = False
+    # asyncpg statement caches, set both to 0 behind pgbouncer
+    db_statement_cache_size: int = 100
+    db_prepared_statement_cache_size: int = 100
+    # Optional read replica, reads fall back to the primary while it is down
+    db_replica_host: Optional[str] = None
+    db_replica_port: Optional[str] = None
+    db_replica_retry_seconds: float = 30.0
+    # SQL instrumentation
+    db_echo: bool = False
+    db_slow_query_ms: float = 200.0
+    db_n_plus_one_threshold: int = 5
+    db_query_headers: bool = False
+    # Startup: "check" verifies the Alembic head, "create_all" creates tables
+    db_startup_mode: Literal["check", "create_all", "skip"] = "check"
+    db_pool_warmup: int = 0
+    # Archival of soft-deleted rows: age, rows moved per transaction, pause
+    # between batches and interval of the in-process job (None: not scheduled)
+    archive_after_days: int = 30
+    archive_batch_size: int = 500
+    archive_batch_pause_seconds: float = 0.1
+    archive_interval_seconds: Optional[float] = None
+    # Cache of entity reads by ID and username, invalidated on writes.
+    # "memory" is per process, "redis" is shared by the workers.
+    cache_enabled: bool = True
+    cache_backend: Literal["memory", "redis"] = "memory"
+    cache_redis_url: str = "redis://localhost:6379/0"
+    cache_redis_pool_size: int = 10
+    cache_redis_timeout: float = 0.5
+    cache_key_prefix: str = "fast-api-base:"
+    cache_ttl_seconds: float = 30.0
+    cache_max_entries: int = 10000
+    cache_max_bytes: int = 16 * 1024 * 1024
+    # Response compression: gzip, plus br and zstd when brotli / zstandard are
+    # installed. Smaller bodies and the excluded path prefixes are sent as is.
+    compression_enabled: bool = True
+    compression_minimum_size: int = 1024
+    compression_exclude_paths: List[str] = []
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+    compression_zstd_level: int = 3
+    # Serialize typed responses directly, without revalidating them against
+    # the response_model, and everything else with orjson when installed
+    fast_json: bool = False
+    # Password hashing processes (None: all cores) and operations allowed to wait
+    # for one, further logins and sign-ups are refused with a 503
+    hash_workers: Optional[int] = None
+    hash_queue_size: int = 64
+    hash_retry_after_seconds: int = 1
+    # Password hashing policy, calibrate with `manage calibrate-hash`. Stored
+    # hashes with other parameters are rehashed after the next login.
+    # "argon2" requires argon2-cffi.
+    password_scheme: Literal["bcrypt", "argon2"] = "bcrypt"  # noqa: S105
+    bcrypt_rounds: int = 12
+    argon2_time_cost: int = 2
+    argon2_memory_cost: int = 19456
+    argon2_parallelism: int = 1
+    # Token bucket rate limits: sustained requests per minute and burst. Logins
+    # are limited per client IP and per username, other writes per client IP.
+    # The login budget only applies to rate_limit_login_paths, the other writes,
+    # /api/auth/logout included, use the write budget.
+    # "redis" shares the buckets between workers through cache_redis_url.
+    rate_limit_enabled: bool = True
+    rate_limit_backend: Literal["memory", "redis"] = "memory"
+    rate_limit_login_per_minute: float = 10.0
+    rate_limit_login_burst: int = 5
+    rate_limit_write_per_minute: float = 300.0
+    rate_limit_write_burst: int = 60
+    rate_limit_login_paths: List[str] = ["/api/auth/login"]
+    rate_limit_shards: int = 16
+    rate_limit_max_keys: int = 100_000
+    # Behind a reverse proxy, the client IP is its last X-Forwarded-For entry.
+    # Without it every client of the proxy shares the same buckets, e.g. a
+    # single 300 writes per minute for all of them.
+    rate_limit_forwarded_for: bool = False
 
 
 settings = Settings()
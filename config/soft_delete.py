@@ -0,0 +1,44 @@
+""" Global soft-delete criteria for ORM queries. """
+from typing import Type
+
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session, with_loader_criteria
+
+# Execution option that disables the criteria for a single statement
+INCLUDE_DISABLED = "include_disabled"
+
+
+def apply_soft_delete(session_cls: Type[Session], model_cls: type) -> None:
+    """
+    Adds `enabled = true` to every ORM SELECT on subclasses of `model_cls`,
+    including relationship and lazy loads.
+
+    Statements run with the `include_disabled` execution option see every
+    row, e.g. `select(User).execution_options(include_disabled=True)`.
+
+    Args:
+        session_cls (Type[Session]): The synchronous session class.
+        model_cls (type): The mixin declaring the `enabled` column.
+    """
+
+    @event.listens_for(session_cls, "do_orm_execute")
+    def _add_criteria(execute_state: ORMExecuteState) -> None:
+        if (
+            not execute_state.is_select
+            or execute_state.is_column_load
+            or execute_state.execution_options.get(INCLUDE_DISABLED, False)
+        ):
+            return
+        # SQLModel mixins have no class level columns, so the criteria are
+        # added per mapped entity of the statement
+        execute_state.statement = execute_state.statement.options(
+            *(
+                with_loader_criteria(
+                    mapper.class_,
+                    lambda cls: cls.enabled == True,  # noqa: E712
+                    include_aliases=True,
+                )
+                for mapper in execute_state.all_mappers
+                if issubclass(mapper.class_, model_cls)
+            ),
+        )
@@ -10,6 +10,7 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 from sqlmodel import SQLModel
 
 from app.models.sql.profile import Profile  # noqa: F401
+from app.models.sql.revoked_token import RevokedToken  # noqa: F401
 from app.models.sql.user import User  # noqa: F401
 from config.database import db_url as url
 
@@ -0,0 +1,60 @@
+"""Timestamps and pagination indexes
+
+Revision ID: 3c9d5e1a2f47
+Revises: 7bfd09151020
+Create Date: 2026-10-18 10:12:31.502114
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3c9d5e1a2f47"
+down_revision: Union[str, None] = "7bfd09151020"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "users",
+        sa.Column(
+            "updated_at",
+            sa.DateTime(),
+            server_default=sa.text("current_timestamp(0)"),
+            nullable=False,
+        ),
+    )
+    op.add_column(
+        "profiles",
+        sa.Column(
+            "created_at",
+            sa.DateTime(),
+            server_default=sa.text("current_timestamp(0)"),
+            nullable=False,
+        ),
+    )
+    op.add_column(
+        "profiles",
+        sa.Column(
+            "updated_at",
+            sa.DateTime(),
+            server_default=sa.text("current_timestamp(0)"),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        op.f("ix_profiles_created_at"),
+        "profiles",
+        ["created_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_profiles_created_at"), table_name="profiles")
+    op.drop_column("profiles", "updated_at")
+    op.drop_column("profiles", "created_at")
+    op.drop_column("users", "updated_at")
@@ -0,0 +1,31 @@
+"""Favorite profiles partial index
+
+Revision ID: 5e2b8d4c9a13
+Revises: 3c9d5e1a2f47
+Create Date: 2026-10-18 14:03:47.218554
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5e2b8d4c9a13"
+down_revision: Union[str, None] = "3c9d5e1a2f47"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_profiles_user_id_favorite",
+        "profiles",
+        ["user_id"],
+        unique=False,
+        postgresql_where=sa.text("favorite"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_profiles_user_id_favorite", table_name="profiles")
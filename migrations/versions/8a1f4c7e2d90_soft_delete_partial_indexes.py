@@ -0,0 +1,55 @@
+"""Soft delete partial indexes
+
+Revision ID: 8a1f4c7e2d90
+Revises: 5e2b8d4c9a13
+Create Date: 2026-10-18 15:21:09.643380
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8a1f4c7e2d90"
+down_revision: Union[str, None] = "5e2b8d4c9a13"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_users_username_enabled",
+        "users",
+        ["username"],
+        unique=False,
+        postgresql_where=sa.text("enabled"),
+    )
+    op.create_index(
+        "ix_users_created_at_id_enabled",
+        "users",
+        ["created_at", "id"],
+        unique=False,
+        postgresql_where=sa.text("enabled"),
+    )
+    op.create_index(
+        "ix_profiles_user_id_enabled",
+        "profiles",
+        ["user_id"],
+        unique=False,
+        postgresql_where=sa.text("enabled"),
+    )
+    op.create_index(
+        "ix_profiles_created_at_id_enabled",
+        "profiles",
+        ["created_at", "id"],
+        unique=False,
+        postgresql_where=sa.text("enabled"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_profiles_created_at_id_enabled", table_name="profiles")
+    op.drop_index("ix_profiles_user_id_enabled", table_name="profiles")
+    op.drop_index("ix_users_created_at_id_enabled", table_name="users")
+    op.drop_index("ix_users_username_enabled", table_name="users")
@@ -0,0 +1,94 @@
+"""Archive tables for soft-deleted rows
+
+Revision ID: b47e0c3d6f21
+Revises: 8a1f4c7e2d90
+Create Date: 2026-10-18 16:40:52.107236
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+import sqlmodel
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b47e0c3d6f21"
+down_revision: Union[str, None] = "8a1f4c7e2d90"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # No unique username nor foreign key, archived rows are never updated
+    op.create_table(
+        "users_archive",
+        sa.Column("id", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column(
+            "username",
+            sqlmodel.sql.sqltypes.AutoString(),
+            nullable=False,
+        ),
+        sa.Column(
+            "password",
+            sqlmodel.sql.sqltypes.AutoString(),
+            nullable=False,
+        ),
+        sa.Column("enabled", sa.Boolean(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column(
+            "archived_at",
+            sa.DateTime(),
+            server_default=sa.text("current_timestamp(0)"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "profiles_archive",
+        sa.Column("id", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("name", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column(
+            "description",
+            sqlmodel.sql.sqltypes.AutoString(),
+            nullable=False,
+        ),
+        sa.Column(
+            "user_id",
+            sqlmodel.sql.sqltypes.AutoString(),
+            nullable=False,
+        ),
+        sa.Column("favorite", sa.Boolean(), nullable=False),
+        sa.Column("enabled", sa.Boolean(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column(
+            "archived_at",
+            sa.DateTime(),
+            server_default=sa.text("current_timestamp(0)"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    # Finds the disabled rows past the cutoff without scanning live rows
+    op.create_index(
+        "ix_users_updated_at_disabled",
+        "users",
+        ["updated_at"],
+        unique=False,
+        postgresql_where=sa.text("NOT enabled"),
+    )
+    op.create_index(
+        "ix_profiles_updated_at_disabled",
+        "profiles",
+        ["updated_at"],
+        unique=False,
+        postgresql_where=sa.text("NOT enabled"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_profiles_updated_at_disabled", table_name="profiles")
+    op.drop_index("ix_users_updated_at_disabled", table_name="users")
+    op.drop_table("profiles_archive")
+    op.drop_table("users_archive")
@@ -0,0 +1,140 @@
+"""
+COPY import and export against the PostgreSQL database of the settings.
+
+Skipped unless that database is reachable and at the Alembic head, e.g. a
+local one after `alembic upgrade head`. Rows are created with a unique prefix
+and deleted afterwards.
+"""
+import csv
+import io
+from typing import Dict, List
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+from asyncpg.exceptions import ForeignKeyViolationError, UniqueViolationError
+from sqlalchemy import text
+
+from app.services import copy_services
+from app.utils.passw import verify_password
+from config.database import check_db_revision, engine
+
+pytestmark = pytest.mark.postgres
+
+
+class TestCopyRoundTrip(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        if engine.dialect.name != "postgresql":
+            self.skipTest("COPY needs PostgreSQL")
+        try:
+            await check_db_revision()
+        except Exception as exc:
+            await engine.dispose()
+            self.skipTest(f"No migrated PostgreSQL database: {exc}")
+        self.prefix = uuid4().hex[:12]
+        # One row per COPY call, a failure happens after rows were copied
+        patcher = patch.object(copy_services.settings, "copy_batch_size", 1)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def asyncTearDown(self):
+        async with engine.begin() as conn:
+            await conn.execute(
+                text("DELETE FROM profiles WHERE name LIKE :prefix"),
+                {"prefix": f"{self.prefix}%"},
+            )
+            await conn.execute(
+                text("DELETE FROM users WHERE username LIKE :prefix"),
+                {"prefix": f"{self.prefix}%"},
+            )
+        await engine.dispose()
+
+    def username(self, name: str) -> str:
+        return f"{self.prefix}-{name}@example.com"
+
+    async def users(self) -> Dict[str, Dict[str, str]]:
+        async with engine.connect() as conn:
+            rows = await conn.execute(
+                text("SELECT id, username, password FROM users WHERE username LIKE :p"),
+                {"p": f"{self.prefix}%"},
+            )
+            return {row.username: row._asdict() for row in rows}
+
+    async def export(self, table: str) -> List[Dict[str, str]]:
+        chunks = []
+
+        async def collect(chunk: bytes) -> None:
+            chunks.append(chunk)
+
+        report = await copy_services.export_rows(table, collect)
+        rows = list(csv.DictReader(io.StringIO(b"".join(chunks).decode())))
+        self.assertEqual(report.rows, len(rows))
+        return rows
+
+    async def test_round_trip(self):
+        report = await copy_services.import_rows(
+            "users",
+            [
+                {"username": self.username("a"), "password": "secret a"},
+                {"username": self.username("B").upper(), "password": "secret b"},
+            ],
+        )
+        self.assertEqual(report.rows, 2)
+        users = await self.users()
+        self.assertEqual(set(users), {self.username("a"), self.username("b")})
+        # Stored as hashes of the imported passwords
+        self.assertTrue(
+            verify_password("secret b", users[self.username("b")]["password"]),
+        )
+
+        owner = users[self.username("a")]["id"]
+        await copy_services.import_rows(
+            "profiles",
+            [
+                {
+                    "name": f"{self.prefix} profile",
+                    "description": "imported",
+                    "user_id": owner,
+                    "favorite": "true",
+                },
+            ],
+        )
+
+        exported = [
+            row for row in await self.export("users") if row["username"] in users
+        ]
+        self.assertEqual(len(exported), 2)
+        self.assertNotIn("password", exported[0])
+        (profile,) = [
+            row
+            for row in await self.export("profiles")
+            if row["name"].startswith(self.prefix)
+        ]
+        self.assertEqual(
+            (profile["user_id"], profile["favorite"]),
+            (owner, "t"),
+        )
+
+    async def test_refused_row_rolls_back_the_whole_import(self):
+        rows = [
+            {"username": self.username("a"), "password": "secret"},
+            {"username": self.username("b"), "password": "secret"},
+            {"username": self.username("a"), "password": "secret"},
+        ]
+        with self.assertRaises(UniqueViolationError):
+            await copy_services.import_rows("users", rows)
+        self.assertEqual(await self.users(), {})
+
+    async def test_unknown_user_id_is_refused(self):
+        with self.assertRaises(ForeignKeyViolationError):
+            await copy_services.import_rows(
+                "profiles",
+                [
+                    {
+                        "name": f"{self.prefix} profile",
+                        "description": "orphan",
+                        "user_id": str(uuid4()),
+                    },
+                ],
+            )
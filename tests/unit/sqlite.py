@@ -0,0 +1,110 @@
+""" The application tables on SQLite, for the repository and service tests. """
+from datetime import datetime, timedelta
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.models import LogicalDeleteModel
+from app.models.sql.profile import Profile
+from app.models.sql.user import User
+from app.repository import generic, user
+from app.services import profile_services
+from app.utils.cache import LRUCache, MemoryCacheBackend, SingleFlight
+from config.soft_delete import apply_soft_delete
+
+# The server defaults of the migrations, with SQLite functions. IDs are stored
+# as 32 hex digits, like the GUID type does outside PostgreSQL.
+TABLES = (
+    """
+    CREATE TABLE users (
+        id CHAR(32) PRIMARY KEY DEFAULT (lower(hex(randomblob(16)))),
+        username VARCHAR NOT NULL UNIQUE,
+        password VARCHAR NOT NULL,
+        enabled BOOLEAN NOT NULL DEFAULT 1,
+        created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE profiles (
+        id CHAR(32) PRIMARY KEY DEFAULT (lower(hex(randomblob(16)))),
+        name VARCHAR NOT NULL,
+        description VARCHAR NOT NULL,
+        user_id VARCHAR NOT NULL,
+        favorite BOOLEAN NOT NULL DEFAULT 0,
+        enabled BOOLEAN NOT NULL DEFAULT 1,
+        created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+)
+
+
+class SqliteSession(Session):
+    pass
+
+
+apply_soft_delete(SqliteSession, LogicalDeleteModel)
+
+
+class SqliteTestCase(IsolatedAsyncioTestCase):
+    """
+    Runs each test on new in-memory tables, with an empty entity cache.
+
+    `self.session()` opens a session on them, with the soft-delete criteria.
+    """
+
+    async def asyncSetUp(self):
+        self.engine = create_async_engine("sqlite+aiosqlite://")
+        async with self.engine.begin() as conn:
+            for statement in TABLES:
+                await conn.execute(text(statement))
+        self.session = async_sessionmaker(
+            self.engine,
+            class_=AsyncSession,
+            sync_session_class=SqliteSession,
+            expire_on_commit=False,
+        )
+        self.cache = MemoryCacheBackend(LRUCache(100, 100_000, 60))
+        loads = SingleFlight(self.cache.stats)
+        for module, name, value in (
+            (generic, "entity_cache", self.cache),
+            (generic, "entity_loads", loads),
+            (user, "entity_cache", self.cache),
+            (user, "entity_loads", loads),
+            (profile_services, "entity_cache", self.cache),
+        ):
+            patcher = patch.object(module, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+
+    async def add_user(self, username: str, **values) -> User:
+        async with self.session() as db_session:
+            values.setdefault("password", "hash")
+            record = User(username=username, **values)
+            db_session.add(record)
+            await db_session.commit()
+            return record
+
+    async def add_profile(self, owner: User, name: str, age: int = 0, **values):
+        # `age` seconds in the past, to order the profiles by creation
+        created_at = datetime.utcnow() - timedelta(seconds=age)
+        async with self.session() as db_session:
+            record = Profile(
+                name=name,
+                description=f"{name} description",
+                user_id=str(owner.id),
+                created_at=created_at,
+                updated_at=created_at,
+                **values,
+            )
+            db_session.add(record)
+            await db_session.commit()
+            return record
@@ -0,0 +1,38 @@
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import AsyncMock, Mock, patch
+
+from app import app as application
+from app.services import archive_services, revocation_services
+
+
+class TestOnStartup(IsolatedAsyncioTestCase):
+    def setUp(self):
+        for target, name, value in (
+            (application.settings, "db_startup_mode", "skip"),
+            (application.settings, "db_pool_warmup", 0),
+            (application.settings, "archive_interval_seconds", 60),
+            (archive_services, "start_scheduler", Mock()),
+            (revocation_services, "start_scheduler", Mock()),
+        ):
+            patcher = patch.object(target, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def test_revoked_tokens_are_loaded_before_serving(self):
+        refresh = AsyncMock(return_value=0)
+        with patch.object(revocation_services, "refresh_revocations", refresh):
+            await application.on_startup()
+        refresh.assert_awaited_once_with(full=True)
+        revocation_services.start_scheduler.assert_called_once()
+        archive_services.start_scheduler.assert_called_once()
+
+    async def test_failed_load_refuses_to_start(self):
+        refresh = AsyncMock(side_effect=ConnectionRefusedError("database is down"))
+        with patch.object(
+            revocation_services,
+            "refresh_revocations",
+            refresh,
+        ), self.assertRaisesRegex(RuntimeError, "revoked tokens"):
+            await application.on_startup()
+        revocation_services.start_scheduler.assert_not_called()
+        archive_services.start_scheduler.assert_not_called()
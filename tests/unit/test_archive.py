@@ -0,0 +1,125 @@
+from datetime import datetime, timedelta
+from unittest import IsolatedAsyncioTestCase, TestCase
+from unittest.mock import patch
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.services import archive_services
+from app.services.archive_services import (
+    ArchiveReport,
+    count_statement,
+    move_statement,
+)
+
+OLD = timedelta(days=60)
+
+TABLES = (
+    "CREATE TABLE {table} ({columns})",
+    "CREATE TABLE {table}_archive ({columns}, archived_at DATETIME NOT NULL)",
+)
+
+
+class TestArchiveStatements(TestCase):
+    def test_move_is_batched_and_skips_locked_rows(self):
+        stmt = move_statement("profiles")
+        self.assertIn("LIMIT :limit FOR UPDATE SKIP LOCKED", stmt)
+        self.assertIn("DELETE FROM profiles", stmt)
+        self.assertIn("INSERT INTO profiles_archive", stmt)
+
+    def test_users_with_profiles_are_kept(self):
+        for stmt in (count_statement("users"), move_statement("users")):
+            self.assertIn("NOT EXISTS (SELECT 1 FROM profiles", stmt)
+
+    def test_report(self):
+        report = ArchiveReport(dry_run=True, cutoff=datetime(2026, 1, 1))
+        report.rows["users"] = 3
+        self.assertEqual(
+            report.as_dict(),
+            {
+                "dry_run": True,
+                "cutoff": "2026-01-01T00:00:00",
+                "rows": {"profiles": 0, "users": 3},
+                "batches": 0,
+                "seconds": 0.0,
+            },
+        )
+
+
+class TestArchiveDisabled(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.engine = create_async_engine("sqlite+aiosqlite://")
+        async with self.engine.begin() as conn:
+            for table, columns in archive_services.COLUMNS.items():
+                for statement in TABLES:
+                    await conn.execute(
+                        text(statement.format(table=table, columns=columns)),
+                    )
+        patcher = patch.object(archive_services, "engine", self.engine)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+
+    async def insert(self, table: str, **row):
+        updated_at = datetime.utcnow() - row.pop("age", timedelta(0))
+        row.update(created_at=updated_at, updated_at=updated_at)
+        async with self.engine.begin() as conn:
+            await conn.execute(
+                text(
+                    f"INSERT INTO {table} ({', '.join(row)}) "  # noqa: S608
+                    f"VALUES ({', '.join(':' + name for name in row)})",
+                ),
+                row,
+            )
+
+    async def ids(self, table: str) -> set:
+        async with self.engine.connect() as conn:
+            result = await conn.execute(text(f"SELECT id FROM {table}"))  # noqa: S608
+        return {row_id for (row_id,) in result}
+
+    async def profile(self, profile_id, user_id, enabled=False, age=OLD):
+        await self.insert(
+            "profiles",
+            id=profile_id,
+            name="",
+            description="",
+            user_id=user_id,
+            favorite=False,
+            enabled=enabled,
+            age=age,
+        )
+
+    async def user(self, user_id):
+        await self.insert(
+            "users",
+            id=user_id,
+            username=user_id,
+            password="",
+            enabled=False,
+            age=OLD,
+        )
+
+    async def test_moves_old_disabled_rows_in_batches(self):
+        await self.profile("live", "a", enabled=True)
+        for i in range(4):
+            await self.profile(f"p{i}", "b")
+        await self.profile("recent", "c", age=timedelta(0))
+        for user_id in "abcd":
+            await self.user(user_id)
+
+        dry_run = await archive_services.archive_disabled(dry_run=True)
+        # Users are counted before their profiles are archived
+        self.assertEqual(dry_run.rows, {"profiles": 4, "users": 1})
+
+        with patch.object(archive_services.settings, "archive_batch_pause_seconds", 0):
+            report = await archive_services.archive_disabled(batch_size=3)
+
+        self.assertEqual(report.rows, {"profiles": 4, "users": 2})
+        self.assertEqual(report.batches, 3)
+        self.assertEqual(await self.ids("profiles"), {"live", "recent"})
+        self.assertEqual(await self.ids("profiles_archive"), {"p0", "p1", "p2", "p3"})
+        # Users still referenced by a profile are kept
+        self.assertEqual(await self.ids("users"), {"a", "c"})
+        self.assertEqual(await self.ids("users_archive"), {"b", "d"})
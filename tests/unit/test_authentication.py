@@ -0,0 +1,169 @@
+from datetime import timedelta
+from unittest import TestCase
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.middlewares.authentication import (
+    Principal,
+    get_current_user,
+    get_principal,
+    require_roles,
+)
+from app.models.sql.user import UserOut
+from app.routes import admin_routes, auth, list_of_routes
+from app.services import copy_services
+from app.services.copy_services import CopyReport
+from app.utils.jwt import JWTRepo, decode_verified
+from config.database import get_session
+from config.settings import settings
+
+USER_ID = uuid4()
+
+
+class FakeUserRepository:
+    loads = 0
+
+    def __init__(self, session):
+        pass
+
+    async def get_by_id(self, user_id):
+        FakeUserRepository.loads += 1
+        return {"id": str(user_id)}
+
+
+app = FastAPI()
+app.dependency_overrides[get_session] = lambda: None
+app.include_router(auth.router, prefix="/api")
+app.include_router(admin_routes.router, prefix="/api")
+
+
+@app.get("/principal")
+async def principal_only(principal: Principal = Depends(get_principal)):
+    return {"id": str(principal.id), "roles": sorted(principal.roles)}
+
+
+@app.get("/user")
+async def with_user(
+    user=Depends(get_current_user),
+    principal: Principal = Depends(get_principal),
+):
+    # Asking again within the request does not query again
+    return {**user, "same": await principal.get_user(None) is user}
+
+
+@app.get("/admin", dependencies=[Depends(require_roles("admin"))])
+async def admin_only():
+    return {}
+
+
+def bearer(**claims) -> dict:
+    token = JWTRepo(data=claims).generate_token(timedelta(minutes=5))
+    return {"Authorization": f"Bearer {token}"}
+
+
+@patch("app.middlewares.authentication.UserRepository", FakeUserRepository)
+class TestPrincipal(TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+        FakeUserRepository.loads = 0
+        self.headers = bearer(sub=str(USER_ID), username="a@example.com")
+
+    def test_principal_from_claims_without_query(self):
+        response = self.client.get("/principal", headers=self.headers)
+        self.assertEqual(response.json(), {"id": str(USER_ID), "roles": []})
+        self.assertEqual(FakeUserRepository.loads, 0)
+
+    def test_user_loaded_once_on_demand(self):
+        response = self.client.get("/user", headers=self.headers)
+        self.assertEqual(response.json(), {"id": str(USER_ID), "same": True})
+        self.assertEqual(FakeUserRepository.loads, 1)
+
+    def test_invalid_tokens_and_claims_are_refused(self):
+        self.assertEqual(self.client.get("/principal").status_code, 403)
+        response = self.client.get(
+            "/principal",
+            headers={"Authorization": "Bearer not.a.token"},
+        )
+        self.assertEqual(response.status_code, 403)
+        response = self.client.get("/principal", headers=bearer(sub="not-a-uuid"))
+        self.assertEqual(response.status_code, 403)
+
+    def test_roles(self):
+        self.assertEqual(
+            self.client.get("/admin", headers=self.headers).status_code,
+            403,
+        )
+        headers = bearer(sub=str(USER_ID), username="a@example.com", roles=["admin"])
+        self.assertEqual(self.client.get("/admin", headers=headers).status_code, 200)
+
+
+class TestLogin(TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+
+    def test_auth_router_is_mounted(self):
+        self.assertIn(auth.router, list_of_routes)
+
+    @patch(
+        "app.services.user_services.authenticate_user",
+        AsyncMock(return_value=UserOut(id=USER_ID, username="a@example.com")),
+    )
+    def test_login_issues_principal_claims(self):
+        response = self.client.post(
+            "/api/auth/login",
+            json={"username": " A@example.com", "password": "secret"},
+        )
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body["token_type"], "bearer")
+        headers = {"Authorization": f"Bearer {body['access_token']}"}
+        response = self.client.get("/principal", headers=headers)
+        self.assertEqual(response.json(), {"id": str(USER_ID), "roles": []})
+
+    @patch(
+        "app.services.user_services.authenticate_user",
+        AsyncMock(return_value=UserOut(id=USER_ID, username="a@example.com")),
+    )
+    @patch.object(
+        copy_services,
+        "import_rows",
+        AsyncMock(return_value=CopyReport(table="users")),
+    )
+    def test_admin_usernames_reach_the_admin_routes(self):
+        def import_users():
+            response = self.client.post(
+                "/api/auth/login",
+                json={"username": "a@example.com", "password": "secret"},
+            )
+            token = response.json()["access_token"]
+            return self.client.post(
+                "/api/admin/import/users",
+                headers={"Authorization": f"Bearer {token}"},
+                content="username,password\n",
+            )
+
+        self.assertEqual(import_users().status_code, 403)
+        with patch.object(settings, "admin_usernames", ["A@example.com"]):
+            self.assertEqual(import_users().status_code, 201)
+
+    @patch(
+        "app.services.user_services.authenticate_user",
+        AsyncMock(return_value=None),
+    )
+    def test_login_refuses_wrong_credentials(self):
+        response = self.client.post(
+            "/api/auth/login",
+            json={"username": "a@example.com", "password": "wrong"},
+        )
+        self.assertEqual(response.status_code, 401)
+
+    @patch("app.routes.auth.revoke_token", new_callable=AsyncMock)
+    def test_logout_revokes_the_token(self, revoke_token):
+        headers = bearer(sub=str(USER_ID), username="a@example.com")
+        claims = decode_verified(headers["Authorization"].split()[1])
+        response = self.client.post("/api/auth/logout", headers=headers)
+        self.assertEqual(response.status_code, 204)
+        revoke_token.assert_awaited_once_with(claims["jti"], claims["exp"])
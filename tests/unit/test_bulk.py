@@ -0,0 +1,112 @@
+from uuid import uuid4
+
+from sqlmodel import select
+
+from app.models.sql.profile import Profile, ProfileBulkUpdate, ProfileIn
+from app.repository.profile import ProfileRepository
+from app.services import profile_services
+from tests.unit.sqlite import SqliteTestCase
+
+
+class TestBulkProfiles(SqliteTestCase):
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        self.owner = await self.add_user("owner@example.com")
+
+    async def names(self):
+        async with self.session() as db_session:
+            profiles = await db_session.exec(
+                select(Profile).order_by(Profile.created_at, Profile.id),
+            )
+            return {profile.id: profile.name for profile in profiles}
+
+    async def test_create_keeps_the_payload_order(self):
+        payload = [
+            ProfileIn(
+                name=f"profile {index}",
+                description="",
+                user_id=str(self.owner.id),
+            )
+            for index in range(5)
+        ]
+        async with self.session() as db_session:
+            result = await profile_services.create_profiles(payload, db_session)
+        names = await self.names()
+        self.assertEqual(
+            [(item.index, names[item.id]) for item in result.results],
+            [(index, f"profile {index}") for index in range(5)],
+        )
+        self.assertEqual({item.status for item in result.results}, {"created"})
+
+    async def test_update_skips_unknown_and_disabled_ids(self):
+        kept = await self.add_profile(self.owner, "kept")
+        disabled = await self.add_profile(self.owner, "disabled", enabled=False)
+        unknown = uuid4()
+        async with self.session() as db_session:
+            result = await profile_services.update_profiles(
+                [
+                    ProfileBulkUpdate(id=unknown, name="new"),
+                    ProfileBulkUpdate(id=kept.id, name="new"),
+                    ProfileBulkUpdate(id=disabled.id, name="new"),
+                ],
+                db_session,
+            )
+        self.assertEqual(
+            [(item.index, item.id, item.status) for item in result.results],
+            [
+                (0, unknown, "not_found"),
+                (1, kept.id, "updated"),
+                (2, disabled.id, "not_found"),
+            ],
+        )
+        self.assertEqual(await self.names(), {kept.id: "new"})
+
+    async def test_delete_skips_unknown_and_disabled_ids(self):
+        kept = await self.add_profile(self.owner, "kept")
+        deleted = await self.add_profile(self.owner, "deleted")
+        disabled = await self.add_profile(self.owner, "disabled", enabled=False)
+        async with self.session() as db_session:
+            result = await profile_services.delete_profiles(
+                [deleted.id, disabled.id, uuid4()],
+                db_session,
+            )
+        self.assertEqual(
+            [item.status for item in result.results],
+            ["deleted", "not_found", "not_found"],
+        )
+        self.assertEqual(await self.names(), {kept.id: "kept"})
+
+    async def test_cached_rows_are_invalidated_after_commit(self):
+        updated = await self.add_profile(self.owner, "updated")
+        deleted = await self.add_profile(self.owner, "deleted")
+        for profile in (updated, deleted):
+            async with self.session() as db_session:
+                await ProfileRepository(db_session).get_by_id(profile.id)
+        self.assertEqual(self.cache.lru.info()["entries"], 2)
+
+        invalidations = []
+        cache_delete = self.cache.delete
+
+        async def delete(*keys):
+            # The change must be visible to the reads refilling the cache
+            invalidations.append(await self.names())
+            await cache_delete(*keys)
+
+        self.cache.delete = delete
+        async with self.session() as db_session:
+            await profile_services.update_profiles(
+                [ProfileBulkUpdate(id=updated.id, name="new")],
+                db_session,
+            )
+            await profile_services.delete_profiles([deleted.id], db_session)
+        self.assertEqual(
+            invalidations,
+            [
+                {updated.id: "new", deleted.id: "deleted"},
+                {updated.id: "new"},
+            ],
+        )
+        async with self.session() as db_session:
+            repository = ProfileRepository(db_session)
+            self.assertEqual((await repository.get_by_id(updated.id)).name, "new")
+            self.assertIsNone(await repository.get_by_id(deleted.id))
@@ -0,0 +1,332 @@
+import asyncio
+from unittest import IsolatedAsyncioTestCase, TestCase
+from unittest.mock import patch
+
+from app.models.sql.profile import ProfileIn
+from app.models.sql.user import User, UserIn
+from app.repository import generic
+from app.repository.profile import ProfileRepository
+from app.repository.user import UserRepository
+from app.utils.cache import (
+    CacheStats,
+    LRUCache,
+    MemoryCacheBackend,
+    RedisCacheBackend,
+    SingleFlight,
+    dump_entity,
+    load_entity,
+)
+from app.utils.resp import RespClient, RespConnection, RespError, read_reply
+from tests.unit.sqlite import SqliteSession, SqliteTestCase
+
+
+class TestLRUCache(TestCase):
+    def test_hit_and_miss(self):
+        cache = LRUCache(max_entries=10, max_bytes=100, ttl=60)
+        cache.set("a", b"1")
+        self.assertEqual(cache.get("a"), b"1")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual((cache.stats.hits, cache.stats.misses), (1, 1))
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_entries=2, max_bytes=100, ttl=60)
+        cache.set("a", b"1")
+        cache.set("b", b"2")
+        cache.get("a")
+        cache.set("c", b"3")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), b"1")
+        self.assertEqual(cache.stats.evictions, 1)
+
+    def test_bytes_limit(self):
+        cache = LRUCache(max_entries=10, max_bytes=4, ttl=60)
+        cache.set("a", b"12")
+        cache.set("b", b"345")
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.info()["bytes"], 3)
+        cache.set("c", b"too large")
+        self.assertIsNone(cache.get("c"))
+
+    def test_expiration(self):
+        cache = LRUCache(max_entries=10, max_bytes=100, ttl=5)
+        with patch("app.utils.cache.time.monotonic", return_value=100.0):
+            cache.set("a", b"1")
+        with patch("app.utils.cache.time.monotonic", return_value=105.0):
+            self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats.expirations, 1)
+
+    def test_invalidation(self):
+        cache = LRUCache(max_entries=10, max_bytes=100, ttl=60)
+        cache.set("a", b"1")
+        cache.delete("a", "missing")
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats.invalidations, 1)
+
+
+class FakeRedis:
+    """In-process server answering GET, SET and DEL over RESP."""
+
+    def __init__(self):
+        self.data = {}
+        self.server = None
+
+    async def start(self) -> str:
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        port = self.server.sockets[0].getsockname()[1]
+        return f"redis://127.0.0.1:{port}/0"
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                command = await read_reply(reader)
+                writer.write(self._reply(command))
+                await writer.drain()
+        except asyncio.IncompleteReadError:
+            writer.close()
+
+    def _reply(self, command) -> bytes:
+        name, *args = command
+        if name == b"GET":
+            value = self.data.get(args[0])
+            return (
+                b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+            )
+        if name == b"SET":
+            self.data[args[0]] = args[1]
+            return b"+OK\r\n"
+        if name == b"DEL":
+            deleted = sum(self.data.pop(key, None) is not None for key in args)
+            return b":%d\r\n" % deleted
+        return b"-ERR unknown command\r\n"
+
+
+class TestRedisCacheBackend(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.redis = FakeRedis()
+        url = await self.redis.start()
+        self.cache = RedisCacheBackend(RespClient(url), ttl=30, prefix="test:")
+
+    async def asyncTearDown(self):
+        await self.cache.close()
+        await self.redis.stop()
+
+    async def test_round_trip(self):
+        await self.cache.set("a", b"\x00value")
+        self.assertEqual(self.redis.data, {b"test:a": b"\x00value"})
+        self.assertEqual(await self.cache.get("a"), b"\x00value")
+        await self.cache.delete("a")
+        self.assertIsNone(await self.cache.get("a"))
+        self.assertEqual((self.cache.stats.hits, self.cache.stats.misses), (1, 1))
+
+
+class TestRespClient(IsolatedAsyncioTestCase):
+    async def test_failed_auth_closes_the_connection(self):
+        redis = FakeRedis()
+        url = await redis.start()
+        # FakeRedis refuses AUTH as an unknown command
+        client = RespClient(url.replace("//", "//:wrong@"))
+        try:
+            with patch.object(
+                RespConnection,
+                "close",
+                autospec=True,
+                side_effect=RespConnection.close,
+            ) as close, self.assertRaises(RespError):
+                await client.get("a")
+            self.assertEqual(close.call_count, 1)
+            self.assertEqual(client._idle, [])
+            await client.close()
+        finally:
+            await redis.stop()
+
+
+class TestUnreachableRedis(IsolatedAsyncioTestCase):
+    async def test_errors_are_misses(self):
+        cache = RedisCacheBackend(RespClient("redis://127.0.0.1:1"), ttl=30)
+        self.assertIsNone(await cache.get("a"))
+        await cache.set("a", b"1")
+        self.assertEqual((cache.stats.errors, cache.stats.misses), (2, 1))
+
+
+class TestSingleFlight(IsolatedAsyncioTestCase):
+    async def test_concurrent_loads_share_one_call(self):
+        stats = CacheStats()
+        flight = SingleFlight(stats)
+        calls = []
+
+        async def load():
+            calls.append(1)
+            await asyncio.sleep(0)
+            return b"row"
+
+        results = await asyncio.gather(*(flight.do("k", load) for _ in range(5)))
+        self.assertEqual(results, [b"row"] * 5)
+        self.assertEqual((len(calls), stats.coalesced), (1, 4))
+
+    async def test_errors_reach_every_caller(self):
+        flight = SingleFlight()
+
+        async def load():
+            await asyncio.sleep(0)
+            raise RuntimeError("down")
+
+        results = await asyncio.gather(
+            flight.do("k", load),
+            flight.do("k", load),
+            return_exceptions=True,
+        )
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+
+
+class TestEntitySerialization(TestCase):
+    def test_round_trip_without_field_names(self):
+        user = User(username="user@example.com", password="hash")  # noqa: S106
+        data = dump_entity(user)
+        self.assertNotIn(b"username", data)
+        loaded = load_entity(User, data)
+        self.assertEqual(loaded.model_dump(), user.model_dump())
+
+
+class FakeSession:
+    def __init__(self, record):
+        self.record = record
+        self.queries = 0
+
+    async def exec(self, stmt):
+        self.queries += 1
+        return self
+
+    def first(self):
+        return self.record
+
+    async def merge(self, record, load=True):
+        return record
+
+
+class SharedCache(MemoryCacheBackend):
+    shared = True
+
+
+class TestUserRowsInSharedCache(IsolatedAsyncioTestCase):
+    async def test_users_are_not_cached_in_a_shared_backend(self):
+        user = User(username="user@example.com", password="hash")  # noqa: S106
+        for cache, cached in (
+            (SharedCache(LRUCache(10, 10000, 60)), False),
+            (MemoryCacheBackend(LRUCache(10, 10000, 60)), True),
+        ):
+            session = FakeSession(user)
+            with patch.object(generic, "entity_cache", cache):
+                repository = UserRepository(session)
+                for _ in range(2):
+                    loaded = await repository.get_by_id(user.id)
+                    self.assertEqual(loaded.password, user.password)
+            self.assertEqual(cache.lru.info()["entries"] > 0, cached)
+            self.assertEqual(session.queries, 1 if cached else 2)
+
+
+class TestStaleLoads(IsolatedAsyncioTestCase):
+    async def test_invalidated_load_is_not_cached(self):
+        cache = MemoryCacheBackend(LRUCache(10, 10000, 60))
+        version = cache.begin_load("key")
+        await cache.delete("key")
+        await cache.end_load("key", version, b"old")
+        self.assertIsNone(await cache.get("key"))
+        self.assertEqual(cache.stats.stale_loads, 1)
+        # The next load is cached
+        await cache.end_load("key", cache.begin_load("key"), b"new")
+        self.assertEqual(await cache.get("key"), b"new")
+        self.assertEqual(cache._loading, {})
+
+
+class TestRepositoryCache(SqliteTestCase):
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        self.owner = await self.add_user("owner@example.com")
+
+    def profile_in(self, name: str) -> ProfileIn:
+        return ProfileIn(name=name, description="", user_id=str(self.owner.id))
+
+    async def read(self, repository_cls, method: str, *args):
+        async with self.session() as db_session:
+            return await getattr(repository_cls(db_session), method)(*args)
+
+    async def test_update_and_delete_invalidate_the_row(self):
+        profile = await self.add_profile(self.owner, "old")
+        read = self.read(ProfileRepository, "get_by_id", profile.id)
+        self.assertEqual((await read).name, "old")
+        async with self.session() as db_session:
+            await ProfileRepository(db_session).update(
+                profile.id,
+                self.profile_in("new"),
+            )
+        loaded = await self.read(ProfileRepository, "get_by_id", profile.id)
+        self.assertEqual(loaded.name, "new")
+        async with self.session() as db_session:
+            self.assertTrue(await ProfileRepository(db_session).delete(profile.id))
+        self.assertIsNone(await self.read(ProfileRepository, "get_by_id", profile.id))
+        self.assertEqual(self.cache.stats.invalidations, 2)
+
+    async def test_load_racing_a_write_is_not_cached(self):
+        profile = await self.add_profile(self.owner, "old")
+        async with self.session() as reader, self.session() as writer:
+            read = reader.exec
+
+            async def read_then_write(stmt, *args, **kwargs):
+                # The write commits after the row was read, before it is cached
+                result = await read(stmt, *args, **kwargs)
+                await ProfileRepository(writer).update(
+                    profile.id,
+                    self.profile_in("new"),
+                )
+                return result
+
+            with patch.object(reader, "exec", read_then_write):
+                loaded = await ProfileRepository(reader).get_by_id(profile.id)
+        self.assertEqual(loaded.name, "old")
+        self.assertEqual(self.cache.stats.stale_loads, 1)
+        loaded = await self.read(ProfileRepository, "get_by_id", profile.id)
+        self.assertEqual(loaded.name, "new")
+
+    async def test_username_maps_to_the_cached_row(self):
+        user = await self.read(UserRepository, "get_by_username", "owner@example.com")
+        self.assertEqual(user.id, self.owner.id)
+        self.assertIsNotNone(
+            await self.cache.get(generic.entity_key(User, "username", user.username)),
+        )
+        # Served from the mapping and the row, without a query
+        with patch.object(SqliteSession, "execute", side_effect=AssertionError):
+            again = await self.read(
+                UserRepository,
+                "get_by_username",
+                "owner@example.com",
+            )
+        self.assertEqual(again.id, self.owner.id)
+
+    async def test_renamed_user_leaves_a_stale_mapping(self):
+        await self.read(UserRepository, "get_by_username", "owner@example.com")
+        async with self.session() as db_session:
+            await UserRepository(db_session).update(
+                self.owner.id,
+                UserIn(username="renamed@example.com", password="hash"),  # noqa: S106
+            )
+        self.assertIsNone(
+            await self.read(UserRepository, "get_by_username", "owner@example.com"),
+        )
+        renamed = await self.read(
+            UserRepository,
+            "get_by_username",
+            "renamed@example.com",
+        )
+        self.assertEqual(renamed.id, self.owner.id)
+
+    async def test_deleted_user_is_not_found_by_username(self):
+        await self.read(UserRepository, "get_by_username", "owner@example.com")
+        async with self.session() as db_session:
+            await UserRepository(db_session).delete(self.owner.id)
+        self.assertIsNone(
+            await self.read(UserRepository, "get_by_username", "owner@example.com"),
+        )
@@ -0,0 +1,105 @@
+import gzip
+import zlib
+from unittest import TestCase
+
+from fastapi import Depends, FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.middlewares.compression import (
+    CompressionMiddleware,
+    metrics,
+    negotiate,
+    no_compression,
+)
+
+BODY = "row\n" * 1000
+
+app = FastAPI()
+app.add_middleware(CompressionMiddleware, minimum_size=100, exclude_paths=["/raw"])
+
+
+@app.get("/large", response_class=PlainTextResponse)
+async def large():
+    return BODY
+
+
+@app.get("/small", response_class=PlainTextResponse)
+async def small():
+    return "ok"
+
+
+@app.get("/raw", response_class=PlainTextResponse)
+async def raw():
+    return BODY
+
+
+@app.get(
+    "/opt-out",
+    response_class=PlainTextResponse,
+    dependencies=[Depends(no_compression)],
+)
+async def opt_out():
+    return BODY
+
+
+@app.get("/stream")
+async def stream():
+    async def lines():
+        for index in range(200):
+            yield f"line {index}\n".encode()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+client = TestClient(app)
+
+
+def fetch(path: str, encoding: str = "gzip"):
+    # Read the raw body, without the client decoding it
+    with client.stream("GET", path, headers={"Accept-Encoding": encoding}) as response:
+        return response, b"".join(response.iter_raw())
+
+
+class TestNegotiate(TestCase):
+    def test_quality_and_preference(self):
+        supported = ["zstd", "br", "gzip"]
+        self.assertEqual(negotiate("gzip, br", supported), "br")
+        self.assertEqual(negotiate("gzip, br;q=0.5", supported), "gzip")
+        self.assertEqual(negotiate("*", supported), "zstd")
+        self.assertIsNone(negotiate("identity", supported))
+        self.assertIsNone(negotiate("gzip;q=0", supported))
+        self.assertIsNone(negotiate("", supported))
+
+
+class TestCompressionMiddleware(TestCase):
+    def test_compresses_large_bodies(self):
+        before = metrics.bytes_in - metrics.bytes_out
+        response, body = fetch("/large")
+        self.assertEqual(response.headers["content-encoding"], "gzip")
+        self.assertEqual(response.headers["vary"], "Accept-Encoding")
+        self.assertEqual(gzip.decompress(body).decode(), BODY)
+        self.assertGreater(metrics.bytes_in - metrics.bytes_out, before)
+
+    def test_small_bodies_are_sent_as_is(self):
+        response, body = fetch("/small")
+        self.assertNotIn("content-encoding", response.headers)
+        self.assertEqual(body, b"ok")
+
+    def test_opt_outs(self):
+        for path in ("/raw", "/opt-out"):
+            with self.subTest(path=path):
+                response, body = fetch(path)
+                self.assertNotIn("content-encoding", response.headers)
+                self.assertEqual(body.decode(), BODY)
+
+    def test_unsupported_encoding(self):
+        response, _ = fetch("/large", encoding="identity")
+        self.assertNotIn("content-encoding", response.headers)
+
+    def test_streaming_chunks_are_decodable(self):
+        response, body = fetch("/stream")
+        self.assertEqual(response.headers["content-encoding"], "gzip")
+        expected = "".join(f"line {index}\n" for index in range(200))
+        decoder = zlib.decompressobj(31)
+        self.assertEqual(decoder.decompress(body).decode(), expected)
@@ -0,0 +1,92 @@
+from datetime import datetime
+from unittest import TestCase
+
+from fastapi import Request
+
+from app.utils.conditional import Validators, is_conditional
+
+UPDATED_AT = datetime(2026, 10, 18, 12, 30, 15, 250000)
+
+
+def request(**headers) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "headers": [
+                (name.replace("_", "-").encode(), value.encode())
+                for name, value in headers.items()
+            ],
+        },
+    )
+
+
+class TestValidators(TestCase):
+    def setUp(self):
+        self.validators = Validators.for_entity("42", UPDATED_AT)
+
+    def test_headers(self):
+        headers = self.validators.headers()
+        self.assertTrue(headers["ETag"].startswith('"'))
+        self.assertEqual(headers["Last-Modified"], "Sun, 18 Oct 2026 12:30:15 GMT")
+
+    def test_if_none_match(self):
+        etag = self.validators.etag
+        self.assertTrue(self.validators.matches(request(if_none_match=etag)))
+        self.assertTrue(
+            self.validators.matches(request(if_none_match=f'"x", W/{etag}')),
+        )
+        self.assertTrue(self.validators.matches(request(if_none_match="*")))
+        self.assertFalse(self.validators.matches(request(if_none_match='"x"')))
+
+    def test_if_none_match_takes_precedence(self):
+        stale = request(
+            if_none_match='"x"',
+            if_modified_since="Sun, 18 Oct 2026 13:00:00 GMT",
+        )
+        self.assertFalse(self.validators.matches(stale))
+
+    def test_if_modified_since(self):
+        for since, expected in (
+            ("Sun, 18 Oct 2026 12:30:15 GMT", True),
+            ("Sun, 18 Oct 2026 12:30:14 GMT", False),
+            ("not a date", False),
+        ):
+            with self.subTest(since=since):
+                matches = self.validators.matches(request(if_modified_since=since))
+                self.assertEqual(matches, expected)
+
+    def test_not_modified_response(self):
+        response = self.validators.not_modified()
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers["etag"], self.validators.etag)
+
+    def test_list_tag_changes_with_any_row(self):
+        versions = [("1", UPDATED_AT), ("2", datetime(2026, 1, 1))]
+        page = Validators.for_list(versions, 50)
+        self.assertTrue(page.etag.startswith('W/"'))
+        changed = Validators.for_list([versions[0], ("2", UPDATED_AT)], 50)
+        self.assertNotEqual(page.etag, changed.etag)
+        self.assertNotEqual(page.etag, Validators.for_list(versions, 10).etag)
+        # A row leaving the list leaves the others untouched
+        self.assertNotEqual(page.etag, Validators.for_list(versions[:1], 50).etag)
+
+    def test_list_has_no_last_modified(self):
+        page = Validators.for_list([("1", UPDATED_AT)], 50)
+        self.assertIsNone(page.last_modified)
+        self.assertNotIn("Last-Modified", page.headers())
+        since = request(if_modified_since="Sun, 18 Oct 2026 13:00:00 GMT")
+        self.assertFalse(page.matches(since))
+
+    def test_updates_within_a_second_change_the_tag(self):
+        later = UPDATED_AT.replace(microsecond=750000)
+        self.assertNotEqual(
+            self.validators.etag,
+            Validators.for_entity("42", later).etag,
+        )
+
+    def test_is_conditional(self):
+        self.assertFalse(is_conditional(request()))
+        self.assertTrue(is_conditional(request(if_none_match='"x"')))
+        self.assertTrue(
+            is_conditional(request(if_modified_since="Sun, 18 Oct 2026 13:00:00 GMT")),
+        )
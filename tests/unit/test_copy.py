@@ -0,0 +1,191 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from unittest import IsolatedAsyncioTestCase, TestCase
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+from asyncpg.exceptions import ForeignKeyViolationError, UniqueViolationError
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routes import admin_routes
+from app.services import copy_services
+from app.services.copy_services import MissingColumnsError, check_columns, csv_rows
+from app.utils.jwt import JWTRepo
+
+DOCUMENT = b"username,password\r\na@example.com,secret\r\nb@example.com,other\r\n"
+
+
+async def chunked(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i : i + size]
+
+
+class TestCsvRows(IsolatedAsyncioTestCase):
+    async def test_rows_split_across_chunks(self):
+        for size in (1, 7, len(DOCUMENT)):
+            rows = [row async for row in csv_rows(chunked(DOCUMENT, size))]
+            self.assertEqual(
+                rows,
+                [
+                    {"username": "a@example.com", "password": "secret"},
+                    {"username": "b@example.com", "password": "other"},
+                ],
+            )
+
+    async def test_last_line_without_newline(self):
+        rows = [row async for row in csv_rows(chunked(b"name\nx\ny", 4))]
+        self.assertEqual(rows, [{"name": "x"}, {"name": "y"}])
+
+
+class TestCheckColumns(TestCase):
+    def test_missing_columns_are_named(self):
+        check_columns("users", {"username": "a@example.com", "password": "x"})
+        with self.assertRaisesRegex(MissingColumnsError, "description, user_id"):
+            check_columns("profiles", {"name": "x"})
+        # A short row of csv.DictReader
+        with self.assertRaisesRegex(MissingColumnsError, "password"):
+            check_columns("users", {"username": "a@example.com", "password": None})
+
+
+class FakeDriver:
+    def __init__(self, fail: Exception = None):
+        self.fail = fail
+        self.copied = []
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+    async def copy_records_to_table(self, table, records, columns):
+        if self.fail is not None:
+            raise self.fail
+        self.copied.extend(records)
+
+
+class FakeEngine:
+    def __init__(self, driver: FakeDriver):
+        self.driver = driver
+
+    @asynccontextmanager
+    async def connect(self):
+        yield self
+
+    async def get_raw_connection(self):
+        return self
+
+    @property
+    def driver_connection(self):
+        return self.driver
+
+
+class FakeHasher:
+    """Hashes the first `ready` chunks at once, the others until cancelled."""
+
+    def __init__(self, ready: int = 1):
+        self.ready = ready
+        self.cancelled = 0
+
+    async def hash_many(self, passwords):
+        if self.ready > 0:
+            self.ready -= 1
+        else:
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                self.cancelled += 1
+                raise
+        return [f"hash of {password}" for password in passwords]
+
+
+def user_rows(count: int):
+    return [
+        {"username": f"{index}@example.com", "password": "secret"}
+        for index in range(count)
+    ]
+
+
+class TestImportRows(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        for target, name, value in (
+            (copy_services.settings, "copy_batch_size", 1),
+            (copy_services.settings, "copy_hash_chunk_size", 1),
+        ):
+            patcher = patch.object(target, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def import_rows(self, driver: FakeDriver, hasher: FakeHasher, rows):
+        with patch.object(copy_services, "engine", FakeEngine(driver)), patch.object(
+            copy_services,
+            "import_hasher",
+            hasher,
+        ):
+            return await copy_services.import_rows("users", rows)
+
+    async def test_passwords_are_hashed(self):
+        driver = FakeDriver()
+        report = await self.import_rows(driver, FakeHasher(ready=2), user_rows(2))
+        self.assertEqual(report.rows, 2)
+        self.assertEqual(
+            [record[1:3] for record in driver.copied],
+            [
+                ("0@example.com", "hash of secret"),
+                ("1@example.com", "hash of secret"),
+            ],
+        )
+
+    async def test_invalid_row_cancels_the_hashing_ahead(self):
+        hasher = FakeHasher()
+        rows = [*user_rows(2), {"username": "x@example.com"}]
+        with self.assertRaises(MissingColumnsError):
+            await self.import_rows(FakeDriver(), hasher, rows)
+        self.assertEqual(hasher.cancelled, 1)
+
+    async def test_failed_copy_cancels_the_hashing_ahead(self):
+        hasher = FakeHasher()
+        driver = FakeDriver(fail=UniqueViolationError("duplicate username"))
+        with self.assertRaises(UniqueViolationError):
+            await self.import_rows(driver, hasher, user_rows(3))
+        self.assertEqual(hasher.cancelled, 1)
+
+
+def admin_headers(*roles: str) -> dict:
+    token = JWTRepo(
+        data={"sub": str(uuid4()), "username": "a@example.com", "roles": list(roles)},
+    ).generate_token(timedelta(minutes=5))
+    return {"Authorization": f"Bearer {token}"}
+
+
+class TestAdminRoutes(TestCase):
+    def setUp(self):
+        app = FastAPI()
+        app.include_router(admin_routes.router, prefix="/api")
+        self.client = TestClient(app)
+
+    def test_non_admin_is_refused(self):
+        for method, path in (
+            ("GET", "/api/admin/export/users"),
+            ("POST", "/api/admin/import/users"),
+        ):
+            response = self.client.request(method, path, headers=admin_headers())
+            self.assertEqual(response.status_code, 403)
+
+    def test_refused_rows_are_client_errors(self):
+        for error, status_code in (
+            (UniqueViolationError("duplicate username"), 409),
+            (ForeignKeyViolationError("unknown user_id"), 400),
+            (MissingColumnsError(["password"]), 400),
+        ):
+            with patch.object(
+                copy_services,
+                "import_rows",
+                AsyncMock(side_effect=error),
+            ):
+                response = self.client.post(
+                    "/api/admin/import/users",
+                    headers=admin_headers("admin"),
+                    content=DOCUMENT,
+                )
+            self.assertEqual(response.status_code, status_code)
@@ -0,0 +1,88 @@
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+import config.database as database
+
+
+class TestCheckDbRevision(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.engine = create_async_engine("sqlite+aiosqlite://")
+        patcher = patch.object(database, "engine", self.engine)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+
+    async def set_revision(self, revision: str):
+        async with self.engine.begin() as conn:
+            await conn.execute(
+                text("CREATE TABLE alembic_version (version_num VARCHAR(32))"),
+            )
+            await conn.execute(
+                text("INSERT INTO alembic_version VALUES (:revision)"),
+                {"revision": revision},
+            )
+
+    async def test_head_passes(self):
+        await self.set_revision(database.get_head_revision())
+        await database.check_db_revision()
+
+    async def test_other_revision_raises(self):
+        await self.set_revision("0123456789ab")
+        with self.assertRaisesRegex(RuntimeError, "does not match head"):
+            await database.check_db_revision()
+
+    async def test_unmigrated_database_raises(self):
+        with self.assertRaisesRegex(RuntimeError, "alembic upgrade head"):
+            await database.check_db_revision()
+
+
+class FakeConnection:
+    closed = 0
+
+    async def close(self):
+        FakeConnection.closed += 1
+
+
+class FakeEngine:
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.opened = 0
+
+    async def connect(self):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionRefusedError("database is down")
+        self.opened += 1
+        return FakeConnection()
+
+
+class TestWarmUpPool(IsolatedAsyncioTestCase):
+    def setUp(self):
+        FakeConnection.closed = 0
+
+    async def test_connections_are_returned_to_the_pool(self):
+        engine = FakeEngine()
+        with patch.object(database, "engine", engine):
+            await database.warm_up_pool(3)
+        self.assertEqual(engine.opened, 3)
+        self.assertEqual(FakeConnection.closed, 3)
+
+    async def test_failure_closes_the_opened_connections(self):
+        engine = FakeEngine(failures=1)
+        with patch.object(database, "engine", engine), self.assertRaises(
+            ConnectionRefusedError,
+        ):
+            await database.warm_up_pool(3)
+        self.assertEqual(engine.opened, 2)
+        self.assertEqual(FakeConnection.closed, 2)
+
+    async def test_disabled(self):
+        engine = FakeEngine()
+        with patch.object(database, "engine", engine):
+            await database.warm_up_pool(0)
+        self.assertEqual(engine.opened, 0)
@@ -0,0 +1,55 @@
+import asyncio
+from unittest import IsolatedAsyncioTestCase
+
+from app.utils.dataloader import DataLoader
+
+
+class TestDataLoader(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.calls = []
+
+        async def batch_load(keys):
+            self.calls.append(keys)
+            return {key: key * 2 for key in keys if key != 3}
+
+        self.loader = DataLoader(batch_load, default=list)
+
+    async def test_batches_keys_of_one_iteration(self):
+        values = await asyncio.gather(self.loader.load(1), self.loader.load(2))
+        self.assertEqual(values, [2, 4])
+        self.assertEqual(self.calls, [[1, 2]])
+
+    async def test_caches_and_deduplicates_keys(self):
+        self.assertEqual(await self.loader.load_many([1, 1, 2]), [2, 2, 4])
+        self.assertEqual(await self.loader.load(2), 4)
+        self.assertEqual(self.calls, [[1, 2]])
+
+    async def test_missing_keys_use_default(self):
+        self.assertEqual(await self.loader.load(3), [])
+
+    async def test_failed_batch_is_retried(self):
+        async def failing(keys):
+            raise RuntimeError("boom")
+
+        loader = DataLoader(failing)
+        with self.assertRaises(RuntimeError):
+            await loader.load(1)
+        loader._batch_load = self.loader._batch_load
+        self.assertEqual(await loader.load(1), 2)
+
+    async def test_cancelled_caller_does_not_fail_the_batch(self):
+        cancelled = self.loader.load(1)
+        other = self.loader.load(2)
+        cancelled.cancel()
+        self.assertEqual(await other, 4)
+        # The cancelled key is loaded again on the next request
+        self.assertEqual(await self.loader.load(1), 2)
+        self.assertEqual(self.calls, [[1, 2], [1]])
+
+    async def test_dispatch_task_is_referenced(self):
+        future = self.loader.load(1)
+        await asyncio.sleep(0)
+        self.assertEqual(len(self.loader._tasks), 1)
+        await future
+        await asyncio.sleep(0)
+        self.assertEqual(len(self.loader._tasks), 0)
@@ -0,0 +1,53 @@
+from uuid import uuid4
+
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from app.routes import user_routes
+from config.database import get_session
+from tests.unit.sqlite import SqliteTestCase
+
+
+class TestFavoriteProfiles(SqliteTestCase):
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        app = FastAPI()
+        app.include_router(user_routes.router, prefix="/api")
+
+        async def get_test_session():
+            async with self.session() as db_session:
+                yield db_session
+
+        app.dependency_overrides[get_session] = get_test_session
+        self.client = AsyncClient(app=app, base_url="http://test")
+        self.addAsyncCleanup(self.client.aclose)
+
+    async def test_enabled_favorites_of_the_user_oldest_first(self):
+        owner = await self.add_user("owner@example.com")
+        other = await self.add_user("other@example.com")
+        await self.add_profile(owner, "newer", age=10, favorite=True)
+        await self.add_profile(owner, "older", age=20, favorite=True)
+        await self.add_profile(owner, "not a favorite", age=30)
+        await self.add_profile(owner, "deleted", age=40, favorite=True, enabled=False)
+        await self.add_profile(other, "of another user", age=50, favorite=True)
+
+        response = await self.client.get(f"/api/users/{owner.id}/favorites")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [profile["name"] for profile in response.json()],
+            ["older", "newer"],
+        )
+        self.assertEqual(
+            {profile["user_id"] for profile in response.json()},
+            {str(owner.id)},
+        )
+
+    async def test_user_without_favorites(self):
+        owner = await self.add_user("owner@example.com")
+        await self.add_profile(owner, "not a favorite")
+        response = await self.client.get(f"/api/users/{owner.id}/favorites")
+        self.assertEqual(response.json(), [])
+
+    async def test_unknown_user(self):
+        response = await self.client.get(f"/api/users/{uuid4()}/favorites")
+        self.assertEqual(response.status_code, 404)
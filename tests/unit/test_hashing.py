@@ -0,0 +1,58 @@
+import asyncio
+import os
+import signal
+from unittest import IsolatedAsyncioTestCase
+
+from app.services.hashing_services import HashingQueueFullError, PasswordHasher
+
+
+class TestPasswordHasher(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.hasher = PasswordHasher(workers=1, queue_size=0)
+
+    async def asyncTearDown(self):
+        self.hasher.close()
+
+    async def test_hash_and_verify(self):
+        hashed = await self.hasher.hash("secret")
+        self.assertTrue(await self.hasher.verify("secret", hashed))
+        self.assertFalse(await self.hasher.verify("other", hashed))
+        info = self.hasher.info()
+        self.assertEqual(info["hash"]["calls"], 1)
+        self.assertEqual(info["verify"]["calls"], 2)
+        self.assertEqual(info["running"], 0)
+
+    async def test_rejects_when_queue_is_full(self):
+        first = asyncio.create_task(self.hasher.hash("secret"))
+        await asyncio.sleep(0)
+        with self.assertRaises(HashingQueueFullError):
+            await self.hasher.hash("other")
+        await first
+        self.assertEqual(self.hasher.info()["rejected"], 1)
+        # The slot is released once the worker is done
+        await asyncio.sleep(0)
+        self.assertIsInstance(await self.hasher.hash("other"), str)
+
+    async def test_invalid_hash_is_counted_as_failure(self):
+        with self.assertRaises(ValueError):
+            await self.hasher.verify("secret", "not a hash")
+        self.assertEqual(self.hasher.info()["verify"]["failed"], 1)
+
+    async def test_hash_many(self):
+        hashes = await self.hasher.hash_many(["a", "b"])
+        self.assertEqual(len(hashes), 2)
+        self.assertTrue(await self.hasher.verify("b", hashes[1]))
+        self.assertEqual(self.hasher.info()["hash_many"]["calls"], 1)
+
+    async def test_replaces_pool_broken_while_idle(self):
+        await self.hasher.hash("secret")
+        pool = self.hasher._pool
+        for process in list(pool._processes.values()):
+            os.kill(process.pid, signal.SIGKILL)
+            process.join()
+        # The pool only notices the dead worker once its manager thread runs
+        while not pool._broken:
+            await asyncio.sleep(0.01)
+        self.assertIsInstance(await self.hasher.hash("other"), str)
+        self.assertIsNot(self.hasher._pool, pool)
+        self.assertEqual(self.hasher.info()["hash"]["failed"], 0)
@@ -0,0 +1,42 @@
+from unittest import TestCase
+
+from sqlalchemy import create_engine, text
+
+from config import instrumentation
+from config.settings import settings
+
+engine = create_engine("sqlite://")
+instrumentation.instrument_engine(engine)
+
+
+class TestQueryInstrumentation(TestCase):
+    def test_counts_queries_of_the_request(self):
+        token = instrumentation.start_request()
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+                conn.execute(text("SELECT 2"))
+            request = instrumentation.current_request()
+        finally:
+            instrumentation.end_request(token)
+        self.assertEqual(request.count, 2)
+        self.assertIsNone(instrumentation.current_request())
+
+    def test_flags_repeated_statements(self):
+        flagged = instrumentation.metrics.n_plus_one
+        token = instrumentation.start_request()
+        try:
+            with engine.connect() as conn:
+                for value in range(settings.db_n_plus_one_threshold + 2):
+                    conn.execute(text("SELECT :value"), {"value": value})
+            request = instrumentation.current_request()
+        finally:
+            instrumentation.end_request(token)
+        self.assertEqual(request.flagged, {"SELECT ?"})
+        self.assertEqual(instrumentation.metrics.n_plus_one, flagged + 1)
+
+    def test_errors_are_counted(self):
+        errors = instrumentation.metrics.errors
+        with engine.connect() as conn, self.assertRaises(Exception):
+            conn.execute(text("SELECT * FROM missing"))
+        self.assertEqual(instrumentation.metrics.errors, errors + 1)
@@ -0,0 +1,59 @@
+from datetime import timedelta
+from unittest import TestCase
+from unittest.mock import patch
+
+import jwt
+
+from app.utils.jwt import JWTBearer, JWTRepo, VerifiedTokenCache, decode_verified
+from config.settings import settings
+
+
+class TestVerifiedTokenCache(TestCase):
+    def setUp(self):
+        self.cache = VerifiedTokenCache(max_entries=2)
+
+    def test_hit_returns_a_copy(self):
+        self.cache.set("token", {"sub": "1", "exp": 2_000_000_000})
+        claims = self.cache.get("token")
+        claims["sub"] = "2"
+        self.assertEqual(self.cache.get("token")["sub"], "1")
+        self.assertEqual(self.cache.stats.hits, 2)
+
+    def test_held_until_exp(self):
+        self.cache.set("token", {"exp": 1000})
+        with patch("app.utils.jwt.time.time", return_value=999.0):
+            self.assertIsNotNone(self.cache.get("token"))
+        with patch("app.utils.jwt.time.time", return_value=1000.0):
+            self.assertIsNone(self.cache.get("token"))
+        self.assertEqual(self.cache.stats.expirations, 1)
+
+    def test_tokens_without_exp_are_not_cached(self):
+        self.cache.set("token", {"sub": "1"})
+        self.assertIsNone(self.cache.get("token"))
+
+    def test_bounded(self):
+        for token in ("a", "b", "c"):
+            self.cache.set(token, {"exp": 2_000_000_000})
+        self.assertIsNone(self.cache.get("a"))
+        self.assertEqual(self.cache.stats.evictions, 1)
+
+    def test_key_rotation_clears(self):
+        self.cache.set("token", {"exp": 2_000_000_000})
+        with patch.object(settings, "jwt_secret_key", "rotated"):
+            self.assertIsNone(self.cache.get("token"))
+        self.assertEqual(self.cache.stats.invalidations, 1)
+
+
+class TestDecodeVerified(TestCase):
+    def test_rotated_key_rejects_cached_token(self):
+        token = JWTRepo(data={"sub": "1"}).generate_token(timedelta(minutes=5))
+        self.assertEqual(decode_verified(token)["sub"], "1")
+        self.assertTrue(JWTBearer.verify_jwt(token))
+        with patch.object(settings, "jwt_secret_key", "rotated-secret"):
+            self.assertFalse(JWTBearer.verify_jwt(token))
+            with self.assertRaises(jwt.InvalidSignatureError):
+                decode_verified(token)
+
+    def test_invalid_tokens_are_not_cached(self):
+        self.assertFalse(JWTBearer.verify_jwt("not.a.token"))
+        self.assertEqual(JWTRepo(token="not.a.token").decode_token(), {})  # noqa: S106
@@ -0,0 +1,52 @@
+from unittest import TestCase
+from uuid import uuid4
+
+from pydantic import ValidationError
+
+from app.core.models import transform_entities
+from app.models.sql.profile import Profile, ProfileBulkUpdate, ProfileOut
+
+# Registers User, the target of the Profile.user relationship
+from app.models.sql.user import User  # noqa: F401
+
+
+class TestTransformEntities(TestCase):
+    def setUp(self):
+        self.profiles = [
+            Profile(id=uuid4(), name=f"profile {i}", description="", user_id="u")
+            for i in range(3)
+        ]
+
+    def test_validates_entities_and_mappings(self):
+        rows = [self.profiles[0], self.profiles[1].model_dump()]
+        result = transform_entities(rows, ProfileOut)
+        self.assertEqual([type(item) for item in result], [ProfileOut, ProfileOut])
+        self.assertEqual(
+            [item.id for item in result],
+            [p.id for p in self.profiles[:2]],
+        )
+
+    def test_invalid_rows_raise(self):
+        with self.assertRaises(ValidationError):
+            transform_entities([{"id": "not a uuid"}], ProfileOut)
+
+    def test_trusted_matches_validated(self):
+        trusted = transform_entities(self.profiles, ProfileOut, trusted=True)
+        validated = transform_entities(self.profiles, ProfileOut)
+        self.assertEqual(trusted, validated)
+        self.assertEqual(
+            [item.model_dump_json() for item in trusted],
+            [item.model_dump_json() for item in validated],
+        )
+        self.assertEqual(trusted[0].model_fields_set, set(ProfileOut.model_fields))
+
+
+class TestProfileBulkUpdate(TestCase):
+    def test_unset_fields_are_kept(self):
+        update = ProfileBulkUpdate(id=uuid4(), name="renamed")
+        self.assertEqual(set(update.model_dump(exclude_unset=True)), {"id", "name"})
+
+    def test_null_fields_are_rejected(self):
+        for field in ("name", "description", "favorite"):
+            with self.assertRaises(ValidationError):
+                ProfileBulkUpdate.model_validate({"id": str(uuid4()), field: None})
@@ -0,0 +1,18 @@
+from datetime import datetime
+from unittest import TestCase
+from uuid import uuid4
+
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+class TestCursor(TestCase):
+    def test_round_trip(self):
+        created_at, model_id = datetime(2024, 1, 22, 21, 23, 14, 367323), uuid4()
+        cursor = encode_cursor(created_at, model_id)
+        self.assertNotIn("=", cursor)
+        self.assertEqual(decode_cursor(cursor), (created_at, str(model_id)))
+
+    def test_invalid_cursor(self):
+        for cursor in ("", "not-a-cursor", encode_cursor(datetime.now(), uuid4())[:-4]):
+            with self.assertRaises(ValueError):
+                decode_cursor(cursor)
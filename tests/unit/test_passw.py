@@ -0,0 +1,24 @@
+from unittest import TestCase
+
+from app.utils.passw import BCRYPT_MIN_ROUNDS, build_context, calibrate_bcrypt
+
+
+class TestHashPolicy(TestCase):
+    def test_other_rounds_need_rehash(self):
+        old = build_context(bcrypt_rounds=5)
+        current = build_context(bcrypt_rounds=6)
+        hashed = old.hash("secret")
+        self.assertTrue(current.verify("secret", hashed))
+        self.assertTrue(current.needs_update(hashed))
+        self.assertTrue(build_context(bcrypt_rounds=4).needs_update(hashed))
+        self.assertFalse(old.needs_update(hashed))
+
+    def test_calibration_stays_within_target(self):
+        result = calibrate_bcrypt(target_ms=0.0, samples=1)
+        # Nothing meets the target, the cheapest cost is reported
+        self.assertEqual(result["rounds"], BCRYPT_MIN_ROUNDS)
+        self.assertEqual(result["settings"]["BCRYPT_ROUNDS"], BCRYPT_MIN_ROUNDS)
+
+        result = calibrate_bcrypt(target_ms=20.0, samples=1)
+        self.assertGreaterEqual(result["rounds"], BCRYPT_MIN_ROUNDS)
+        self.assertLessEqual(result["verify_ms"], 20.0)
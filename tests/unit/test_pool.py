@@ -0,0 +1,47 @@
+import sqlite3
+from unittest import TestCase
+
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+from config.pool import PoolMetricsMixin
+
+
+class InstrumentedQueuePool(PoolMetricsMixin, QueuePool):
+    pass
+
+
+def make_pool(**kwargs) -> InstrumentedQueuePool:
+    return InstrumentedQueuePool(
+        lambda: sqlite3.connect(":memory:"),
+        **kwargs,
+    )
+
+
+class TestPoolMetrics(TestCase):
+    def test_checkout_counters(self):
+        pool = make_pool(pool_size=2, max_overflow=1)
+        first, second, third = pool.connect(), pool.connect(), pool.connect()
+        stats = pool.stats()
+        self.assertEqual(stats["checked_out"], 3)
+        self.assertEqual(stats["overflow"], 1)
+        self.assertEqual(stats["checkouts"], 3)
+        for conn in (first, second, third):
+            conn.close()
+        self.assertEqual(pool.stats()["checked_out"], 0)
+        self.assertEqual(pool.stats()["idle"], 2)
+
+    def test_timeout_is_counted(self):
+        pool = make_pool(pool_size=1, max_overflow=0, timeout=0.01)
+        conn = pool.connect()
+        with self.assertRaises(exc.TimeoutError):
+            pool.connect()
+        stats = pool.stats()
+        self.assertEqual(stats["timeouts"], 1)
+        self.assertGreater(stats["wait_max_seconds"], 0)
+        conn.close()
+
+    def test_recreate_keeps_metrics(self):
+        pool = make_pool(pool_size=1)
+        pool.connect().close()
+        self.assertEqual(pool.recreate().stats()["checkouts"], 1)
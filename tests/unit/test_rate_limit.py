@@ -0,0 +1,103 @@
+from unittest import IsolatedAsyncioTestCase, TestCase
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.middlewares.rate_limit import (
+    Budget,
+    MemoryBucketStore,
+    RateLimitMiddleware,
+    RedisBucketStore,
+)
+from app.utils.resp import RespClient
+
+LOGIN = Budget(name="login", rate=1.0, burst=2)
+WRITE = Budget(name="write", rate=1.0, burst=3)
+
+
+def build_client(store: MemoryBucketStore) -> TestClient:
+    app = FastAPI()
+    app.add_middleware(
+        RateLimitMiddleware,
+        store=store,
+        login=LOGIN,
+        write=WRITE,
+        login_paths=["/login"],
+        forwarded_for=True,
+    )
+
+    @app.post("/login")
+    async def login(payload: dict):
+        return payload
+
+    @app.post("/items")
+    async def create():
+        return {}
+
+    @app.get("/items")
+    async def read():
+        return []
+
+    return TestClient(app)
+
+
+class TestMemoryBucketStore(IsolatedAsyncioTestCase):
+    async def test_burst_then_refill(self):
+        store = MemoryBucketStore(shards=2)
+        with patch("app.middlewares.rate_limit.time.monotonic", return_value=10.0):
+            self.assertEqual(await store.take("k", LOGIN), 0)
+            self.assertEqual(await store.take("k", LOGIN), 0)
+            self.assertAlmostEqual(await store.take("k", LOGIN), 1.0)
+        with patch("app.middlewares.rate_limit.time.monotonic", return_value=11.5):
+            self.assertEqual(await store.take("k", LOGIN), 0)
+            self.assertAlmostEqual(await store.take("k", LOGIN), 0.5)
+
+    async def test_shards_are_bounded(self):
+        store = MemoryBucketStore(shards=4, max_keys=8)
+        for index in range(100):
+            await store.take(f"ip:{index}", LOGIN)
+        info = store.info()
+        self.assertLessEqual(info["buckets"], 8)
+        self.assertEqual(info["evictions"], 100 - info["buckets"])
+
+
+class TestUnreachableRedis(IsolatedAsyncioTestCase):
+    async def test_requests_are_let_through(self):
+        store = RedisBucketStore(RespClient("redis://127.0.0.1:1"))
+        self.assertEqual(await store.take("k", LOGIN), 0)
+
+
+class TestRateLimitMiddleware(TestCase):
+    def test_login_limited_per_username_across_ips(self):
+        client = build_client(MemoryBucketStore())
+        for ip in ("10.0.0.1", "10.0.0.2"):
+            response = client.post(
+                "/login",
+                json={"username": " A@example.com", "password": "x"},
+                headers={"x-forwarded-for": ip},
+            )
+            # The body is still read by the endpoint
+            self.assertEqual(response.json()["username"], " A@example.com")
+        response = client.post(
+            "/login",
+            json={"username": "a@example.com"},
+            headers={"x-forwarded-for": "10.0.0.3"},
+        )
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.headers["retry-after"], "1")
+        # Another account from the same client keeps its own budget
+        response = client.post(
+            "/login",
+            json={"username": "b@example.com"},
+            headers={"x-forwarded-for": "10.0.0.3"},
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_writes_have_their_own_budget_and_reads_are_free(self):
+        client = build_client(MemoryBucketStore())
+        for _ in range(2):
+            client.post("/login", json={"username": "a@example.com"})
+        statuses = [client.post("/items").status_code for _ in range(4)]
+        self.assertEqual(statuses, [200, 200, 200, 429])
+        self.assertEqual(client.get("/items").status_code, 200)
@@ -0,0 +1,115 @@
+import asyncio
+from unittest.mock import patch
+
+from sqlmodel import select
+
+from app.models.sql.user import User
+from app.repository.user import UserRepository
+from app.services import user_services
+from app.services.hashing_services import HashingMetrics, HashingQueueFullError
+from app.utils import passw
+from app.utils.passw import build_context
+from tests.unit.sqlite import SqliteTestCase
+
+
+class FakeHasher:
+    """Hashes in the test process, `before_hash` runs before each new hash."""
+
+    def __init__(self, before_hash=None):
+        self.before_hash = before_hash
+        self.metrics = HashingMetrics()
+        self.released = asyncio.Event()
+
+    async def verify(self, plain_password, hashed_password):
+        return passw.verify_password(plain_password, hashed_password)
+
+    async def hash(self, password):
+        await self.released.wait()
+        if self.before_hash is not None:
+            await self.before_hash()
+        return passw.get_password_hash(password)
+
+
+class TestRehashOnLogin(SqliteTestCase):
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        self.hasher = FakeHasher()
+        for target, name, value in (
+            # The current policy, the stored hashes use fewer rounds
+            (passw, "pwd_context", build_context(bcrypt_rounds=5)),
+            (user_services, "password_hasher", self.hasher),
+            (user_services, "async_session", self.session),
+        ):
+            patcher = patch.object(target, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.old_hash = build_context(bcrypt_rounds=4).hash("secret")
+        self.user = await self.add_user("user@example.com", password=self.old_hash)
+
+    async def login(self, password: str = "secret"):  # noqa: S107
+        async with self.session() as db_session:
+            user = await user_services.authenticate_user(
+                db_session,
+                "user@example.com",
+                password,
+            )
+        # The sessions share the connection of the in-memory database, the
+        # rehash starts once the login closed its session, as it would in use
+        self.hasher.released.set()
+        await asyncio.gather(*user_services._rehashes)
+        return user
+
+    async def stored_hash(self) -> str:
+        async with self.session() as db_session:
+            user = (await db_session.exec(select(User))).one()
+            return user.password
+
+    async def cached_hash(self) -> str:
+        async with self.session() as db_session:
+            user = await UserRepository(db_session).get_by_id(self.user.id)
+            return user.password
+
+    async def test_old_hash_is_replaced(self):
+        self.assertEqual((await self.login()).id, self.user.id)
+        new_hash = await self.stored_hash()
+        self.assertNotEqual(new_hash, self.old_hash)
+        self.assertTrue(passw.verify_password("secret", new_hash))
+        self.assertFalse(passw.needs_rehash(new_hash))
+        # The row cached by the login was invalidated after the commit
+        self.assertEqual(await self.cached_hash(), new_hash)
+        self.assertEqual(self.hasher.metrics.rehashed, 1)
+
+        # Up to date, the next login does not hash again
+        self.hasher.before_hash = self.fail
+        await self.login()
+        self.assertEqual(await self.stored_hash(), new_hash)
+
+    async def test_changed_password_is_not_replaced(self):
+        changed = build_context(bcrypt_rounds=5).hash("changed")
+
+        async def change_password():
+            # Committed while the rehash was computed
+            async with self.session() as db_session:
+                user = await db_session.get(User, self.user.id)
+                user.password = changed
+                await db_session.commit()
+
+        self.hasher.before_hash = change_password
+        await self.login()
+        self.assertEqual(await self.stored_hash(), changed)
+        self.assertEqual(self.hasher.metrics.rehashed, 0)
+
+    async def test_full_queue_skips_the_rehash(self):
+        async def queue_full():
+            raise HashingQueueFullError()
+
+        self.hasher.before_hash = queue_full
+        with self.assertNoLogs(user_services.logger):
+            self.assertEqual((await self.login()).id, self.user.id)
+        self.assertEqual(await self.stored_hash(), self.old_hash)
+        self.assertEqual(self.hasher.metrics.rehashed, 0)
+
+    async def test_wrong_password_is_not_rehashed(self):
+        self.hasher.before_hash = self.fail
+        self.assertIsNone(await self.login("wrong"))
+        self.assertEqual(user_services._rehashes, set())
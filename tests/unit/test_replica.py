@@ -0,0 +1,46 @@
+from unittest import TestCase
+
+from sqlalchemy import create_engine, text
+from sqlmodel import select
+
+from config.replica import STICKY_PRIMARY, ReplicaHealth, RoutingSession
+
+primary = create_engine("sqlite://")
+replica = create_engine("sqlite://")
+unreachable = create_engine("sqlite:////nonexistent/dir/replica.db")
+
+
+class Session(RoutingSession):
+    primary_bind = primary
+    replica_bind = replica
+    replica_health = ReplicaHealth(retry_after=60)
+
+
+class DownSession(RoutingSession):
+    primary_bind = primary
+    replica_bind = unreachable
+    replica_health = ReplicaHealth(retry_after=60)
+
+
+class TestRoutingSession(TestCase):
+    def test_select_goes_to_replica(self):
+        with Session() as session:
+            self.assertIs(session.get_bind(clause=select(1)), replica)
+
+    def test_writes_stick_to_primary(self):
+        with Session() as session:
+            self.assertIs(session.get_bind(clause=text("DELETE FROM t")), primary)
+            self.assertTrue(session.info[STICKY_PRIMARY])
+            self.assertIs(session.get_bind(clause=select(1)), primary)
+
+    def test_locking_read_goes_to_primary(self):
+        with Session() as session:
+            stmt = select(1).with_for_update()
+            self.assertIs(session.get_bind(clause=stmt), primary)
+
+    def test_falls_back_when_replica_is_down(self):
+        with DownSession() as session:
+            self.assertEqual(session.exec(select(1)).one(), 1)
+            self.assertEqual(DownSession.replica_health.failures, 1)
+            self.assertFalse(DownSession.replica_health.available)
+            self.assertIs(session.get_bind(clause=select(1)), primary)
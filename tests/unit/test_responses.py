@@ -0,0 +1,55 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+from fastapi import APIRouter, FastAPI, Response
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from app.utils.responses import FastJSONResponse, FastJSONRoute
+
+
+class Item(BaseModel):
+    id: int
+
+
+class ItemWithSecret(Item):
+    secret: str
+
+
+router = APIRouter(route_class=FastJSONRoute)
+
+
+@router.get("/item", response_model=Item)
+async def get_item(response: Response):
+    response.headers["ETag"] = '"1"'
+    return Item(id=1)
+
+
+@router.get("/subclass", response_model=Item)
+async def get_subclass():
+    return ItemWithSecret(id=1, secret="hidden")  # noqa: S106
+
+
+@router.get("/dict")
+async def get_dict():
+    return {"id": 1}
+
+
+app = FastAPI(default_response_class=FastJSONResponse)
+app.include_router(router)
+client = TestClient(app)
+
+
+class TestFastJSONRoute(TestCase):
+    def test_typed_result_skips_validation(self):
+        with patch("fastapi.routing.serialize_response") as serialize:
+            response = client.get("/item")
+        serialize.assert_not_called()
+        self.assertEqual(response.content, b'{"id":1}')
+        self.assertEqual(response.headers["etag"], '"1"')
+
+    def test_subclass_is_revalidated(self):
+        self.assertEqual(client.get("/subclass").json(), {"id": 1})
+
+    def test_untyped_result(self):
+        self.assertEqual(client.get("/dict").json(), {"id": 1})
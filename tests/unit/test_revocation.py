@@ -0,0 +1,105 @@
+import time
+from datetime import datetime, timedelta
+from unittest import IsolatedAsyncioTestCase, TestCase
+from unittest.mock import patch
+
+from sqlalchemy import MetaData
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.sql.revoked_token import RevokedToken
+from app.services import revocation_services
+from app.utils.jwt import JWTBearer, JWTRepo, decode_verified
+from app.utils.revocation import RevocationList, RevokedTokenError, revocation_list
+
+
+class TestRevocationList(TestCase):
+    def test_revoked_until_exp(self):
+        revoked = RevocationList()
+        with patch("app.utils.revocation.time.time", return_value=999.0):
+            revoked.add("a", 1000.0)
+            self.assertTrue(revoked.is_revoked("a"))
+            self.assertFalse(revoked.is_revoked("b"))
+        with patch("app.utils.revocation.time.time", return_value=1000.0):
+            self.assertFalse(revoked.is_revoked("a"))
+            self.assertEqual(revoked.purge(), 1)
+        self.assertEqual(len(revoked), 0)
+
+    def test_update_tracks_last_id_and_replace_resets(self):
+        revoked = RevocationList()
+        expires_at = time.time() + 60
+        revoked.update([(3, "a", expires_at), (7, "b", expires_at)])
+        self.assertEqual(revoked.last_id, 7)
+        revoked.replace([(8, "c", expires_at)])
+        self.assertEqual(
+            [revoked.is_revoked(jti) for jti in "abc"],
+            [False, False, True],
+        )
+        self.assertEqual(revoked.last_id, 8)
+
+
+class TestRevokedTokens(TestCase):
+    def tearDown(self):
+        revocation_list.replace([])
+
+    def test_cached_token_is_refused_once_revoked(self):
+        token = JWTRepo(data={"sub": "1"}).generate_token(timedelta(minutes=5))
+        claims = decode_verified(token)
+        self.assertIn("jti", claims)
+        revocation_list.add(claims["jti"], claims["exp"])
+        with self.assertRaises(RevokedTokenError):
+            decode_verified(token)
+        self.assertFalse(JWTBearer.verify_jwt(token))
+
+
+class TestRefreshRevocations(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.engine = create_async_engine("sqlite+aiosqlite://")
+        # current_timestamp(0) is PostgreSQL only
+        table = RevokedToken.__table__.to_metadata(MetaData())
+        table.c.revoked_at.server_default = None
+        async with self.engine.begin() as conn:
+            await conn.run_sync(table.create)
+        self.session = async_sessionmaker(self.engine, class_=AsyncSession)
+        patcher = patch.object(revocation_services, "async_session", self.session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        revocation_list.replace([])
+        revocation_list.last_id = 0
+
+    async def asyncTearDown(self):
+        revocation_list.replace([])
+        await self.engine.dispose()
+
+    async def add(self, row_id: int, jti: str, expires_in: timedelta):
+        async with self.session() as db_session:
+            db_session.add(
+                RevokedToken(
+                    id=row_id,
+                    jti=jti,
+                    expires_at=datetime.utcnow() + expires_in,
+                ),
+            )
+            await db_session.commit()
+
+    async def test_incremental_then_full(self):
+        await self.add(1, "a", timedelta(minutes=5))
+        await self.add(2, "expired", timedelta(minutes=-5))
+        self.assertEqual(await revocation_services.refresh_revocations(full=True), 1)
+        self.assertTrue(revocation_list.is_revoked("a"))
+
+        await self.add(3, "b", timedelta(minutes=5))
+        # Only the rows after the last loaded ID are read
+        self.assertEqual(await revocation_services.refresh_revocations(), 1)
+        self.assertTrue(revocation_list.is_revoked("b"))
+        self.assertEqual(revocation_list.last_id, 3)
+
+        # Committed late with a lower ID, only a full sync sees it
+        await self.add(0, "late", timedelta(minutes=5))
+        await revocation_services.refresh_revocations()
+        self.assertFalse(revocation_list.is_revoked("late"))
+        await revocation_services.refresh_revocations(full=True)
+        self.assertTrue(revocation_list.is_revoked("late"))
+        async with self.session() as db_session:
+            remaining = await db_session.get(RevokedToken, 2)
+        self.assertIsNone(remaining)
@@ -0,0 +1,66 @@
+from typing import Optional
+from unittest import TestCase
+
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import registry
+from sqlmodel import Field, Session, SQLModel, select
+
+from app.core.models import LogicalDeleteModel
+from config.soft_delete import apply_soft_delete
+
+
+class PrivateModel(SQLModel, registry=registry()):
+    """Maps the test tables on their own MetaData, not SQLModel.metadata."""
+
+
+class SoftDeleteItem(PrivateModel, LogicalDeleteModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    name: str
+
+
+class SoftDeleteSession(Session):
+    pass
+
+
+apply_soft_delete(SoftDeleteSession, LogicalDeleteModel)
+engine = create_engine("sqlite://")
+SoftDeleteItem.__table__.create(engine)
+
+
+class TestSoftDelete(TestCase):
+    def setUp(self):
+        with SoftDeleteSession(engine) as session:
+            session.exec(update(SoftDeleteItem).values(enabled=True))
+            session.add_all(
+                [
+                    SoftDeleteItem(name="kept"),
+                    SoftDeleteItem(name="deleted", enabled=False),
+                ],
+            )
+            session.commit()
+
+    def tearDown(self):
+        with SoftDeleteSession(engine) as session:
+            session.exec(SoftDeleteItem.__table__.delete())
+            session.commit()
+
+    def test_select_hides_disabled_rows(self):
+        with SoftDeleteSession(engine) as session:
+            names = session.exec(select(SoftDeleteItem.name)).all()
+            items = session.exec(select(SoftDeleteItem)).all()
+        self.assertEqual(names, ["kept"])
+        self.assertEqual([item.name for item in items], ["kept"])
+
+    def test_include_disabled_option(self):
+        stmt = select(SoftDeleteItem).execution_options(include_disabled=True)
+        with SoftDeleteSession(engine) as session:
+            items = session.exec(stmt).all()
+        self.assertEqual(len(items), 2)
+
+    def test_other_sessions_are_unaffected(self):
+        with Session(engine) as session:
+            items = session.exec(select(SoftDeleteItem)).all()
+        self.assertEqual(len(items), 2)
+
+    def test_table_is_not_in_the_application_metadata(self):
+        self.assertNotIn(SoftDeleteItem.__tablename__, SQLModel.metadata.tables)
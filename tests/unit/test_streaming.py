@@ -0,0 +1,22 @@
+from unittest import IsolatedAsyncioTestCase
+
+from pydantic import BaseModel
+
+from app.utils.streaming import ndjson_lines
+
+
+class Row(BaseModel):
+    id: int
+    name: str
+
+
+async def rows():
+    for index in range(3):
+        yield Row(id=index, name=f"row {index}")
+
+
+class TestNdjson(IsolatedAsyncioTestCase):
+    async def test_one_document_per_line(self):
+        lines = [line async for line in ndjson_lines(rows())]
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(lines[0], b'{"id":0,"name":"row 0"}\n')